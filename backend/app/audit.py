@@ -0,0 +1,212 @@
+"""
+Bulk Password Audit
+Streams newline-delimited passwords (or NDJSON objects) through the batch
+analyzer in fixed-size chunks, so inputs far larger than memory can be
+audited with bounded memory. Used by POST /api/audit/stream and the CLI.
+
+The input format is stated, never guessed per line (raw passwords may well
+start with '{' or '"'):
+    lines   each line is a raw password, taken verbatim
+    ndjson  each line is a JSON string ("hunter2") or an object
+            ({"password": "hunter2", "id": "user-17"})
+
+Each output line is a JSON object with the 1-based input "line" number (and
+"id" when given), score, strength, breach status when requested, or "error".
+Passwords are never echoed back.
+
+Usage:
+    python -m app.audit passwords.txt -o results.ndjson --breaches
+    cat dump.ndjson | python -m app.audit - --format ndjson --breaches > results.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .services.batch_analyzer import BatchAnalyzer
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+MAX_LINE_BYTES = 64 * 1024
+FORMATS = ("lines", "ndjson")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into lines, holding at most one partial line.
+
+    Lines longer than max_line_bytes are discarded and yielded as None so the
+    caller can report them without buffering them.
+    """
+    buffer = b""
+    overflow = False
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            if overflow or end - start > max_line_bytes:
+                overflow = False
+                yield None
+            else:
+                yield buffer[start:end]
+            start = end + 1
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            overflow = True
+            buffer = b""
+
+    if overflow or len(buffer) > max_line_bytes:
+        yield None
+    elif buffer:
+        yield buffer
+
+
+def parse_line(line: bytes, input_format: str = "lines") -> Tuple[Optional[str], Any]:
+    """
+    Decode one input line into (password, id).
+
+    Raises:
+        ValueError: the line is not valid UTF-8 or (ndjson) not a JSON
+            string or object with a "password" string
+    """
+    text = line.rstrip(b"\r").decode("utf-8")
+    if input_format == "lines":
+        return text, None
+    try:
+        value = json.loads(text)
+    except RecursionError:
+        raise ValueError("JSON nested too deeply")
+    if isinstance(value, str):
+        return value, None
+    if isinstance(value, dict) and isinstance(value.get("password"), str):
+        return value["password"], value.get("id")
+    raise ValueError('Expected a string or an object with a "password" field')
+
+
+async def audit(
+    chunks: AsyncIterator[bytes],
+    batch_analyzer: BatchAnalyzer,
+    check_breaches: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    input_format: str = "lines"
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Audit a byte stream, yielding results one chunk at a time.
+
+    Nothing more is read from the input until the consumer has taken the
+    previous chunk of results, so a slow reader slows the producer down
+    (backpressure) and memory stays proportional to chunk_size.
+    """
+    if input_format not in FORMATS:
+        raise ValueError(f"Unknown input format {input_format!r}, expected lines or ndjson")
+    line_no = 0
+    pending: List[Tuple[int, Any, Optional[str], Optional[str]]] = []
+
+    async def flush() -> List[Dict[str, Any]]:
+        passwords = [password for _, _, password, error in pending if error is None]
+        analyzed = iter(await batch_analyzer.analyze(passwords, check_breaches))
+        results = []
+        for number, item_id, _, error in pending:
+            item = {"line": number}
+            if item_id is not None:
+                item["id"] = item_id
+            item.update({"error": error} if error is not None else next(analyzed))
+            results.append(item)
+        pending.clear()
+        return results
+
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if line is None:
+            pending.append((line_no, None, None, f"Line longer than {MAX_LINE_BYTES} bytes"))
+        elif line.strip():
+            try:
+                password, item_id = parse_line(line, input_format)
+                pending.append((line_no, item_id, password, None))
+            except (ValueError, UnicodeDecodeError) as e:
+                pending.append((line_no, None, None, f"Invalid line: {e}"))
+        if len(pending) >= chunk_size:
+            yield await flush()
+
+    if pending:
+        yield await flush()
+
+
+async def _read_file(path: str, block_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while True:
+            block = stream.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+async def run_cli(args: argparse.Namespace) -> None:
+    # Share the server's service configuration (HIBP_* / BREACH_CHECK_MODE env vars)
+    from .main import analysis_pool, batch_analyzer, breach_checker
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    totals = {"lines": 0, "errors": 0, "breached": 0, "weak": 0}
+    started = time.perf_counter()
+
+    if args.workers is not None:
+        analysis_pool.workers = analysis_pool.workers_from_env(args.workers)
+    await breach_checker.start()
+    analysis_pool.start()
+    try:
+        async for results in audit(_read_file(args.input), batch_analyzer,
+                                   args.breaches, args.chunk_size, args.format):
+            for item in results:
+                totals["lines"] += 1
+                if "error" in item:
+                    totals["errors"] += 1
+                else:
+                    totals["breached"] += item.get("breached", False)
+                    totals["weak"] += item["score"] < 40
+            out.write("".join(json.dumps(item) + "\n" for item in results))
+    finally:
+        analysis_pool.close()
+        await breach_checker.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    rate = totals["lines"] / elapsed if elapsed else 0.0
+    summary = (
+        f"Audited {totals['lines']:,} passwords in {elapsed:.2f}s ({rate:,.0f}/s): "
+        f"{totals['weak']:,} weak, {totals['errors']:,} errors"
+    )
+    if args.breaches:
+        summary += f", {totals['breached']:,} breached"
+    print(summary, file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Audit a password list")
+    parser.add_argument("input", help="Password or NDJSON file, or '-' for stdin")
+    parser.add_argument("--format", choices=FORMATS, default="lines",
+                        help="lines: one raw password per line (default); ndjson: JSON per line")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON results file (default: stdout)")
+    parser.add_argument("--breaches", action="store_true", help="Also check for breaches")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Passwords analyzed per chunk (bounds memory)")
+    parser.add_argument("--workers", help="Analysis worker processes (number or 'auto'); "
+                                          "defaults to ANALYSIS_WORKERS")
+    asyncio.run(run_cli(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
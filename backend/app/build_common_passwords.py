@@ -0,0 +1,44 @@
+"""
+Build a common-password list file
+
+Converts a top-N password list (one password per line, most common first,
+e.g. from SecLists or a breach corpus) into the memory-mapped format read
+by CommonPasswordList.
+
+Usage:
+    python -m app.build_common_passwords top-1m.txt common.cpw --limit 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from .services.common_passwords import build_common_passwords
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a common-password list file")
+    parser.add_argument("input", help="Password list, most common first ('-' for stdin)")
+    parser.add_argument("output", help="File to write")
+    parser.add_argument("--limit", type=int, help="Keep only the top N distinct passwords")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", errors="replace")
+    try:
+        count = build_common_passwords(stream, args.output, args.limit)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(
+        f"Wrote {count:,} passwords to {args.output} "
+        f"({os.path.getsize(args.output) / 1024 / 1024:.1f} MB, "
+        f"{time.perf_counter() - started:.1f}s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
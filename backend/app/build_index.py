@@ -0,0 +1,70 @@
+"""
+Build an offline Pwned Passwords index
+
+Converts the HIBP "SHA1:COUNT" text dump (as produced by the official
+downloader, ordered by hash) into the binary format read by OfflineIndex.
+
+Usage:
+    python -m app.build_index pwnedpasswords.txt pwned.idx
+    python -m app.build_index --plaintext --sort fixture.txt fixture.idx
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from typing import Iterable, Iterator, Tuple
+
+from .fake_hibp import load_passwords
+from .services.offline_index import build_index, parse_dump_line
+
+
+def iter_dump(path: str) -> Iterator[Tuple[bytes, int]]:
+    """Stream (digest, count) records from a SHA-1 dump ('-' reads stdin)"""
+    stream = sys.stdin if path == "-" else open(path, encoding="ascii")
+    try:
+        for line in stream:
+            record = parse_dump_line(line)
+            if record is not None:
+                yield record
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def iter_plaintext(path: str) -> Iterator[Tuple[bytes, int]]:
+    """Hash a 'password[:count]' fixture file into (digest, count) records"""
+    for password, count in load_passwords(path).items():
+        yield hashlib.sha1(password.encode("utf-8")).digest(), count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an offline Pwned Passwords index")
+    parser.add_argument("input", help="SHA1:COUNT dump file, or '-' for stdin")
+    parser.add_argument("output", help="Index file to write")
+    parser.add_argument("--plaintext", action="store_true",
+                        help="Input holds 'password[:count]' lines (test fixtures)")
+    parser.add_argument("--sort", action="store_true",
+                        help="Sort records in memory first (small or unsorted inputs only)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    records: Iterable[Tuple[bytes, int]] = (
+        iter_plaintext(args.input) if args.plaintext else iter_dump(args.input)
+    )
+    if args.sort or args.plaintext:
+        records = sorted(records)
+
+    count = build_index(records, args.output)
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(args.output)
+    print(
+        f"Wrote {count:,} hashes to {args.output} "
+        f"({size / 1024 / 1024:.1f} MB, {elapsed:.1f}s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Local stand-in for the Pwned Passwords range API
+Serves deterministic k-anonymity range responses so the breach checker
+can be exercised without touching api.pwnedpasswords.com
+
+Faults (slow, stalled, rate-limited or failing responses) can be injected
+from the command line or changed at runtime with PUT /faults.
+
+Usage:
+    python -m app.fake_hibp --port 8001 --passwords breached.txt
+    python -m app.fake_hibp --port 8001 --max-rps 50 --stall-rate 0.05
+    curl -X PUT localhost:8001/faults -H 'Content-Type: application/json' -d '{"error_rate": 1}'
+    HIBP_API_URL=http://127.0.0.1:8001/range/ uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+HEX_DIGITS = "0123456789ABCDEF"
+
+# A handful of well known breached passwords so the stand-in is useful out of the box
+DEFAULT_BREACHED = {
+    "password": 9659365,
+    "123456": 37359195,
+    "qwerty": 3946737,
+    "letmein": 1094289,
+    "Password1!": 6342,
+}
+
+
+def build_breached_index(passwords: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """Group plaintext passwords into {prefix: {suffix: count}}"""
+    index: Dict[str, Dict[str, int]] = {}
+    for password, count in passwords.items():
+        sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+        index.setdefault(sha1_hash[:5], {})[sha1_hash[5:]] = count
+    return index
+
+
+def load_passwords(path: str) -> Dict[str, int]:
+    """Load a fixture file with one "password" or "password:count" per line"""
+    passwords = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            password, sep, count = line.rpartition(":")
+            if sep and count.isdigit():
+                passwords[password] = int(count)
+            else:
+                passwords[line] = 1
+    return passwords
+
+
+def range_lines(
+    prefix: str,
+    breached: Dict[str, int],
+    entries: int = 800,
+    padding: bool = False
+) -> Iterable[Tuple[str, int]]:
+    """
+    Produce the (suffix, count) pairs for one prefix.
+
+    Filler entries are derived from the prefix so every call for the same
+    prefix returns the same body, like the real (cached) API does.
+    """
+    rng = random.Random(prefix)
+    rows = dict(breached)
+    while len(rows) < entries:
+        suffix = f"{rng.getrandbits(140):035X}"
+        rows.setdefault(suffix, rng.randint(1, 5000))
+    if padding:
+        while len(rows) < entries + 200:
+            suffix = f"{rng.getrandbits(140):035X}"
+            rows.setdefault(suffix, 0)
+    return sorted(rows.items())
+
+
+class Faults:
+    """
+    Failure injection settings; rates are fractions of range requests.
+
+    Requests beyond max_rps in the current second get 429 with Retry-After,
+    like a real per-client limit. Otherwise each request draws once: below
+    stall_rate it hangs for stall_seconds (then answers normally), next
+    rate_limit_rate answers 429, next error_rate answers error_status.
+    latency is added to every request.
+    """
+
+    SETTINGS = ("latency", "stall_rate", "stall_seconds", "max_rps", "rate_limit_rate",
+                "retry_after", "error_rate", "error_status")
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        stall_rate: float = 0.0,
+        stall_seconds: float = 30.0,
+        max_rps: int = 0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.max_rps = max_rps
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.window = 0
+        self.window_requests = 0
+        self.counts = {"ok": 0, "stalled": 0, "rate_limited": 0, "errors": 0}
+
+    def update(self, settings: Dict[str, Any]) -> None:
+        unknown = set(settings) - set(self.SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown fault settings: {', '.join(sorted(unknown))}")
+        for name, value in settings.items():
+            setattr(self, name, type(getattr(self, name))(value))
+
+    def _rate_limited(self) -> Response:
+        self.counts["rate_limited"] += 1
+        return PlainTextResponse("Rate limit exceeded", status_code=429,
+                                 headers={"Retry-After": str(self.retry_after)})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**{name: getattr(self, name) for name in self.SETTINGS}, "counts": dict(self.counts)}
+
+    async def inject(self) -> Optional[Response]:
+        """Apply this request's fault; returns the response to send instead, if any"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.max_rps:
+            now = time.monotonic()
+            if int(now) != self.window:
+                self.window, self.window_requests = int(now), 0
+            self.window_requests += 1
+            if self.window_requests > self.max_rps:
+                return self._rate_limited()
+        roll = self.rng.random()
+        if roll < self.stall_rate:
+            self.counts["stalled"] += 1
+            await asyncio.sleep(self.stall_seconds)
+            return None
+        roll -= self.stall_rate
+        if roll < self.rate_limit_rate:
+            return self._rate_limited()
+        roll -= self.rate_limit_rate
+        if roll < self.error_rate:
+            self.counts["errors"] += 1
+            return PlainTextResponse("Upstream error", status_code=self.error_status)
+        self.counts["ok"] += 1
+        return None
+
+
+def create_app(
+    passwords: Optional[Dict[str, int]] = None,
+    entries: int = 800,
+    faults: Optional[Faults] = None
+) -> FastAPI:
+    """Build the stand-in ASGI app (usable in-process through httpx.ASGITransport)"""
+    index = build_breached_index(DEFAULT_BREACHED if passwords is None else passwords)
+    faults = faults if faults is not None else Faults()
+    fake = FastAPI(title="Fake Pwned Passwords range API")
+    fake.state.faults = faults
+
+    @fake.get("/faults")
+    async def get_faults() -> Dict[str, Any]:
+        return faults.as_dict()
+
+    @fake.put("/faults")
+    async def put_faults(request: Request) -> Response:
+        try:
+            faults.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return PlainTextResponse(str(e), status_code=400)
+        return JSONResponse(faults.as_dict())
+
+    @fake.get("/range/{prefix}")
+    async def get_range(prefix: str, request: Request) -> Response:
+        prefix = prefix.upper()
+        if len(prefix) != 5 or any(c not in HEX_DIGITS for c in prefix):
+            return PlainTextResponse("The hash prefix was not in a valid format", status_code=400)
+        injected = await faults.inject()
+        if injected is not None:
+            return injected
+        padding = request.headers.get("add-padding", "").lower() == "true"
+        rows = range_lines(prefix, index.get(prefix, {}), entries, padding)
+        body = "\r\n".join(f"{suffix}:{count}" for suffix, count in rows)
+        return PlainTextResponse(body)
+
+    return fake
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Pwned Passwords range API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--passwords", help="Fixture file with 'password[:count]' lines")
+    parser.add_argument("--entries", type=int, default=800, help="Non-padding entries per range")
+    faults = parser.add_argument_group("fault injection (fractions of requests)")
+    faults.add_argument("--latency", type=float, default=0.0, help="Added to every response (ms)")
+    faults.add_argument("--stall-rate", type=float, default=0.0, help="Hang for --stall-seconds")
+    faults.add_argument("--stall-seconds", type=float, default=30.0)
+    faults.add_argument("--max-rps", type=int, default=0, help="Answer 429 beyond this many requests/s")
+    faults.add_argument("--rate-limit-rate", type=float, default=0.0, help="Answer 429 at random")
+    faults.add_argument("--retry-after", type=int, default=1, help="Retry-After sent with 429s (s)")
+    faults.add_argument("--error-rate", type=float, default=0.0, help="Answer --error-status")
+    faults.add_argument("--error-status", type=int, default=503)
+    faults.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+    passwords = load_passwords(args.passwords) if args.passwords else None
+    injected = Faults(
+        latency=args.latency / 1000,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        max_rps=args.max_rps,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(passwords, args.entries, injected), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
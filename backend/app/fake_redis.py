@@ -0,0 +1,110 @@
+"""
+Local stand-in for a Redis server
+Implements the handful of RESP commands the redis range cache backend uses
+(PING, GET, SET with EX/PX, DEL, DBSIZE, FLUSHALL, AUTH, SELECT), so shared
+caching across workers can be exercised without installing Redis
+
+Usage:
+    python -m app.fake_redis --port 6380
+    HIBP_CACHE_BACKEND=redis HIBP_CACHE_REDIS_URL=redis://127.0.0.1:6380 uvicorn app.main:app --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class FakeRedis:
+    """In-memory key/value store speaking RESP over asyncio streams"""
+
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[Optional[float], bytes]] = {}
+        self.commands = 0
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. typed into telnet)
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args: List[bytes]) -> bytes:
+        """Run one command and return its RESP-encoded reply"""
+        self.commands += 1
+        command = args[0].upper() if args else b""
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"GET" and len(args) == 2:
+            value = self._get(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET" and len(args) >= 3:
+            expires_at = None
+            options = [a.upper() for a in args[3:]]
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+            self.data[args[1]] = (expires_at, args[2])
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % removed
+        if command == b"DBSIZE":
+            return b":%d\r\n" % len(self.data)
+        if command == b"FLUSHALL":
+            self.data.clear()
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                writer.write(self.execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 6380) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for a Redis server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+
+    async def run() -> None:
+        server = await FakeRedis().serve(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
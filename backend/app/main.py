@@ -3,25 +3,273 @@ Login Security Analyzer - FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
+import asyncio
+import json
 import os
+import time
 from dotenv import load_dotenv
 
-from .services.password_analyzer import PasswordAnalyzer
+from .audit import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, audit
+from .services.admission import AdmissionControl, ClientRateLimiter, ConcurrencyLimiter
+from .services.common_passwords import CommonPasswordList
+from .services.guess_estimator import GuessEstimator
+from .services.password_analyzer import DETAIL_FLAGS, MESSAGES, PasswordAnalyzer, compact_result
+from .services.analysis_pool import AnalysisPool
+from .services.analysis_session import AnalysisSession, SessionNotFound, SessionStore
+from .services.batch_analyzer import BatchAnalyzer
 from .services.breach_checker import BreachChecker
-from .services.password_generator import PasswordGenerator
+from .services.breach_filter import XorFilter
+from .services.cache_backends import create_backend
+from .services.metrics import HistogramFamily, MetricsRegistry, RequestTimer
+from .services.offline_index import OfflineIndex
+from .services.upstream_guard import CircuitBreaker, TokenBucket
+from .services.range_cache import RangeCache
+from .services.result_cache import ResultCache
+from .services.password_generator import MAX_WORDS, PasswordGenerator
+from .services.wordlist import Wordlist
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Load environment variables
 load_dotenv()
 
+# Breach lookup mode: online | offline | offline-then-online
+breach_check_mode = os.getenv("BREACH_CHECK_MODE", "online")
+offline_index_path = os.getenv("HIBP_OFFLINE_INDEX", "")
+breach_filter_path = os.getenv("HIBP_BREACH_FILTER", "")
+
+# Optional large common-password list (python -m app.build_common_passwords)
+common_passwords_path = os.getenv("COMMON_PASSWORDS_FILE", "")
+
+# Initialize services
+common_passwords = CommonPasswordList(common_passwords_path) if common_passwords_path else None
+guess_estimator = GuessEstimator(
+    common_passwords=common_passwords,
+    cache_size=int(os.getenv("GUESS_ESTIMATOR_CACHE_SIZE", "2048"))
+) if os.getenv("GUESS_ESTIMATOR_ENABLED", "true").lower() == "true" else None
+password_analyzer = PasswordAnalyzer(common_passwords=common_passwords, estimator=guess_estimator)
+# The estimate's worst case grows steeply with length (~0.5 ms at 8
+# characters, ~45 ms at 64): longer passwords are estimated on a thread
+guess_estimator_inline_length = int(os.getenv("GUESS_ESTIMATOR_INLINE_LENGTH", "8"))
+breach_checker = BreachChecker(
+    api_url=os.getenv("HIBP_API_URL") or None,
+    timeout=float(os.getenv("HIBP_TIMEOUT", "10")),
+    connect_timeout=float(os.getenv("HIBP_CONNECT_TIMEOUT", "5")),
+    max_connections=int(os.getenv("HIBP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HIBP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("HIBP_KEEPALIVE_EXPIRY", "30")),
+    http2=os.getenv("HIBP_HTTP2", "true").lower() == "true",
+    cache=create_backend(
+        os.getenv("HIBP_CACHE_BACKEND", "memory"),
+        RangeCache(
+            max_bytes=int(os.getenv("HIBP_CACHE_MAX_MB", "64")) * 1024 * 1024,
+            ttl=float(os.getenv("HIBP_CACHE_TTL", "3600"))
+        ),
+        path=os.getenv("HIBP_CACHE_PATH", ""),
+        url=os.getenv("HIBP_CACHE_REDIS_URL", ""),
+        ttl=float(os.getenv("HIBP_CACHE_TTL", "3600"))
+    ),
+    offline_index=OfflineIndex(offline_index_path) if offline_index_path else None,
+    mode=breach_check_mode,
+    breach_filter=XorFilter.load(breach_filter_path) if breach_filter_path else None,
+    rate_limit=float(os.getenv("HIBP_RATE_LIMIT", "100")),
+    rate_burst=int(os.getenv("HIBP_RATE_BURST", "50")),
+    rate_max_wait=float(os.getenv("HIBP_RATE_MAX_WAIT", "1")),
+    max_retries=int(os.getenv("HIBP_MAX_RETRIES", "2")),
+    retry_budget=float(os.getenv("HIBP_RETRY_BUDGET", "3")),
+    backoff_base=float(os.getenv("HIBP_BACKOFF_BASE", "0.1")),
+    backoff_cap=float(os.getenv("HIBP_BACKOFF_CAP", "2")),
+    breaker_failure_ratio=float(os.getenv("HIBP_BREAKER_FAILURE_RATIO", "0.5")),
+    breaker_window=int(os.getenv("HIBP_BREAKER_WINDOW", "100")),
+    breaker_reset=float(os.getenv("HIBP_BREAKER_RESET", "30"))
+)
+# Passphrase wordlist (e.g. the EFF long list); built-in words when unset
+passphrase_wordlist_path = os.getenv("PASSPHRASE_WORDLIST", "")
+password_generator = PasswordGenerator(
+    wordlist=Wordlist.load(passphrase_wordlist_path) if passphrase_wordlist_path else None
+)
+
+# Batch endpoint limits
+max_batch_size = int(os.getenv("MAX_BATCH_SIZE", "5000"))
+max_generate_batch = int(os.getenv("MAX_GENERATE_BATCH", "50000"))
+max_password_length = int(os.getenv("MAX_PASSWORD_LENGTH", "1024"))
+
+# Worker processes for CPU-bound bulk analysis ("auto" = one per core, 0 = off)
+analysis_pool = AnalysisPool(
+    password_analyzer,
+    workers=AnalysisPool.workers_from_env(os.getenv("ANALYSIS_WORKERS", "0")),
+    chunk_size=int(os.getenv("ANALYSIS_CHUNK_SIZE", "1000"))
+)
+batch_analyzer = BatchAnalyzer(password_analyzer, breach_checker, max_password_length, analysis_pool)
+
+# Memoized results for repeated passwords, keyed by an HMAC (never plaintext)
+result_cache_enabled = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+result_cache_size = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+result_cache_ttl = float(os.getenv("RESULT_CACHE_TTL", "600"))
+analysis_cache = ResultCache(result_cache_size, result_cache_ttl, result_cache_enabled)
+full_analysis_cache = ResultCache(result_cache_size, result_cache_ttl, result_cache_enabled)
+
+# Latency budget for /api/full-analysis; a slower breach lookup is reported
+# as "pending" and finishes in the background (0 = always wait)
+full_analysis_budget = float(os.getenv("FULL_ANALYSIS_BUDGET_MS", "1500")) / 1000
+background_tasks = set()
+
+# Keystroke sessions for /api/analyze/incremental (short-lived, memory-capped)
+analysis_sessions = SessionStore(
+    password_analyzer,
+    ttl=float(os.getenv("ANALYSIS_SESSION_TTL", "300")),
+    max_bytes=int(os.getenv("ANALYSIS_SESSION_MAX_MB", "16")) * 1024 * 1024,
+    max_length=max_password_length
+)
+
+# Messages per second per /ws/analyze connection (beyond the burst, reading pauses)
+ws_message_rate = float(os.getenv("WS_MESSAGE_RATE", "20"))
+ws_message_burst = int(os.getenv("WS_MESSAGE_BURST", "40"))
+
+# Per-client rate limits and load shedding for the endpoints that cost
+# upstream quota or CPU (per worker process; see services/admission.py).
+# Routes are path prefixes, so sub-routes inherit them; each cost class has
+# its own bucket per client.
+admission_enabled = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+admission_routes = {
+    "/api/full-analysis": "lookup",
+    "/api/breach-check": "lookup",
+    "/api/generate": "generate",
+    "/api/passphrase": "generate",
+    "/api/analyze/batch": "batch",
+    "/api/generate/batch": "batch",
+    "/api/passphrase/batch": "batch",
+    "/api/audit": "stream",
+    "/ws/analyze": "stream",
+}
+
+
+def client_limiter(setting: str, rate: str, burst: str) -> ClientRateLimiter:
+    return ClientRateLimiter(
+        rate=float(os.getenv(f"{setting}_RATE_LIMIT", rate)),
+        burst=float(os.getenv(f"{setting}_RATE_BURST", burst)),
+        width=int(os.getenv("CLIENT_RATE_SKETCH_WIDTH", "4096")),
+        depth=int(os.getenv("CLIENT_RATE_SKETCH_DEPTH", "4"))
+    )
+
+
+client_limiters = {
+    "lookup": client_limiter("CLIENT", "5", "20"),
+    "generate": client_limiter("CLIENT", "5", "20"),
+    "batch": client_limiter("CLIENT_BATCH", "0.5", "5"),
+    # Audit streams and live connections opened (each then runs for long)
+    "stream": client_limiter("CLIENT_STREAM", "1", "10"),
+}
+
+# Behind a proxy every socket peer is the proxy, and all clients would share
+# its bucket: trust X-Forwarded-For when told to, or on Render by default
+trust_proxy_setting = os.getenv("TRUST_PROXY_HEADERS", "auto").lower()
+trust_proxy_headers = trust_proxy_setting == "true" or (
+    trust_proxy_setting == "auto" and os.getenv("RENDER", "").lower() == "true")
+concurrency_limiter = ConcurrencyLimiter(
+    max_concurrent=int(os.getenv("MAX_CONCURRENT_REQUESTS", "64")),
+    max_queue=int(os.getenv("MAX_QUEUED_REQUESTS", "128")),
+    queue_timeout=float(os.getenv("QUEUE_TIMEOUT_MS", "1000")) / 1000
+)
+
+# Prometheus metrics (per worker process); see services/metrics.py
+metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+metrics = MetricsRegistry("lsa")
+analyze_latency = metrics.histogram("analyze_seconds", "Strength analysis time (result cache misses)")
+metrics.histogram("hibp_upstream_seconds", "HIBP range request time", breach_checker.upstream_latency)
+metrics.histogram("hibp_parse_seconds", "HIBP range body parse time", breach_checker.parse_latency)
+request_latency = metrics.histogram(
+    "request_duration_seconds", "Total HTTP request time by route", HistogramFamily("path"))
+
+
+def cache_samples(name: str, stats: dict, key: str) -> list:
+    """(labels, value) pairs for one cache counter, per tier if tiered"""
+    if "local" in stats:
+        return [({"cache": f"{name}_local"}, stats["local"].get(key)),
+                ({"cache": f"{name}_shared"}, stats["shared"].get(key))]
+    return [({"cache": name}, stats.get(key))]
+
+
+def cache_counter(key: str):
+    def collect():
+        return (
+            cache_samples("range", breach_checker.cache_stats(), key)
+            + cache_samples("analysis", analysis_cache.stats(), key)
+            + cache_samples("full_analysis", full_analysis_cache.stats(), key)
+        )
+    return collect
+
+
+def pool_gauge():
+    pool = breach_checker.pool_stats()
+    if pool is None:
+        return None
+    return [({"state": "active"}, pool["active"]), ({"state": "idle"}, pool["idle"])]
+
+
+metrics.counter("cache_hits_total", "Cache hits", cache_counter("hits"))
+metrics.counter("cache_misses_total", "Cache misses", cache_counter("misses"))
+metrics.counter("hibp_requests_total", "HIBP range requests sent (retries included)",
+                lambda: breach_checker.upstream_requests)
+metrics.counter("hibp_rate_limited_total", "HIBP responses with HTTP 429",
+                lambda: breach_checker.rate_limited)
+metrics.counter("hibp_timeouts_total", "HIBP requests that timed out",
+                lambda: breach_checker.timeouts)
+metrics.counter("hibp_upstream_errors_total", "HIBP requests that failed otherwise",
+                lambda: breach_checker.upstream_errors)
+metrics.counter("hibp_retries_total", "HIBP requests retried after a failure",
+                lambda: breach_checker.retries)
+metrics.counter("hibp_short_circuited_total", "HIBP requests refused by the open circuit",
+                lambda: breach_checker.breaker.short_circuited)
+metrics.counter("hibp_rate_limiter_rejections_total", "HIBP requests refused by the local rate limiter",
+                lambda: breach_checker.limiter.rejected)
+metrics.gauge("hibp_circuit_open", "1 while the HIBP circuit breaker is open or probing",
+              lambda: int(breach_checker.breaker.state != CircuitBreaker.CLOSED))
+metrics.gauge("hibp_rate_limit", "Current adaptive HIBP request rate (requests/s, 0 = unlimited)",
+              lambda: breach_checker.limiter.rate)
+metrics.gauge("hibp_inflight_requests", "HIBP range requests in flight",
+              lambda: breach_checker.upstream_inflight)
+metrics.gauge("hibp_pool_connections", "HTTP connections to HIBP by state", pool_gauge)
+metrics.counter("client_rate_limited_total", "Requests refused with 429 by the per-client limit",
+                lambda: [({"class": name}, limiter.rejected) for name, limiter in client_limiters.items()])
+metrics.counter("load_shed_total", "Requests refused with 503 by the concurrency limit",
+                lambda: concurrency_limiter.shed)
+metrics.gauge("admission_active_requests", "Rate-limited endpoint requests running",
+              lambda: concurrency_limiter.active)
+metrics.gauge("admission_queued_requests", "Rate-limited endpoint requests waiting for a slot",
+              lambda: concurrency_limiter.queued)
+metrics.gauge("analysis_pool_workers", "Analysis worker processes",
+              lambda: analysis_pool.stats()["workers"])
+metrics.gauge("analysis_pool_busy_chunks", "Chunks queued or running on the analysis pool",
+              lambda: analysis_pool.busy_chunks)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open long-lived resources on startup and release them on shutdown"""
+    await breach_checker.start()
+    analysis_pool.start()
+    yield
+    analysis_pool.close()
+    await breach_checker.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="🔐 Login Security Analyzer API",
     description="Analyze password strength and check for security breaches",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS - Allow all origins in production for flexibility
@@ -33,6 +281,18 @@ origins = [
     frontend_url,
 ]
 
+# Inside CORS (added first), so 429/503 responses still carry CORS headers
+if admission_enabled:
+    app.add_middleware(
+        AdmissionControl,
+        limiters=client_limiters,
+        concurrency=concurrency_limiter,
+        api_keys=[key.strip() for key in os.getenv("CLIENT_API_KEYS", "").split(",") if key.strip()],
+        trust_proxy=trust_proxy_headers,
+        routes=admission_routes,
+        long_lived=("stream",)
+    )
+
 # In production, allow all origins if FRONTEND_URL contains wildcards or for flexibility
 app.add_middleware(
     CORSMiddleware,
@@ -42,11 +302,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-password_analyzer = PasswordAnalyzer()
-breach_checker = BreachChecker()
-password_generator = PasswordGenerator()
-
+# Outermost, so the recorded time covers CORS and error handling as well
+if metrics_enabled:
+    app.add_middleware(RequestTimer, histograms=request_latency)
 
 # ==================== Request/Response Models ====================
 
@@ -79,6 +337,24 @@ class FullAnalysisResponse(BaseModel):
     breached: bool
     breach_count: int
     breach_message: str
+    breach_status: str = "complete"
+
+
+class IncrementalAnalyzeRequest(BaseModel):
+    session_id: Optional[str] = None
+    password: Optional[str] = None
+    append: str = ""
+    delete: int = 0
+
+
+class IncrementalAnalysisResponse(AnalysisResponse):
+    session_id: str
+
+
+class BatchAnalyzeRequest(BaseModel):
+    passwords: List[str]
+    check_breaches: bool = False
+    include_feedback: bool = False
 
 
 class GenerateRequest(BaseModel):
@@ -90,14 +366,94 @@ class GenerateRequest(BaseModel):
     exclude_ambiguous: bool = True
 
 
+class GenerateBatchRequest(GenerateRequest):
+    count: int = 100
+    analyze: bool = False
+
+
+class PassphraseRequest(BaseModel):
+    word_count: int = 6
+    separator: str = "-"
+    capitalize: bool = True
+
+
+class PassphraseBatchRequest(PassphraseRequest):
+    count: int = 100
+
+
+class PassphraseResponse(BaseModel):
+    passphrase: str
+    entropy_bits: float
+    word_count: int
+    wordlist_size: int
+
+
 class GenerateResponse(BaseModel):
     password: str
     score: int
     strength: str
+    entropy_bits: float
+
+
+class CompactAnalysisResponse(BaseModel):
+    score: int
+    strength: str
+    length: int
+    flags: int
+    issues: List[str]
+    guesses_log10: Optional[float] = None
+
+
+class CompactFullAnalysisResponse(CompactAnalysisResponse):
+    breached: bool
+    breach_count: int
+    breach_status: str = "complete"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed"""
+    
+    def render(self, content) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+def analysis_response(result: dict, compact: bool = False) -> FastJSONResponse:
+    """
+    Serialize an analysis result as is, or its compact form.
+    
+    Returning a Response skips response_model validation and
+    serialization: the results are already plain JSON-ready dicts, so
+    the models only document the schema.
+    """
+    return FastJSONResponse(compact_result(result) if compact else result)
 
 
 # ==================== API Endpoints ====================
 
+async def add_guess_estimate(result: dict, password: str) -> dict:
+    """Add the guess estimate to a result analyzed with estimate=False, off the event loop for long passwords"""
+    if guess_estimator is not None and password:
+        if len(password) > guess_estimator_inline_length:
+            estimate = await asyncio.to_thread(guess_estimator.estimate, password)
+        else:
+            estimate = guess_estimator.estimate(password)
+        result["details"]["guess_estimate"] = estimate
+    return result
+
+
+async def analyze_cached(password: str) -> dict:
+    """PasswordAnalyzer.analyze behind the result cache"""
+    result = analysis_cache.get(password)
+    if result is None:
+        started = time.perf_counter()
+        result = await add_guess_estimate(password_analyzer.analyze(password, estimate=False), password)
+        analyze_latency.since(started)
+        analysis_cache.put(password, result)
+    return result
+
+
 @app.get("/")
 async def root():
     """Health check and API info"""
@@ -109,7 +465,17 @@ async def root():
             "analyze": "/api/analyze",
             "breach": "/api/breach-check",
             "full": "/api/full-analysis",
+            "batch": "/api/analyze/batch",
+            "incremental": "/api/analyze/incremental",
+            "messages": "/api/messages",
+            "audit": "/api/audit/stream",
+            "live": "/ws/analyze",
             "generate": "/api/generate",
+            "generate_batch": "/api/generate/batch",
+            "passphrase": "/api/passphrase",
+            "passphrase_batch": "/api/passphrase/batch",
+            "stats": "/api/stats",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -121,14 +487,156 @@ async def health_check():
     return {"status": "healthy", "service": "login-security-analyzer"}
 
 
-@app.post("/api/analyze", response_model=AnalysisResponse)
-async def analyze_password(request: PasswordRequest):
+@app.get("/api/stats")
+async def stats():
+    """Cache counters for sizing and monitoring"""
+    return {
+        "breach_cache": breach_checker.cache_stats(),
+        "breach_coalescing": breach_checker.coalescing_stats(),
+        "breach_upstream": breach_checker.upstream_stats(),
+        "breach_pool": breach_checker.pool_stats(),
+        "breach_filter": breach_checker.filter_stats(),
+        "analysis_pool": analysis_pool.stats(),
+        "analysis_sessions": analysis_sessions.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "full_analysis_cache": full_analysis_cache.stats(),
+        "guess_estimator": guess_estimator.stats() if guess_estimator is not None else None,
+        "admission": {
+            "enabled": admission_enabled,
+            "concurrency": concurrency_limiter.stats(),
+            "clients": {name: limiter.stats() for name, limiter in client_limiters.items()}
+        }
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    if not metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/api/analyze", response_model=Union[AnalysisResponse, CompactAnalysisResponse])
+async def analyze_password(request: PasswordRequest, compact: bool = False):
     """
     Analyze password strength without breach checking.
     Fast and doesn't require external API calls.
+    
+    With ?compact=true, feedback and suggestions are replaced by issue
+    codes and details by bit flags (tables at /api/messages).
     """
-    result = password_analyzer.analyze(request.password)
-    return result
+    return analysis_response(await analyze_cached(request.password), compact)
+
+
+@app.get("/api/messages")
+async def messages():
+    """Tables for compact results: flag bit names and the messages per issue code"""
+    return {
+        "flags": list(DETAIL_FLAGS),
+        "issues": {
+            code: {"feedback": feedback, "suggestion": suggestion}
+            for code, (feedback, suggestion) in MESSAGES.items()
+        }
+    }
+
+
+@app.post("/api/analyze/incremental", response_model=IncrementalAnalysisResponse)
+async def analyze_incremental(request: IncrementalAnalyzeRequest):
+    """
+    Keystroke-by-keystroke strength analysis that sends only the edit.
+    
+    Start with the full password (or an empty one) and no session_id; later
+    calls send the session_id with the characters to delete from the end
+    and/or append. The server keeps the scan state per position, so each
+    call costs O(edit). A 404 means the session expired: resend the full
+    password without a session_id.
+    """
+    try:
+        session_id, result = analysis_sessions.update(
+            session_id=request.session_id,
+            password=request.password,
+            append=request.append,
+            delete=request.delete,
+            estimate=False
+        )
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Unknown or expired session; resend the full password")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    await add_guess_estimate(result, analysis_sessions.password(session_id))
+    return {**result, "session_id": session_id}
+
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Analyze many passwords in one call (password-hygiene audits).
+    
+    Returns a compact array in input order: score and strength per item,
+    breach status when check_breaches is set (each SHA-1 prefix is fetched
+    once per batch), and an "error" string for items that couldn't be
+    processed.
+    """
+    passwords = request.passwords
+    if len(passwords) > max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(passwords)} passwords (max {max_batch_size})"
+        )
+    
+    results = await batch_analyzer.analyze(
+        passwords,
+        check_breaches=request.check_breaches,
+        include_feedback=request.include_feedback
+    )
+    
+    # Skip response_model validation: thousands of items would dominate the cost
+    return FastJSONResponse({"count": len(results), "results": results})
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that may keep reading the request body while it sends.
+    
+    The stock class listens for disconnects on older ASGI servers, which
+    swallows the body messages the generator still needs. A disconnect
+    still surfaces here as ClientDisconnect from request.stream().
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/api/audit/stream")
+async def audit_stream(
+    request: Request,
+    check_breaches: bool = False,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    input_format: Optional[Literal["lines", "ndjson"]] = Query(None, alias="format")
+):
+    """
+    Bulk audit of a newline-delimited password list or NDJSON body.
+    
+    The request body is consumed incrementally and results are streamed
+    back as NDJSON, one chunk of lines at a time, so arbitrarily large
+    dumps can be audited with bounded memory. ?format=lines (one raw
+    password per line) or ?format=ndjson; without it, a Content-Type of
+    application/x-ndjson means ndjson and anything else lines. See
+    app.audit for formats.
+    """
+    if input_format is None:
+        content_type = request.headers.get("content-type", "")
+        input_format = "ndjson" if content_type.startswith("application/x-ndjson") else "lines"
+    
+    async def results():
+        async for chunk in audit(request.stream(), batch_analyzer, check_breaches, chunk_size, input_format):
+            yield "".join(json.dumps(item) + "\n" for item in chunk)
+    
+    return DuplexStreamingResponse(results(), media_type="application/x-ndjson")
 
 
 @app.post("/api/breach-check", response_model=BreachCheckResponse)
@@ -141,25 +649,139 @@ async def check_breach(request: PasswordRequest):
     return result
 
 
-@app.post("/api/full-analysis", response_model=FullAnalysisResponse)
-async def full_analysis(request: PasswordRequest):
+@app.post("/api/full-analysis", response_model=Union[FullAnalysisResponse, CompactFullAnalysisResponse])
+async def full_analysis(request: PasswordRequest, compact: bool = False):
     """
     Complete analysis: strength check + breach detection.
     This is the recommended endpoint for comprehensive analysis.
+    
+    The breach lookup runs concurrently with the strength analysis. If it
+    misses the latency budget, the strength result is returned with
+    breach_status "pending" and the lookup keeps running in the background
+    so the next call for the same password is answered from the cache.
+    ?compact=true works as for /api/analyze and drops breach_message.
     """
+    cached = full_analysis_cache.get(request.password)
+    if cached is not None:
+        return analysis_response(cached, compact)
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + full_analysis_budget
+    
+    # Start the breach check first so its network wait overlaps the analysis
+    breach_task = asyncio.create_task(breach_checker.check(request.password))
+    await asyncio.sleep(0)
+    
     # Get strength analysis
-    strength_result = password_analyzer.analyze(request.password)
+    strength_result = await analyze_cached(request.password)
     
-    # Check for breaches
-    breach_result = await breach_checker.check(request.password)
+    # Wait for the breach check, at most until the deadline
+    try:
+        if full_analysis_budget > 0:
+            breach_result = await asyncio.wait_for(
+                asyncio.shield(breach_task),
+                timeout=max(0.0, deadline - loop.time())
+            )
+        else:
+            breach_result = await breach_task
+    except asyncio.TimeoutError:
+        # Keep a reference so the lookup finishes and warms the cache
+        background_tasks.add(breach_task)
+        breach_task.add_done_callback(background_tasks.discard)
+        return analysis_response({
+            **strength_result,
+            "breached": False,
+            "breach_count": 0,
+            "breach_message": "⏳ Breach check is taking longer than usual. Try again in a moment.",
+            "breach_status": "pending"
+        }, compact)
     
     # Combine results
-    return {
+    result = {
         **strength_result,
         "breached": breach_result["breached"],
         "breach_count": breach_result["breach_count"],
-        "breach_message": breach_result["message"]
+        "breach_message": breach_result["message"],
+        "breach_status": "error" if breach_result.get("error") else "complete"
     }
+    if not breach_result.get("error"):
+        full_analysis_cache.put(request.password, result)
+    return analysis_response(result, compact)
+
+
+@app.websocket("/ws/analyze")
+async def live_analysis(websocket: WebSocket):
+    """
+    Live analysis over one connection instead of a POST per keystroke.
+    
+    Client messages are JSON objects with an optional "id" echoed back and
+    either "password" (full text) or "delete"/"append" edits at the end of
+    the text sent so far; "check_breaches" (default true) asks for a breach
+    lookup. Every message gets a {"type": "strength"} reply right away and,
+    if requested, a {"type": "breach"} reply once the lookup resolves. A
+    newer message cancels the previous breach reply (latest wins); the
+    upstream fetch itself still completes and warms the cache. Each
+    connection may send WS_MESSAGE_RATE messages per second (after a burst
+    of WS_MESSAGE_BURST); faster clients are slowed down by not reading
+    their next message until the budget refills, so no edit is dropped.
+    """
+    await websocket.accept()
+    session = AnalysisSession()
+    send_lock = asyncio.Lock()
+    message_budget = TokenBucket(ws_message_rate, ws_message_burst, max_wait=float("inf"))
+    breach_task: Optional[asyncio.Task] = None
+    
+    async def send(message: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(message)
+    
+    async def send_breach(message_id, password: str) -> None:
+        result = await breach_checker.check(password)
+        await send({"type": "breach", "id": message_id, **result})
+    
+    try:
+        while True:
+            await message_budget.acquire()
+            try:
+                message = json.loads(await websocket.receive_text())
+                if not isinstance(message, dict):
+                    raise ValueError("Expected a JSON object")
+                message_id = message.get("id")
+                
+                password = message.get("password")
+                if password is not None:
+                    edits, delete = password, len(session.chars)
+                else:
+                    edits, delete = message.get("append", ""), message.get("delete", 0)
+                # bool is an int subclass: reject true/false as a delete count
+                if not isinstance(edits, str) or not isinstance(delete, int) or isinstance(delete, bool):
+                    raise ValueError("password/append must be strings and delete an integer")
+                check_breaches = message.get("check_breaches", True)
+                if not isinstance(check_breaches, bool):
+                    raise ValueError("check_breaches must be true or false")
+                if len(session.chars) - delete + len(edits) > max_password_length:
+                    raise ValueError(f"Password longer than {max_password_length} characters")
+                session.delete(delete)
+                session.append(password_analyzer, edits)
+            except ValueError as e:
+                await send({"type": "error", "detail": str(e)})
+                continue
+            
+            if breach_task is not None and not breach_task.done():
+                breach_task.cancel()
+            
+            current = session.password
+            result = password_analyzer.analyze_state(current, session.states[-1], estimate=False)
+            await add_guess_estimate(result, current)
+            await send({"type": "strength", "id": message_id, **result})
+            
+            if check_breaches:
+                breach_task = asyncio.create_task(send_breach(message_id, current))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if breach_task is not None and not breach_task.done():
+            breach_task.cancel()
 
 
 @app.post("/api/generate", response_model=GenerateResponse)
@@ -167,25 +789,120 @@ async def generate_password(request: GenerateRequest):
     """
     Generate a secure random password with specified criteria.
     """
-    password = password_generator.generate(
-        length=request.length,
+    # Tables and entropy are precomputed once per option combination
+    spec = password_generator.spec(
         uppercase=request.include_uppercase,
         lowercase=request.include_lowercase,
         numbers=request.include_numbers,
         symbols=request.include_symbols,
         exclude_ambiguous=request.exclude_ambiguous
     )
+    password = spec.generate(1, request.length)[0]
     
-    # Analyze the generated password
-    analysis = password_analyzer.analyze(password)
+    # Analyze the generated password (cached: users often analyze it next)
+    analysis = await analyze_cached(password)
     
-    return {
+    return FastJSONResponse({
         "password": password,
         "score": analysis["score"],
-        "strength": analysis["strength"]
+        "strength": analysis["strength"],
+        "entropy_bits": round(spec.entropy_bits(request.length), 2)
+    })
+
+
+@app.post("/api/generate/batch")
+async def generate_batch(request: GenerateBatchRequest):
+    """
+    Generate many passwords at once for provisioning jobs.
+    
+    Returns {"count", "entropy_bits", "passwords"}; with analyze set,
+    "results" with score and strength per password (analyzed as one batch)
+    replaces "passwords".
+    """
+    if request.count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1")
+    if request.count > max_generate_batch:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {request.count} passwords (max {max_generate_batch})"
+        )
+    
+    spec = password_generator.spec(
+        uppercase=request.include_uppercase,
+        lowercase=request.include_lowercase,
+        numbers=request.include_numbers,
+        symbols=request.include_symbols,
+        exclude_ambiguous=request.exclude_ambiguous
+    )
+    if request.count > 1000:
+        # Large batches are generated off the event loop
+        passwords = await asyncio.to_thread(spec.generate, request.count, request.length)
+    else:
+        passwords = spec.generate(request.count, request.length)
+    entropy_bits = round(spec.entropy_bits(request.length), 2)
+    
+    if not request.analyze:
+        return FastJSONResponse({"count": len(passwords), "entropy_bits": entropy_bits, "passwords": passwords})
+    
+    analyzed = await analysis_pool.analyze_many(passwords, ("score", "strength"))
+    results = [{"password": p, **a} for p, a in zip(passwords, analyzed)]
+    return FastJSONResponse({"count": len(results), "entropy_bits": entropy_bits, "results": results})
+
+
+def check_separator(separator: str) -> None:
+    if len(separator) > 5:
+        raise HTTPException(status_code=400, detail="separator must be at most 5 characters")
+
+
+@app.post("/api/passphrase", response_model=PassphraseResponse)
+async def generate_passphrase(request: PassphraseRequest):
+    """
+    Generate a diceware-style passphrase from the configured wordlist.
+    """
+    check_separator(request.separator)
+    word_count = max(1, min(MAX_WORDS, request.word_count))
+    passphrase = password_generator.generate_passphrase(word_count, request.separator, request.capitalize)
+    
+    return {
+        "passphrase": passphrase,
+        "entropy_bits": round(password_generator.passphrase_entropy_bits(word_count), 2),
+        "word_count": word_count,
+        "wordlist_size": len(password_generator.wordlist)
     }
 
 
+@app.post("/api/passphrase/batch")
+async def generate_passphrase_batch(request: PassphraseBatchRequest):
+    """
+    Generate many passphrases at once; every word index is drawn in one batch.
+    
+    Returns {"count", "entropy_bits", "word_count", "wordlist_size", "passphrases"}.
+    """
+    check_separator(request.separator)
+    if request.count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1")
+    if request.count > max_generate_batch:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {request.count} passphrases (max {max_generate_batch})"
+        )
+    
+    word_count = max(1, min(MAX_WORDS, request.word_count))
+    args = (request.count, word_count, request.separator, request.capitalize)
+    if request.count > 1000:
+        # Large batches are generated off the event loop
+        passphrases = await asyncio.to_thread(password_generator.generate_passphrases, *args)
+    else:
+        passphrases = password_generator.generate_passphrases(*args)
+    
+    return FastJSONResponse({
+        "count": len(passphrases),
+        "entropy_bits": round(password_generator.passphrase_entropy_bits(word_count), 2),
+        "word_count": word_count,
+        "wordlist_size": len(password_generator.wordlist),
+        "passphrases": passphrases
+    })
+
 # ==================== Run Server ====================
 
 if __name__ == "__main__":
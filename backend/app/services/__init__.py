@@ -2,5 +2,18 @@
 from .password_analyzer import PasswordAnalyzer
 from .breach_checker import BreachChecker
 from .password_generator import PasswordGenerator
+from .range_cache import RangeCache
+from .offline_index import OfflineIndex
+from .breach_filter import XorFilter
+from .common_passwords import CommonPasswordList
+from .guess_estimator import GuessEstimator
+from .result_cache import ResultCache
+from .wordlist import Wordlist
+from .cache_backends import MemoryBackend, SQLiteBackend, RedisBackend, TieredBackend
 
-__all__ = ["PasswordAnalyzer", "BreachChecker", "PasswordGenerator"]
+__all__ = [
+    "PasswordAnalyzer", "BreachChecker", "PasswordGenerator",
+    "RangeCache", "OfflineIndex", "XorFilter", "CommonPasswordList",
+    "GuessEstimator", "ResultCache", "Wordlist",
+    "MemoryBackend", "SQLiteBackend", "RedisBackend", "TieredBackend"
+]
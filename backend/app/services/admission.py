@@ -0,0 +1,271 @@
+"""
+Admission Control
+Per-client rate limits and load shedding in front of the expensive
+endpoints: token buckets kept in a fixed-size sketch (bounded memory no
+matter how many clients show up) and a concurrency cap with a short queue
+that turns overload into fast 503s instead of growing latency
+"""
+
+import asyncio
+import json
+import math
+import time
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_SALTS = (0x243F6A8885A308D3, 0x13198A2E03707344, 0xA4093822299F31D0,
+          0x082EFA98EC4E6C89, 0x452821E638D01377, 0xBE5466CF34E90C6C,
+          0xC0AC29B7C97C50DD, 0x3F84D5B5B5470917)
+
+
+class Overloaded(Exception):
+    """The concurrency limit and its queue are full"""
+
+
+class ClientRateLimiter:
+    """
+    Approximate per-client token buckets in a count-min style sketch.
+
+    depth rows of width buckets; a client maps to one bucket per row (by
+    Python's per-process randomized string hash, so collisions can't be
+    aimed). A request is allowed if the client's fullest bucket has a
+    token, and then charges every one of its buckets. Colliding clients
+    share charges, so the error is only ever towards limiting too much,
+    and only when all depth buckets collide with busy clients.
+
+    Memory is 16 bytes per bucket: 4 x 4096 buckets is 256 KB.
+    """
+
+    def __init__(self, rate: float, burst: float, width: int = 4096, depth: int = 4):
+        """
+        Args:
+            rate: Tokens per second per client
+            burst: Bucket capacity (requests allowed back to back)
+            width: Buckets per row (rounded up to a power of two)
+            depth: Rows, at most 8
+        """
+        if not 1 <= depth <= len(_SALTS):
+            raise ValueError(f"Sketch depth must be between 1 and {len(_SALTS)}")
+        self.rate = rate
+        self.burst = float(burst)
+        bits = max(1, math.ceil(math.log2(max(2, width))))
+        self.width = 1 << bits
+        self.depth = depth
+        self._shift = 64 - bits
+        self._rows = [(salt, row * self.width) for row, salt in enumerate(_SALTS[:depth])]
+        self._tokens = array("d", [self.burst]) * (self.width * depth)
+        self._updated = array("d", [0.0]) * (self.width * depth)
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """
+        Take a token for key.
+
+        Returns:
+            0.0 if the request is allowed, else the seconds until it would be
+        """
+        now = time.monotonic()
+        h = hash(key)
+        shift = self._shift
+        cells = [offset + ((((h ^ salt) * _GOLDEN) & _MASK64) >> shift) for salt, offset in self._rows]
+        tokens, updated, rate, burst = self._tokens, self._updated, self.rate, self.burst
+        best = 0.0
+        for cell in cells:
+            level = tokens[cell] + (now - updated[cell]) * rate
+            if level > burst:
+                level = burst
+            tokens[cell] = level
+            updated[cell] = now
+            if level > best:
+                best = level
+
+        if best < 1.0:
+            self.rejected += 1
+            return (1.0 - best) / rate
+        for cell in cells:
+            tokens[cell] -= 1.0
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "buckets": self.width * self.depth,
+            "bytes": self._tokens.itemsize * len(self._tokens) * 2,
+            "allowed": self.allowed,
+            "rejected": self.rejected
+        }
+
+
+class ConcurrencyLimiter:
+    """
+    At most max_concurrent requests run; up to max_queue more wait (for at
+    most queue_timeout seconds) and the rest are refused with Overloaded.
+    """
+
+    def __init__(self, max_concurrent: int = 64, max_queue: int = 128, queue_timeout: float = 1.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.queued = 0
+        self.shed = 0
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                raise Overloaded()
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                raise Overloaded()
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "shed": self.shed
+        }
+
+
+async def _send_error(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControl:
+    """
+    ASGI middleware applying ClientRateLimiter and a shared
+    ConcurrencyLimiter to the listed routes; other paths pass straight
+    through.
+
+    Routes are path prefixes (matched on whole segments, longest first)
+    mapped to a cost class, and each class has one limiter, so sub-routes
+    such as /api/generate/batch can't slip past a limit on /api/generate.
+    WebSocket handshakes are rate-limited too (refused with close code
+    1008); they, and HTTP routes in a long_lived class, skip the
+    concurrency cap since they hold their slot for minutes.
+
+    Clients are identified by a known API key (X-API-Key) when one is sent,
+    otherwise by IP - the last X-Forwarded-For entry (the address our proxy
+    saw) when trust_proxy is set, else the socket peer. Unknown keys count
+    as their IP, so inventing keys doesn't buy a fresh bucket.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiters: Dict[str, ClientRateLimiter],
+        concurrency: Optional[ConcurrencyLimiter] = None,
+        api_keys: Iterable[str] = (),
+        trust_proxy: bool = False,
+        routes: Optional[Dict[str, str]] = None,
+        long_lived: Iterable[str] = ()
+    ):
+        """
+        Args:
+            limiters: Limiter per cost class
+            routes: Path prefix -> cost class; by default every limiter key
+                is itself a path prefix
+            long_lived: Cost classes exempt from the concurrency cap
+        """
+        self.app = app
+        self.limiters = limiters
+        self.concurrency = concurrency
+        self.api_keys = frozenset(api_keys)
+        self.trust_proxy = trust_proxy
+        self.long_lived = frozenset(long_lived)
+        if routes is None:
+            routes = {prefix: prefix for prefix in limiters}
+        self._routes: Dict[str, Tuple[str, ClientRateLimiter]] = {
+            prefix.rstrip("/"): (cost_class, limiters[cost_class])
+            for prefix, cost_class in routes.items()
+        }
+
+    def route(self, path: str) -> Optional[Tuple[str, ClientRateLimiter]]:
+        """(cost class, limiter) of the longest listed prefix of path"""
+        while path:
+            found = self._routes.get(path)
+            if found is not None:
+                return found
+            path = path.rpartition("/")[0]
+        return None
+
+    def client_key(self, scope) -> str:
+        forwarded = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                key = value.decode("latin-1")
+                if key in self.api_keys:
+                    return "key:" + key
+            elif name == b"x-forwarded-for" and self.trust_proxy:
+                # The proxy appends the peer it saw; earlier entries are client-supplied
+                forwarded = value.decode("latin-1").rsplit(",", 1)[-1].strip()
+        if forwarded:
+            return "ip:" + forwarded
+        client: Optional[Tuple[str, int]] = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send) -> None:
+        kind = scope["type"]
+        if kind == "http":
+            found = self.route(scope["path"]) if scope["method"] != "OPTIONS" else None
+        elif kind == "websocket":
+            found = self.route(scope["path"])
+        else:
+            found = None
+        if found is None:
+            await self.app(scope, receive, send)
+            return
+        cost_class, limiter = found
+
+        retry_after = limiter.acquire(self.client_key(scope))
+        if retry_after:
+            if kind == "websocket":
+                await receive()
+                await send({"type": "websocket.close", "code": 1008,
+                            "reason": "Too many connections; slow down"})
+            else:
+                await _send_error(send, 429, "Too many requests; slow down", retry_after)
+            return
+
+        if self.concurrency is None or kind == "websocket" or cost_class in self.long_lived:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.concurrency.acquire()
+        except Overloaded:
+            await _send_error(send, 503, "Server is busy; try again shortly", 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
@@ -0,0 +1,134 @@
+"""
+Analysis Pool Service
+Runs PasswordAnalyzer over large inputs on a pool of worker processes,
+keeping the event loop free and using more than one core per server worker
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .password_analyzer import PasswordAnalyzer
+
+# Per-process analyzer, installed by the pool initializer
+_worker_analyzer: Optional[PasswordAnalyzer] = None
+
+
+def _init_worker(analyzer: PasswordAnalyzer) -> None:
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_chunk(passwords: List[str], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    """Analyze one chunk inside a worker, keeping only the requested fields"""
+    return _project(_worker_analyzer, passwords, fields)
+
+
+def _project(
+    analyzer: PasswordAnalyzer,
+    passwords: List[str],
+    fields: Optional[Sequence[str]]
+) -> List[Dict[str, Any]]:
+    if fields is None:
+        return [analyzer.analyze(p) for p in passwords]
+    # The guess estimate only appears under "details"
+    estimate = "details" in fields
+    results = []
+    for password in passwords:
+        analysis = analyzer.analyze(password, estimate)
+        results.append({field: analysis[field] for field in fields})
+    return results
+
+
+class AnalysisPool:
+    """Chunked, multi-process execution of PasswordAnalyzer.analyze"""
+
+    def __init__(
+        self,
+        analyzer: PasswordAnalyzer,
+        workers: int = 0,
+        chunk_size: int = 1000,
+        inline_threshold: int = 256
+    ):
+        """
+        Args:
+            analyzer: Analyzer used inline and copied into every worker
+            workers: Worker processes; 0 disables the pool (large inputs then
+                run on a thread so the event loop still isn't blocked)
+            chunk_size: Passwords sent to a worker per task
+            inline_threshold: Inputs this small are analyzed inline - shipping
+                them to another process costs more than the analysis
+        """
+        self.analyzer = analyzer
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.busy_chunks = 0
+
+    @staticmethod
+    def workers_from_env(value: str) -> int:
+        """Parse a worker count setting: a number, or "auto" for one per core"""
+        if value.strip().lower() == "auto":
+            return os.cpu_count() or 1
+        return max(0, int(value or 0))
+
+    def start(self) -> None:
+        """Spawn the worker processes (called from the app lifespan)"""
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.analyzer,)
+            )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def analyze_many(
+        self,
+        passwords: List[str],
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze a list of passwords, in order.
+
+        Args:
+            passwords: Passwords to analyze
+            fields: Keep only these result keys (smaller results cross the
+                process boundary faster); None keeps the full result
+
+        Returns:
+            One analysis dictionary per password
+        """
+        if len(passwords) <= self.inline_threshold:
+            return _project(self.analyzer, passwords, fields)
+
+        if self._executor is None:
+            return await asyncio.to_thread(_project, self.analyzer, passwords, fields)
+
+        loop = asyncio.get_running_loop()
+        chunks = [
+            passwords[i:i + self.chunk_size]
+            for i in range(0, len(passwords), self.chunk_size)
+        ]
+        self.busy_chunks += len(chunks)
+        try:
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _analyze_chunk, chunk, fields)
+                for chunk in chunks
+            ))
+        finally:
+            self.busy_chunks -= len(chunks)
+
+        return [result for part in parts for result in part]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "chunk_size": self.chunk_size,
+            "busy_chunks": self.busy_chunks
+        }
@@ -0,0 +1,186 @@
+"""
+Analysis Session Service
+Server-side state for keystroke-by-keystroke analysis: clients send only the
+characters appended or deleted since their last call, and each session keeps
+a per-position stack of scan states so either edit costs O(delta)
+Sessions expire after a short TTL and are evicted least-recently-used by size
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .password_analyzer import PasswordAnalyzer, ScanState
+
+# Approximate cost of one typed character: its scan state tuple plus the
+# character itself in the session's list
+POSITION_OVERHEAD_BYTES = 160
+SESSION_OVERHEAD_BYTES = 400
+
+
+class SessionNotFound(KeyError):
+    """The session id is unknown or has expired"""
+
+
+class AnalysisSession:
+    """Password typed so far and the scan state after each character"""
+
+    __slots__ = ("chars", "states")
+
+    def __init__(self):
+        self.chars: List[str] = []
+        self.states: List[ScanState] = [ScanState()]
+
+    @property
+    def password(self) -> str:
+        return "".join(self.chars)
+
+    def delete(self, count: int) -> None:
+        """Drop the last count characters (backspace)"""
+        if count < 0 or count > len(self.chars):
+            raise ValueError(f"Cannot delete {count} characters from a {len(self.chars)}-character password")
+        if count:
+            del self.chars[-count:]
+            del self.states[-count:]
+
+    def append(self, analyzer: PasswordAnalyzer, text: str) -> None:
+        """Type text at the end, one scan step per character"""
+        state = self.states[-1]
+        for ch in text:
+            state = analyzer.step(state, ch)
+            self.chars.append(ch)
+            self.states.append(state)
+
+    def size(self) -> int:
+        return SESSION_OVERHEAD_BYTES + POSITION_OVERHEAD_BYTES * len(self.chars)
+
+
+class SessionStore:
+    """LRU + TTL store of analysis sessions under a memory budget"""
+
+    def __init__(
+        self,
+        analyzer: PasswordAnalyzer,
+        ttl: float = 300.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_length: int = 1024
+    ):
+        """
+        Args:
+            analyzer: Analyzer that steps and scores every session
+            ttl: Seconds of inactivity before a session is forgotten
+            max_bytes: Approximate memory budget for all sessions
+            max_length: Longest password a session may hold
+        """
+        self.analyzer = analyzer
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_length = max_length
+        self._sessions: "OrderedDict[str, Tuple[float, int, AnalysisSession]]" = OrderedDict()
+        self.current_bytes = 0
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def update(
+        self,
+        session_id: Optional[str] = None,
+        password: Optional[str] = None,
+        append: str = "",
+        delete: int = 0,
+        estimate: bool = True
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Apply an edit to a session and analyze the result.
+
+        A password (re)sets the session to that text; otherwise delete then
+        append are applied to its current text. Without a session id a new
+        session is created. estimate=False leaves out the guess estimate.
+
+        Returns:
+            (session_id, analysis result)
+
+        Raises:
+            SessionNotFound: session_id is unknown or expired (and no
+                password was sent to start over)
+            ValueError: the edit is invalid or makes the password too long
+        """
+        if password is not None or session_id is None:
+            # A full password also revives an expired session, under a new id
+            if session_id is None or session_id not in self._sessions:
+                session_id = secrets.token_urlsafe(16)
+                self.created += 1
+            session = AnalysisSession()
+            edits = password if password is not None else append
+        else:
+            session = self._get(session_id)
+            edits = append
+
+        # Validate before touching the session so a rejected edit changes nothing
+        kept = len(session.chars) - (delete if password is None else 0)
+        if kept + len(edits) > self.max_length:
+            raise ValueError(f"Password longer than {self.max_length} characters")
+        if password is None:
+            session.delete(delete)
+        session.append(self.analyzer, edits)
+
+        self._put(session_id, session)
+        return session_id, self.analyzer.analyze_state(session.password, session.states[-1], estimate)
+
+    def password(self, session_id: str) -> str:
+        """Text a session holds (SessionNotFound if unknown or expired)"""
+        return self._get(session_id).password
+
+    def discard(self, session_id: str) -> None:
+        if session_id in self._sessions:
+            self._remove(session_id)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _get(self, session_id: str) -> AnalysisSession:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            raise SessionNotFound(session_id)
+        expires_at, _, session = entry
+        if expires_at <= time.monotonic():
+            self._remove(session_id)
+            self.expirations += 1
+            raise SessionNotFound(session_id)
+        return session
+
+    def _put(self, session_id: str, session: AnalysisSession) -> None:
+        if session_id in self._sessions:
+            self._remove(session_id)
+        size = session.size()
+        self._sessions[session_id] = (time.monotonic() + self.ttl, size, session)
+        self.current_bytes += size
+
+        # Expired sessions sit at the front (every update moves to the end)
+        now = time.monotonic()
+        while self._sessions:
+            oldest, (expires_at, _, _) = next(iter(self._sessions.items()))
+            if expires_at <= now:
+                self._remove(oldest)
+                self.expirations += 1
+            elif self.current_bytes > self.max_bytes and oldest != session_id:
+                self._remove(oldest)
+                self.evictions += 1
+            else:
+                break
+
+    def _remove(self, session_id: str) -> None:
+        _, size, _ = self._sessions.pop(session_id)
+        self.current_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,76 @@
+"""
+Batch Analyzer Service
+Runs strength analysis and grouped breach checks over many passwords
+Shared by the batch endpoint, the streaming audit endpoint and the audit CLI
+"""
+
+from typing import Any, Dict, List, Optional
+
+from .analysis_pool import AnalysisPool
+from .breach_checker import BreachChecker
+from .password_analyzer import PasswordAnalyzer
+
+
+class BatchAnalyzer:
+    """Analyze lists of passwords into compact per-item results"""
+
+    def __init__(
+        self,
+        analyzer: PasswordAnalyzer,
+        breach_checker: BreachChecker,
+        max_password_length: int = 1024,
+        pool: Optional[AnalysisPool] = None
+    ):
+        self.analyzer = analyzer
+        self.breach_checker = breach_checker
+        self.max_password_length = max_password_length
+        self.pool = pool if pool is not None else AnalysisPool(analyzer)
+
+    async def analyze(
+        self,
+        passwords: List[str],
+        check_breaches: bool = False,
+        include_feedback: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze a list of passwords.
+
+        Returns:
+            One compact dictionary per password, in input order: score and
+            strength (plus feedback/suggestions if asked), breached and
+            breach_count when check_breaches is set, or an "error" string
+            for items that couldn't be processed.
+        """
+        valid = [i for i, p in enumerate(passwords) if len(p) <= self.max_password_length]
+        fields = ("score", "strength")
+        if include_feedback:
+            fields += ("feedback", "suggestions")
+
+        # CPU-bound: runs on the worker pool (or a thread) for large inputs
+        analyzed = await self.pool.analyze_many([passwords[i] for i in valid], fields)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(passwords)
+        for i, item in zip(valid, analyzed):
+            results[i] = item
+
+        if len(valid) < len(passwords):
+            error = f"Password longer than {self.max_password_length} characters"
+            for i, item in enumerate(results):
+                if item is None:
+                    results[i] = {"error": error}
+
+        if check_breaches:
+            await self.add_breaches(passwords, results)
+
+        return results
+
+    async def add_breaches(self, passwords: List[str], results: List[Dict[str, Any]]) -> None:
+        """Fill in breach status for every item that has no error yet"""
+        valid = [i for i, item in enumerate(results) if "error" not in item]
+        breaches = await self.breach_checker.check_many([passwords[i] for i in valid])
+        for i, breach in zip(valid, breaches):
+            if breach.get("error"):
+                results[i]["error"] = breach["message"]
+            else:
+                results[i]["breached"] = breach["breached"]
+                results[i]["breach_count"] = breach["breach_count"]
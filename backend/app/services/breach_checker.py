@@ -4,9 +4,47 @@ Checks passwords against Have I Been Pwned database
 Uses k-anonymity to protect the password
 """
 
+import asyncio
 import hashlib
+import time
 import httpx
-from typing import Dict
+from typing import Dict, List, Optional, Tuple, Union
+
+from .breach_filter import XorFilter
+from .cache_backends import CacheBackend, MemoryBackend
+from .metrics import Histogram
+from .offline_index import OfflineIndex
+from .range_cache import RangeCache
+from .single_flight import SingleFlight
+from .upstream_guard import (
+    CircuitBreaker, TokenBucket, UpstreamUnavailable, backoff_delay, parse_retry_after
+)
+
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def parse_range(body: bytes) -> Dict[str, int]:
+    """
+    Parse a range body ("HASH_SUFFIX:COUNT" per line) into {suffix: count}.
+    
+    Works in a single pass over the raw bytes: one decode, one split into
+    alternating suffix/count fields, no per-line split() or upper().
+    Padding entries (count 0) are dropped.
+    """
+    fields = iter(body.decode('ascii').upper().replace(':', '\n').split())
+    return {suffix: int(count) for suffix, count in zip(fields, fields) if count != '0'}
+
+
+class RangeStatusError(Exception):
+    """The range API answered with a non-200 status"""
+    
+    def __init__(self, status_code: int):
+        super().__init__(f"HIBP range API returned HTTP {status_code}")
+        self.status_code = status_code
 
 
 class BreachChecker:
@@ -14,6 +52,144 @@ class BreachChecker:
     
     HIBP_API_URL = "https://api.pwnedpasswords.com/range/"
     
+    # Lookup modes: the range API only, a local index only, or the local
+    # index first with the API answering anything the index doesn't know
+    MODES = ("online", "offline", "offline-then-online")
+    
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[Union[CacheBackend, RangeCache]] = None,
+        offline_index: Optional[OfflineIndex] = None,
+        mode: str = "online",
+        breach_filter: Optional[XorFilter] = None,
+        rate_limit: float = 0.0,
+        rate_burst: int = 10,
+        rate_max_wait: float = 1.0,
+        max_retries: int = 2,
+        retry_budget: float = 3.0,
+        backoff_base: float = 0.1,
+        backoff_cap: float = 2.0,
+        breaker_failure_ratio: float = 0.5,
+        breaker_window: int = 100,
+        breaker_reset: float = 30.0
+    ):
+        """
+        Args:
+            api_url: Base URL of the range API (override to point at a local stand-in)
+            timeout: Overall read/write/pool timeout in seconds
+            connect_timeout: TCP + TLS connect timeout in seconds
+            max_connections: Maximum concurrent connections in the pool
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept alive
+            http2: Negotiate HTTP/2 when the h2 package is installed
+            transport: Custom httpx transport (e.g. an ASGI stand-in for the range API)
+            cache: Backend for parsed range responses; a bare RangeCache is
+                used in-process (default: a 64 MB / 1 hour in-process cache)
+            offline_index: Memory-mapped local copy of the Pwned Passwords corpus
+            mode: One of MODES
+            breach_filter: Xor filter built from the same corpus; passwords it
+                rejects are reported clean without touching disk or network
+            rate_limit: Outgoing range requests per second (0 = unlimited);
+                halved on every 429 and recovered gradually
+            rate_burst: Requests allowed back to back after an idle period
+            rate_max_wait: Longest a lookup waits for the rate limiter before
+                failing fast, in seconds
+            max_retries: Retries after a 429, 5xx, timeout or connection error
+            retry_budget: No retry is scheduled past this many seconds after
+                the first attempt
+            backoff_base: First retry delay bound in seconds (doubled per retry,
+                full jitter, added to any Retry-After)
+            backoff_cap: Largest backoff delay bound in seconds
+            breaker_failure_ratio: Share of failed upstream requests (among
+                the last breaker_window) that opens the circuit (0 = never);
+                while open, cache misses fail fast
+            breaker_window: Upstream requests the failure share is taken over
+            breaker_reset: Seconds the circuit stays open before a probe
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown breach check mode {mode!r}, expected one of {self.MODES}")
+        if mode != "online" and offline_index is None:
+            raise ValueError(f"Breach check mode {mode!r} needs an offline index")
+        
+        self.api_url = api_url or self.HIBP_API_URL
+        if not self.api_url.endswith("/"):
+            self.api_url += "/"
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.transport = transport
+        if cache is None or isinstance(cache, RangeCache):
+            cache = MemoryBackend(cache)
+        self.cache = cache
+        self._flights = SingleFlight()
+        self.offline_index = offline_index
+        self.mode = mode
+        self.breach_filter = breach_filter
+        self.filter_rejections = 0
+        self.filter_passes = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Upstream protection
+        self.limiter = TokenBucket(rate_limit, rate_burst, rate_max_wait)
+        self.breaker = CircuitBreaker(breaker_failure_ratio, breaker_window, breaker_reset)
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        
+        # Upstream instrumentation (read by the /metrics collectors)
+        self.upstream_latency = Histogram()
+        self.parse_latency = Histogram()
+        self.upstream_inflight = 0
+        self.upstream_requests = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+        self.upstream_errors = 0
+        self.retries = 0
+    
+    async def start(self) -> None:
+        """Open the shared connection pool (called from the app lifespan)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+                headers={
+                    "User-Agent": "LoginSecurityAnalyzer",
+                    "Add-Padding": "true"  # Add padding for extra privacy
+                }
+            )
+    
+    async def close(self) -> None:
+        """Close the shared connection pool, the cache backend and the offline index"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await self.cache.close()
+        if self.offline_index is not None:
+            self.offline_index.close()
+        if self.breach_filter is not None:
+            self.breach_filter.close()
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, opening it lazily if the lifespan didn't"""
+        if self._client is None:
+            await self.start()
+        return self._client
+    
     async def check(self, password: str) -> Dict:
         """
         Check if a password has been exposed in known data breaches.
@@ -24,10 +200,12 @@ class BreachChecker:
         - We check locally if our full hash is in the response
         
         This means the actual password never leaves the client/server.
+        In offline modes the full hash is looked up in the local index and
+        no request is made at all (unless falling back to the API).
         
         Args:
             password: The password to check
-            
+        
         Returns:
             Dictionary with breach status and count
         """
@@ -40,72 +218,294 @@ class BreachChecker:
         
         try:
             # Generate SHA-1 hash of the password
-            sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+            sha1 = hashlib.sha1(password.encode('utf-8'))
+            
+            breach_count = self._local_lookup(sha1.digest())
+            if breach_count is not None:
+                return self._result(breach_count)
+            
+            sha1_hash = sha1.hexdigest().upper()
             
             # Split into prefix (first 5 chars) and suffix (rest)
             prefix = sha1_hash[:5]
             suffix = sha1_hash[5:]
             
-            # Query the API with the prefix only
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.HIBP_API_URL}{prefix}",
-                    headers={
-                        "User-Agent": "LoginSecurityAnalyzer",
-                        "Add-Padding": "true"  # Add padding for extra privacy
-                    }
-                )
-                
-                if response.status_code == 200:
-                    # Parse the response - each line is "HASH_SUFFIX:COUNT"
-                    hashes = response.text.splitlines()
-                    
-                    for line in hashes:
-                        if ':' in line:
-                            hash_suffix, count = line.split(':')
-                            
-                            if hash_suffix.upper() == suffix:
-                                breach_count = int(count)
-                                return {
-                                    "breached": True,
-                                    "breach_count": breach_count,
-                                    "message": self._get_breach_message(breach_count)
-                                }
-                    
-                    # Password not found in breaches
-                    return {
-                        "breached": False,
-                        "breach_count": 0,
-                        "message": "✅ Good news! This password was not found in any known data breaches."
-                    }
-                
-                elif response.status_code == 429:
-                    return {
-                        "breached": False,
-                        "breach_count": 0,
-                        "message": "⚠️ Rate limited. Please try again later."
-                    }
-                
+            # Look up the range for the prefix only (cached, then upstream)
+            counts = await self._get_range(prefix)
+            return self._result(counts.get(suffix, 0))
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def check_many(self, passwords: List[str], max_concurrency: int = 20) -> List[Dict]:
+        """
+        Check a batch of passwords, fetching each distinct prefix only once.
+        
+        Passwords are hashed and answered locally (filter / offline index)
+        where possible; the rest are grouped by SHA-1 prefix and the ranges
+        fetched concurrently, at most max_concurrency at a time.
+        
+        Returns:
+            One check() style dictionary per password, in order. Failed
+            lookups carry "error": True alongside the usual message.
+        """
+        results: List[Optional[Dict]] = [None] * len(passwords)
+        by_prefix: Dict[str, List[Tuple[int, str]]] = {}
+        
+        for i, password in enumerate(passwords):
+            if not password:
+                results[i] = await self.check(password)
+                continue
+            
+            sha1 = hashlib.sha1(password.encode('utf-8'))
+            breach_count = self._local_lookup(sha1.digest())
+            if breach_count is not None:
+                results[i] = self._result(breach_count)
+                continue
+            
+            sha1_hash = sha1.hexdigest().upper()
+            by_prefix.setdefault(sha1_hash[:5], []).append((i, sha1_hash[5:]))
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def resolve(prefix: str, items: List[Tuple[int, str]]) -> None:
+            try:
+                async with semaphore:
+                    counts = await self._get_range(prefix)
+            except Exception as e:
+                error = self._error_result(e)
+                for i, _ in items:
+                    results[i] = error
+                return
+            
+            for i, suffix in items:
+                results[i] = self._result(counts.get(suffix, 0))
+        
+        await asyncio.gather(*(resolve(p, items) for p, items in by_prefix.items()))
+        return results
+    
+    def _local_lookup(self, digest: bytes) -> Optional[int]:
+        """
+        Answer from local data when possible.
+        
+        Returns the breach count, or None when the range API must be asked.
+        """
+        # Filter misses are definite: skip the exact lookup entirely
+        if self.breach_filter is not None:
+            if digest not in self.breach_filter:
+                self.filter_rejections += 1
+                return 0
+            self.filter_passes += 1
+        
+        if self.offline_index is not None:
+            breach_count = self.offline_index.lookup(digest)
+            if breach_count or self.mode == "offline":
+                return breach_count
+        
+        return None
+    
+    async def _get_range(self, prefix: str) -> Dict[str, int]:
+        """
+        Return the {suffix: count} map for a prefix, from cache when fresh.
+        
+        Concurrent misses for the same prefix are coalesced into a single
+        upstream request whose parsed result is shared by every waiter.
+        """
+        counts = await self.cache.get(prefix)
+        if counts is not None:
+            return counts
+        
+        return await self._flights.do(prefix, lambda: self._fetch_and_cache(prefix))
+    
+    async def _fetch_and_cache(self, prefix: str) -> Dict[str, int]:
+        counts = await self._fetch_range(prefix)
+        await self.cache.put(prefix, counts)
+        return counts
+    
+    async def _fetch_range(self, prefix: str) -> Dict[str, int]:
+        """
+        Download and parse one range from the API, reusing pooled connections.
+        
+        Requests pass the circuit breaker and the rate limiter first. 429s,
+        5xx responses, timeouts and connection errors are retried with
+        jittered exponential backoff (after any Retry-After) while retries
+        and the retry budget last; other statuses fail at once.
+        
+        Raises:
+            UpstreamUnavailable: the circuit is open or the rate limiter
+                would make the caller wait too long
+            RangeStatusError / httpx.HTTPError: the last attempt failed
+        """
+        client = await self._get_client()
+        url = f"{self.api_url}{prefix}"
+        deadline = time.monotonic() + self.retry_budget
+        attempt = 0
+        
+        while True:
+            ticket = self.breaker.allow()
+            if ticket is None:
+                raise UpstreamUnavailable("HIBP circuit breaker is open")
+            try:
+                # Retries may only wait for a token as long as the budget allows
+                await self.limiter.acquire(deadline - time.monotonic() if attempt else None)
+            except BaseException:
+                self.breaker.release(ticket)
+                raise
+            
+            retry_after = None
+            throttled = False
+            started = time.perf_counter()
+            self.upstream_inflight += 1
+            # Every HTTP attempt, retries included (coalescing counts flights)
+            self.upstream_requests += 1
+            try:
+                response = await client.get(url)
+            except httpx.TransportError as e:
+                if isinstance(e, httpx.TimeoutException):
+                    self.timeouts += 1
+                else:
+                    self.upstream_errors += 1
+                failure: Exception = e
+            except Exception:
+                self.upstream_errors += 1
+                self.breaker.record_failure(ticket)
+                raise
+            except BaseException:
+                self.breaker.release(ticket)
+                raise
+            else:
+                status = response.status_code
+                if status == 200:
+                    self.breaker.record_success(ticket)
+                    self.limiter.reward()
+                    break
+                failure = RangeStatusError(status)
+                if status == 429:
+                    throttled = True
+                    self.rate_limited += 1
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.limiter.penalize(retry_after)
                 else:
-                    return {
-                        "breached": False,
-                        "breach_count": 0,
-                        "message": f"⚠️ Could not check breaches (HTTP {response.status_code})"
-                    }
+                    self.upstream_errors += 1
+                    if status < 500:
+                        # Upstream is up and answered; retrying won't help
+                        self.breaker.record_success(ticket)
+                        raise failure
+            finally:
+                self.upstream_inflight -= 1
+                self.upstream_latency.since(started)
+            
+            if throttled:
+                # Throttling is the limiter's business, not a sign of an outage
+                self.breaker.release(ticket)
+            else:
+                self.breaker.record_failure(ticket)
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap) + (retry_after or 0)
+            if attempt >= self.max_retries or time.monotonic() + delay > deadline:
+                raise failure
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
         
-        except httpx.TimeoutException:
-            return {
-                "breached": False,
-                "breach_count": 0,
-                "message": "⚠️ Breach check timed out. Please try again."
-            }
+        started = time.perf_counter()
+        counts = parse_range(response.content)
+        self.parse_latency.since(started)
+        return counts
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters of the range cache"""
+        return self.cache.stats()
+    
+    def filter_stats(self) -> Optional[Dict]:
+        """Filter size, measured false-positive rate and how often it short-circuits"""
+        if self.breach_filter is None:
+            return None
+        return {
+            **self.breach_filter.stats(),
+            "rejections": self.filter_rejections,
+            "passes": self.filter_passes
+        }
+    
+    def coalescing_stats(self) -> Dict:
+        """Upstream fetches started vs. callers that joined an in-flight fetch"""
+        return self._flights.stats()
+    
+    def upstream_stats(self) -> Dict:
+        """HTTP requests sent, failures by kind, retries, and limiter / circuit breaker state"""
+        return {
+            "requests": self.upstream_requests,
+            "inflight": self.upstream_inflight,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "errors": self.upstream_errors,
+            "retries": self.retries,
+            "limiter": self.limiter.stats(),
+            "breaker": self.breaker.stats()
+        }
+    
+    def pool_stats(self) -> Optional[Dict]:
+        """
+        Open and idle connections in the HTTP pool.
         
-        except Exception as e:
+        None before the pool is opened, when a custom transport (no
+        connection pool) is in use, or if httpx/httpcore internals change:
+        the pool is read through private attributes.
+        """
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return None
+        try:
+            connections = list(connections)
+            idle = sum(1 for connection in connections if connection.is_idle())
+        except (AttributeError, TypeError):
+            return None
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "max_connections": self.limits.max_connections
+        }
+    
+    def _result(self, breach_count: int) -> Dict:
+        """Build the response for a completed lookup"""
+        if breach_count:
             return {
-                "breached": False,
-                "breach_count": 0,
-                "message": f"⚠️ Could not check breaches: Service unavailable"
+                "breached": True,
+                "breach_count": breach_count,
+                "message": self._get_breach_message(breach_count)
             }
+        
+        # Password not found in breaches
+        return {
+            "breached": False,
+            "breach_count": 0,
+            "message": "✅ Good news! This password was not found in any known data breaches."
+        }
+    
+    def _error_result(self, error: Exception) -> Dict:
+        """Build the response for a lookup that couldn't be completed"""
+        if isinstance(error, UpstreamUnavailable):
+            # The local index covers the corpus; the API only adds freshness
+            if self.offline_index is not None:
+                return self._result(0)
+            message = "⚠️ Breach check is temporarily unavailable. Please try again shortly."
+        elif isinstance(error, RangeStatusError):
+            if error.status_code == 429:
+                message = "⚠️ Rate limited. Please try again later."
+            else:
+                message = f"⚠️ Could not check breaches (HTTP {error.status_code})"
+        elif isinstance(error, httpx.TimeoutException):
+            message = "⚠️ Breach check timed out. Please try again."
+        else:
+            message = "⚠️ Could not check breaches: Service unavailable"
+        
+        return {
+            "breached": False,
+            "breach_count": 0,
+            "message": message,
+            "error": True
+        }
     
     def _get_breach_message(self, count: int) -> str:
         """Generate appropriate warning message based on breach count"""
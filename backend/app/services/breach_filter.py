@@ -0,0 +1,396 @@
+"""
+Breach Filter
+8-bit xor filter over breached SHA-1 hashes (~1.23 bytes per entry)
+
+A negative answer is exact: the password is not in the corpus the filter was
+built from. A positive answer is right except for a ~0.39% false-positive
+rate, so hits still go on to the exact range or offline lookup.
+
+Keys are split into 2^shard_bits shards by their top bits, each an
+independent xor filter, so building needs memory for one shard at a time
+(about 100 bytes per key while peeling) rather than for the whole corpus.
+XorFilter.write streams keys into per-shard temporary files and peels the
+shards one after another, or in worker processes. Peeling is pure Python
+(about 10 s per million keys per core): the full HIBP corpus (~1B hashes)
+takes 10 shard bits and hours of CPU, so give it --workers.
+
+File layout (little-endian):
+    header        48 bytes   magic, version, shard bits, key count, measured FPR
+    shard table   16 bytes per shard: seed, block length
+    fingerprints  3 x block length bytes per shard, in shard order
+"""
+
+import mmap
+import math
+import os
+import random
+import struct
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+MAGIC = b"LSAXOR8\0"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQd")
+HEADER_SIZE = 48
+SHARD = struct.Struct("<QQ")
+
+MASK64 = (1 << 64) - 1
+MAX_ATTEMPTS = 100
+
+# Shards are sized for about TARGET_SHARD_KEYS keys; a shard past
+# MAX_SHARD_KEYS (about 400 MB to peel) is refused instead of exhausting memory
+TARGET_SHARD_KEYS = 1 << 20
+MAX_SHARD_KEYS = 1 << 22
+MAX_SHARD_BITS = 16
+
+# Keys buffered per shard before they are appended to its temporary file
+FLUSH_KEYS = 4096
+
+
+def digest_key(digest: bytes) -> int:
+    """64-bit filter key of a SHA-1 digest (SHA-1 output is already uniform)"""
+    return int.from_bytes(digest[:8], "little")
+
+
+def auto_shard_bits(expected_keys: int) -> int:
+    """Shard bits that keep shards near TARGET_SHARD_KEYS for this many keys"""
+    if expected_keys <= TARGET_SHARD_KEYS:
+        return 0
+    return min(MAX_SHARD_BITS, math.ceil(math.log2(expected_keys / TARGET_SHARD_KEYS)))
+
+
+def _mix(key: int, seed: int) -> int:
+    """murmur3 64-bit finalizer of key + seed"""
+    h = (key + seed) & MASK64
+    h ^= h >> 33
+    h = (h * 0xFF51AFD7ED558CCD) & MASK64
+    h ^= h >> 33
+    h = (h * 0xC4CEB9FE1A85EC53) & MASK64
+    h ^= h >> 33
+    return h
+
+
+def _positions(h: int, block_length: int) -> Tuple[int, int, int]:
+    """The three fingerprint slots (one per block) for a mixed hash"""
+    r1 = ((h << 21) | (h >> 43)) & MASK64
+    r2 = ((h << 42) | (h >> 22)) & MASK64
+    return (
+        ((h & 0xFFFFFFFF) * block_length) >> 32,
+        (((r1 & 0xFFFFFFFF) * block_length) >> 32) + block_length,
+        (((r2 & 0xFFFFFFFF) * block_length) >> 32) + 2 * block_length
+    )
+
+
+def _fingerprint(h: int) -> int:
+    return (h ^ (h >> 32)) & 0xFF
+
+
+def _peel(keys: array, seed: int, block_length: int,
+          size: int) -> Optional[Tuple[array, array]]:
+    """Peeling order as parallel arrays of (hash, slot), or None if stuck"""
+    counts = array("I", bytes(4 * size))
+    xor_hashes = array("Q", bytes(8 * size))
+    for key in keys:
+        h = _mix(key, seed)
+        for p in _positions(h, block_length):
+            counts[p] += 1
+            xor_hashes[p] ^= h
+
+    queue = array("I", (i for i in range(size) if counts[i] == 1))
+    stack_hashes, stack_slots = array("Q"), array("I")
+    while queue:
+        slot = queue.pop()
+        if counts[slot] != 1:
+            continue
+        h = xor_hashes[slot]
+        stack_hashes.append(h)
+        stack_slots.append(slot)
+        for p in _positions(h, block_length):
+            counts[p] -= 1
+            xor_hashes[p] ^= h
+            if counts[p] == 1:
+                queue.append(p)
+
+    if len(stack_hashes) != len(keys):
+        return None
+    return stack_hashes, stack_slots
+
+
+def _build_shard(keys: array, seed: int, shard: int, shard_bits: int,
+                 fpr_samples: int = 0) -> Tuple[int, int, int, bytes, int]:
+    """
+    Build one shard from its keys.
+
+    Returns (seed, block_length, distinct keys, fingerprints, false-positive
+    hits among fpr_samples random keys routed to this shard). Uses the
+    standard hypergraph peeling construction, retrying with a new seed on
+    the rare inputs that don't peel completely.
+    """
+    _check_shard_size(len(keys), shard, shard_bits)
+    keys = array("Q", set(keys))
+    n = len(keys)
+    capacity = 32 + (123 * n + 99) // 100
+    block_length = capacity // 3
+    size = 3 * block_length
+    rng = random.Random(seed)
+
+    for _ in range(MAX_ATTEMPTS):
+        seed = rng.getrandbits(64)
+        peeled = _peel(keys, seed, block_length, size)
+        if peeled is not None:
+            break
+    else:
+        raise RuntimeError(f"Could not build xor filter shard {shard}")
+    del keys
+
+    stack_hashes, stack_slots = peeled
+    fingerprints = bytearray(size)
+    for i in range(n - 1, -1, -1):
+        h, slot = stack_hashes[i], stack_slots[i]
+        p0, p1, p2 = _positions(h, block_length)
+        fingerprints[slot] = 0
+        fingerprints[slot] = (_fingerprint(h) ^ fingerprints[p0]
+                              ^ fingerprints[p1] ^ fingerprints[p2])
+
+    # Random low bits under this shard's prefix: the keys a uniform probe
+    # of the whole filter would send here
+    hits = 0
+    prefix = shard << (64 - shard_bits) if shard_bits else 0
+    low_mask = MASK64 >> shard_bits
+    buf = os.urandom(8 * fpr_samples)
+    for i in range(0, len(buf), 8):
+        h = _mix(prefix | (int.from_bytes(buf[i:i + 8], "little") & low_mask), seed)
+        p0, p1, p2 = _positions(h, block_length)
+        hits += _fingerprint(h) == fingerprints[p0] ^ fingerprints[p1] ^ fingerprints[p2]
+
+    return seed, block_length, n, bytes(fingerprints), hits
+
+
+def _build_shard_file(task: Tuple[str, int, int, int, int]) -> Tuple[int, int, int, bytes, int]:
+    """_build_shard over a bucket file (the unit of work for worker processes)"""
+    path, seed, shard, shard_bits, fpr_samples = task
+    keys = array("Q")
+    with open(path, "rb") as f:
+        keys.frombytes(f.read())
+    os.remove(path)
+    return _build_shard(keys, seed, shard, shard_bits, fpr_samples)
+
+
+class XorFilter:
+    """Static membership filter with no false negatives, split into shards"""
+
+    def __init__(self, fingerprints, shards: List[Tuple[int, int]], shard_bits: int,
+                 key_count: int, false_positive_rate: float = 0.0):
+        self._fingerprints = fingerprints
+        self.shard_bits = shard_bits
+        self.key_count = key_count
+        self.false_positive_rate = false_positive_rate
+        self._shift = 64 - shard_bits
+        # (seed, block_length, offset of the shard's fingerprints)
+        self._shards: List[Tuple[int, int, int]] = []
+        offset = 0
+        for seed, block_length in shards:
+            self._shards.append((seed, block_length, offset))
+            offset += 3 * block_length
+        self._size = offset
+        self._file: Optional[BinaryIO] = None
+        self._mm: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, keys: Iterable[int], seed: Optional[int] = None,
+              shard_bits: int = 0) -> "XorFilter":
+        """
+        Build a filter in memory from 64-bit keys (duplicates are ignored).
+
+        Meant for corpora up to a few million keys; past MAX_SHARD_KEYS
+        per shard this raises ValueError, and larger corpora go through
+        XorFilter.write.
+        """
+        _check_shard_bits(shard_bits)
+        buckets = [array("Q") for _ in range(1 << shard_bits)]
+        shift = 64 - shard_bits
+        for key in keys:
+            bucket = buckets[key >> shift]
+            bucket.append(key)
+            if len(bucket) > MAX_SHARD_KEYS:
+                _check_shard_size(len(bucket), key >> shift, shard_bits)
+
+        rng = random.Random(seed)
+        shards, parts, key_count = [], [], 0
+        for shard, bucket in enumerate(buckets):
+            shard_seed, block_length, n, fingerprints, _ = _build_shard(
+                bucket, rng.getrandbits(64), shard, shard_bits)
+            buckets[shard] = None
+            shards.append((shard_seed, block_length))
+            parts.append(fingerprints)
+            key_count += n
+        return cls(b"".join(parts), shards, shard_bits, key_count)
+
+    @classmethod
+    def write(cls, keys: Iterable[int], path: str, shard_bits: int,
+              seed: Optional[int] = None, workers: int = 1,
+              fpr_samples: int = 0, tmp_dir: Optional[str] = None) -> Tuple[int, float]:
+        """
+        Build a filter straight to a file with bounded memory.
+
+        Keys are spilled to one temporary file per shard (under tmp_dir)
+        and each shard is then peeled on its own, in up to `workers`
+        processes, with its fingerprints written out as soon as it is done.
+        Peak memory is about one shard per worker plus FLUSH_KEYS buffered
+        keys per shard. Returns (distinct keys, measured false-positive
+        rate over fpr_samples random probes).
+        """
+        _check_shard_bits(shard_bits)
+        shard_count = 1 << shard_bits
+        shift = 64 - shard_bits
+        rng = random.Random(seed)
+
+        with tempfile.TemporaryDirectory(prefix="xorfilter-", dir=tmp_dir) as work_dir:
+            bucket_paths = [os.path.join(work_dir, f"{shard:05d}.keys") for shard in range(shard_count)]
+            buffers = [array("Q") for _ in range(shard_count)]
+            for key in keys:
+                buffer = buffers[key >> shift]
+                buffer.append(key)
+                if len(buffer) >= FLUSH_KEYS:
+                    _spill(bucket_paths[key >> shift], buffer)
+            for shard, buffer in enumerate(buffers):
+                _spill(bucket_paths[shard], buffer)
+            del buffers
+
+            share, extra = divmod(fpr_samples, shard_count)
+            tasks = [
+                (bucket_paths[shard], rng.getrandbits(64), shard, shard_bits,
+                 share + (shard < extra))
+                for shard in range(shard_count)
+            ]
+
+            tmp_path = path + ".tmp"
+            key_count = hits = 0
+            shards = []
+            with open(tmp_path, "wb") as f:
+                f.seek(HEADER_SIZE + SHARD.size * shard_count)
+                if workers > 1:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        for result in pool.map(_build_shard_file, tasks):
+                            key_count, hits = _write_shard(f, shards, result, key_count, hits)
+                else:
+                    for task in tasks:
+                        key_count, hits = _write_shard(f, shards, _build_shard_file(task),
+                                                       key_count, hits)
+
+                fpr = hits / fpr_samples if fpr_samples else 0.0
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, VERSION, shard_bits, key_count, fpr).ljust(HEADER_SIZE, b"\0"))
+                f.write(b"".join(SHARD.pack(*shard) for shard in shards))
+            os.replace(tmp_path, path)
+
+        return key_count, fpr
+
+    def contains_key(self, key: int) -> bool:
+        seed, block_length, offset = self._shards[key >> self._shift]
+        h = _mix(key, seed)
+        p0, p1, p2 = _positions(h, block_length)
+        f = self._fingerprints
+        return _fingerprint(h) == f[offset + p0] ^ f[offset + p1] ^ f[offset + p2]
+
+    def __contains__(self, digest: bytes) -> bool:
+        """Might this SHA-1 digest be in the corpus? (False is definite)"""
+        return self.contains_key(digest_key(digest))
+
+    def measure_false_positive_rate(self, samples: int = 1_000_000) -> float:
+        """Probe random keys (almost surely absent) and record the hit rate"""
+        buf = os.urandom(8 * samples)
+        hits = sum(
+            self.contains_key(int.from_bytes(buf[i:i + 8], "little"))
+            for i in range(0, len(buf), 8)
+        )
+        self.false_positive_rate = hits / samples if samples else 0.0
+        return self.false_positive_rate
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    @property
+    def bits_per_entry(self) -> float:
+        return 8 * self.size_bytes / self.key_count if self.key_count else 0.0
+
+    def save(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            header = HEADER.pack(MAGIC, VERSION, self.shard_bits,
+                                 self.key_count, self.false_positive_rate)
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            f.write(b"".join(SHARD.pack(seed, block_length) for seed, block_length, _ in self._shards))
+            f.write(self._fingerprints)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "XorFilter":
+        """Memory-map a saved filter"""
+        file = open(path, "rb")
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from("<8sI", mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            file.close()
+            raise ValueError(f"{path} is not a breach filter (v{VERSION})")
+
+        _, _, shard_bits, key_count, fpr = HEADER.unpack_from(mm, 0)
+        start = HEADER_SIZE + (SHARD.size << shard_bits)
+        shards = list(SHARD.iter_unpack(mm[HEADER_SIZE:start]))
+
+        size = sum(3 * block_length for _, block_length in shards)
+        fingerprints = memoryview(mm)[start:start + size]
+        xor_filter = cls(fingerprints, shards, shard_bits, key_count, fpr)
+        xor_filter._file = file
+        xor_filter._mm = mm
+        return xor_filter
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._fingerprints.release()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+            self._file = None
+
+    def stats(self) -> dict:
+        return {
+            "keys": self.key_count,
+            "shards": len(self._shards),
+            "bytes": self.size_bytes,
+            "bits_per_entry": round(self.bits_per_entry, 2),
+            "false_positive_rate": self.false_positive_rate
+        }
+
+
+def _check_shard_bits(shard_bits: int) -> None:
+    if not 0 <= shard_bits <= MAX_SHARD_BITS:
+        raise ValueError(f"shard_bits must be between 0 and {MAX_SHARD_BITS}")
+
+
+def _check_shard_size(keys: int, shard: int, shard_bits: int) -> None:
+    if keys > MAX_SHARD_KEYS:
+        raise ValueError(
+            f"Shard {shard} has over {MAX_SHARD_KEYS:,} keys; use more shard bits "
+            f"(about {auto_shard_bits(keys << shard_bits)} for this corpus)"
+        )
+
+
+def _spill(path: str, buffer: array) -> None:
+    """Append buffered keys to a shard's bucket file and empty the buffer"""
+    with open(path, "ab") as f:
+        buffer.tofile(f)
+    del buffer[:]
+
+
+def _write_shard(f: BinaryIO, shards: List[Tuple[int, int]],
+                 result: Tuple[int, int, int, bytes, int],
+                 key_count: int, hits: int) -> Tuple[int, int]:
+    seed, block_length, n, fingerprints, shard_hits = result
+    f.write(fingerprints)
+    shards.append((seed, block_length))
+    return key_count + n, hits + shard_hits
@@ -0,0 +1,419 @@
+"""
+Range Cache Backends
+Where BreachChecker keeps parsed HIBP ranges: in this process (memory), in a
+SQLite file shared by every worker on the host (sqlite), or in a Redis server
+shared by every host (redis). Shared backends store ranges in a compact
+binary form and sit behind a small in-process cache (TieredBackend).
+
+A shared backend failing (locked file, Redis down) is treated as a cache
+miss: breach checks fall back to the upstream API instead of erroring.
+
+Binary range format (little-endian):
+    count     u32
+    suffixes  count x 18 bytes     35 hex digits + a zero nibble, sorted
+    counts    count x u32, in suffix order
+"""
+
+import asyncio
+import sqlite3
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from .range_cache import RangeCache
+
+_U32 = struct.Struct("<I")
+SUFFIX_BYTES = 18
+
+
+def encode_range(counts: Dict[str, int]) -> bytes:
+    """Pack a {suffix: count} map into the compact binary format"""
+    suffixes = sorted(counts)
+    if any(len(s) != 35 for s in suffixes):
+        raise ValueError("Range suffixes must be 35 hex digits")
+    packed = bytes.fromhex("0".join(suffixes) + "0") if suffixes else b""
+    values = array("I", [counts[s] for s in suffixes])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return _U32.pack(len(suffixes)) + packed + values.tobytes()
+
+
+def decode_range(data: bytes) -> Dict[str, int]:
+    """
+    Unpack a range written by encode_range.
+
+    Raises:
+        ValueError: data is truncated or not in this format
+    """
+    n = _U32.unpack_from(data, 0)[0] if len(data) >= 4 else -1
+    if len(data) != 4 + (SUFFIX_BYTES + 4) * n:
+        raise ValueError("Not an encoded range (truncated or foreign data)")
+    end = 4 + SUFFIX_BYTES * n
+    hexed = data[4:end].hex().upper()
+    values = array("I")
+    values.frombytes(data[end:end + 4 * n])
+    if sys.byteorder == "big":
+        values.byteswap()
+    step = 2 * SUFFIX_BYTES
+    return dict(zip([hexed[i:i + 35] for i in range(0, step * n, step)], values))
+
+
+class CacheBackend(ABC):
+    """Async get/put interface shared by every range cache backend"""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, prefix: str) -> Optional[Dict[str, int]]:
+        """Cached counts for a prefix, or None on a miss (errors count as misses)"""
+
+    @abstractmethod
+    async def put(self, prefix: str, counts: Dict[str, int]) -> None:
+        """Store a range; failures are counted, not raised"""
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Counters for /api/stats"""
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU cache (the default)"""
+
+    name = "memory"
+
+    def __init__(self, cache: Optional[RangeCache] = None):
+        self.cache = cache if cache is not None else RangeCache()
+
+    async def get(self, prefix: str) -> Optional[Dict[str, int]]:
+        return self.cache.get(prefix)
+
+    async def put(self, prefix: str, counts: Dict[str, int]) -> None:
+        self.cache.put(prefix, counts)
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, **self.cache.stats()}
+
+
+class _SharedStats:
+    """Counters common to the shared backends"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def _stats(self, name: str) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class SQLiteBackend(CacheBackend, _SharedStats):
+    """
+    Range cache in a SQLite file shared by the workers of one host.
+
+    WAL mode lets readers proceed while another worker writes; a write that
+    can't get the lock within busy_timeout is simply skipped. Lookups are
+    local-file reads of a few kilobytes, done inline on the event loop.
+    """
+
+    name = "sqlite"
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str, ttl: float = 3600.0, max_entries: int = 200000,
+                 busy_timeout: float = 0.05):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            ttl: Seconds a range stays fresh
+            max_entries: Ranges kept before the soonest-expiring are pruned
+            busy_timeout: Seconds to wait for another worker's write lock
+        """
+        _SharedStats.__init__(self)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.busy_timeout = busy_timeout
+        self._db: Optional[sqlite3.Connection] = None
+        self._puts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                 isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS ranges ("
+                "prefix TEXT PRIMARY KEY, expires_at REAL NOT NULL, data BLOB NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._db = db
+        return self._db
+
+    async def get(self, prefix: str) -> Optional[Dict[str, int]]:
+        counts = None
+        try:
+            row = self._connect().execute(
+                "SELECT expires_at, data FROM ranges WHERE prefix = ?", (prefix,)
+            ).fetchone()
+            # Wall-clock time: expiry must mean the same thing in every process
+            if row is not None and row[0] > time.time():
+                counts = decode_range(row[1])
+                self.bytes_read += len(row[1])
+        except (sqlite3.Error, ValueError, TypeError, struct.error):
+            # A corrupt value is a miss, never a partial (all clean) range
+            self.errors += 1
+        if counts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return counts
+
+    async def put(self, prefix: str, counts: Dict[str, int]) -> None:
+        try:
+            data = encode_range(counts)
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO ranges (prefix, expires_at, data) VALUES (?, ?, ?)",
+                (prefix, time.time() + self.ttl, data)
+            )
+            self.bytes_written += len(data)
+            self._puts += 1
+            if self._puts % self.PRUNE_EVERY == 0:
+                self._prune(db)
+        except (sqlite3.Error, ValueError, OverflowError):
+            self.errors += 1
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM ranges WHERE expires_at <= ?", (time.time(),))
+        excess = db.execute("SELECT COUNT(*) FROM ranges").fetchone()[0] - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM ranges WHERE prefix IN "
+                "(SELECT prefix FROM ranges ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+
+    async def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict:
+        return {**self._stats(self.name), "path": self.path, "ttl": self.ttl}
+
+
+class RedisError(Exception):
+    """Error reply or protocol violation from the Redis server"""
+
+
+class RedisBackend(CacheBackend, _SharedStats):
+    """
+    Range cache in Redis, shared by every worker and host.
+
+    Speaks just enough RESP (GET, SET ... PX, AUTH, SELECT) over one
+    connection so no client library is required; commands are serialized
+    on that connection, which is plenty for a few-kilobyte GET per miss.
+    A command that can't get the connection within the timeout is a miss;
+    only one that times out (or fails) mid-exchange drops the connection,
+    since its reply may be half-read.
+    """
+
+    name = "redis"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, ttl: float = 3600.0,
+                 key_prefix: str = "lsa:range:", timeout: float = 0.5):
+        """
+        Args:
+            host, port, db, password: Redis server to use
+            ttl: Seconds a range stays fresh (set as the key's PX expiry)
+            key_prefix: Namespace for range keys
+            timeout: Seconds to wait for a connection or reply before
+                treating the lookup as a miss
+        """
+        _SharedStats.__init__(self)
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        """Build from a redis://[:password@]host[:port][/db] URL"""
+        parsed = urlparse(url)
+        db = parsed.path.strip("/")
+        return cls(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=parsed.password,
+            **kwargs
+        )
+
+    @staticmethod
+    def _encode(*args: bytes) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by Redis")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply type {kind!r}")
+
+    async def _call(self, *args: bytes):
+        """One request/reply exchange; the caller holds the lock"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            if self.password:
+                self._writer.write(self._encode(b"AUTH", self.password.encode()))
+                await self._read_reply()
+            if self.db:
+                self._writer.write(self._encode(b"SELECT", str(self.db).encode()))
+                await self._read_reply()
+        self._writer.write(self._encode(*args))
+        return await self._read_reply()
+
+    async def execute(self, *args: bytes):
+        """
+        Run one command within the timeout.
+
+        Waiting for the connection (another command in flight) just raises
+        TimeoutError; a failure while this command owns the connection
+        also drops it, before the next waiter can use it.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        await asyncio.wait_for(self._lock.acquire(), self.timeout)
+        try:
+            return await asyncio.wait_for(self._call(*args), max(0.0, deadline - loop.time()))
+        except BaseException:
+            await self._disconnect()
+            raise
+        finally:
+            self._lock.release()
+
+    async def _disconnect(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+    async def get(self, prefix: str) -> Optional[Dict[str, int]]:
+        counts = None
+        try:
+            data = await self.execute(b"GET", (self.key_prefix + prefix).encode())
+            if data is not None:
+                counts = decode_range(data)
+                self.bytes_read += len(data)
+        except (OSError, ConnectionError, EOFError, RedisError, asyncio.TimeoutError,
+                ValueError, struct.error):
+            # EOFError: the connection dropped mid-reply (IncompleteReadError)
+            self.errors += 1
+        if counts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return counts
+
+    async def put(self, prefix: str, counts: Dict[str, int]) -> None:
+        try:
+            data = encode_range(counts)
+            await self.execute(b"SET", (self.key_prefix + prefix).encode(), data,
+                               b"PX", str(int(self.ttl * 1000)).encode())
+            self.bytes_written += len(data)
+        except (OSError, ConnectionError, EOFError, RedisError, asyncio.TimeoutError,
+                ValueError, OverflowError, struct.error):
+            self.errors += 1
+
+    async def close(self) -> None:
+        await self._disconnect()
+
+    def stats(self) -> Dict:
+        return {**self._stats(self.name), "server": f"{self.host}:{self.port}/{self.db}", "ttl": self.ttl}
+
+
+class TieredBackend(CacheBackend):
+    """A small in-process cache in front of a shared backend"""
+
+    name = "tiered"
+
+    def __init__(self, local: RangeCache, shared: CacheBackend):
+        self.local = local
+        self.shared = shared
+
+    async def get(self, prefix: str) -> Optional[Dict[str, int]]:
+        counts = self.local.get(prefix)
+        if counts is None:
+            counts = await self.shared.get(prefix)
+            if counts is not None:
+                self.local.put(prefix, counts)
+        return counts
+
+    async def put(self, prefix: str, counts: Dict[str, int]) -> None:
+        self.local.put(prefix, counts)
+        await self.shared.put(prefix, counts)
+
+    async def close(self) -> None:
+        await self.shared.close()
+
+    def stats(self) -> Dict:
+        return {"backend": f"{self.shared.name}+memory", "local": self.local.stats(),
+                "shared": self.shared.stats()}
+
+
+def create_backend(kind: str, local: RangeCache, path: str = "", url: str = "",
+                   ttl: float = 3600.0) -> CacheBackend:
+    """Backend for a HIBP_CACHE_BACKEND setting: memory, sqlite or redis"""
+    if kind == "memory":
+        return MemoryBackend(local)
+    if kind == "sqlite":
+        if not path:
+            raise ValueError("The sqlite range cache needs HIBP_CACHE_PATH")
+        return TieredBackend(local, SQLiteBackend(path, ttl=ttl))
+    if kind == "redis":
+        return TieredBackend(local, RedisBackend.from_url(url or "redis://127.0.0.1:6379/0", ttl=ttl))
+    raise ValueError(f"Unknown range cache backend {kind!r}, expected memory, sqlite or redis")
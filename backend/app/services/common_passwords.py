@@ -0,0 +1,150 @@
+"""
+Common Password List
+Static, memory-mapped hash table over a large ranked password list
+(100k-10M entries) with O(len) lookups and near-zero load time
+
+File layout (all integers little-endian):
+    header    32 bytes                magic, version, entry count, slot count, blob size
+    offsets   (n + 1) x u32           start of each word in the blob, in rank order
+    slots     slot count x u32        rank + 1 of the word hashed there (0 = empty)
+    blob      blob size bytes         UTF-8 words, concatenated in rank order
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from typing import BinaryIO, Iterable, Optional
+
+MAGIC = b"LSACPW1\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQ")
+HEADER_SIZE = 32
+
+_U32 = struct.Struct("<I")
+_U32_PAIR = struct.Struct("<II")
+
+
+def _hash(word: bytes) -> int:
+    """Stable 64-bit hash (Python's hash() is randomized per process)"""
+    return int.from_bytes(hashlib.blake2b(word, digest_size=8).digest(), "little")
+
+
+def build_common_passwords(words: Iterable[str], out_path: str, limit: Optional[int] = None) -> int:
+    """
+    Write a common-password file from words ordered most common first.
+
+    Words are lowercased (lookups are case-insensitive) and only the first,
+    best-ranked occurrence of each is kept. The slot table is sized to keep
+    the load factor at or below 1/2 so probe sequences stay short.
+
+    Returns:
+        Number of distinct words written
+    """
+    seen = set()
+    ordered = []
+    for word in words:
+        word = word.strip().lower()
+        if not word or word in seen:
+            continue
+        seen.add(word)
+        ordered.append(word.encode("utf-8"))
+        if limit is not None and len(ordered) >= limit:
+            break
+    del seen
+
+    n = len(ordered)
+    slot_count = 1
+    while slot_count < 2 * n + 1:
+        slot_count <<= 1
+    mask = slot_count - 1
+
+    offsets = array("I", [0]) * (n + 1)
+    slots = array("I", bytes(4 * slot_count))
+    position = 0
+    for rank, word in enumerate(ordered):
+        offsets[rank] = position
+        position += len(word)
+        slot = _hash(word) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = rank + 1
+    offsets[n] = position
+    if position >= 1 << 32:
+        raise ValueError("Word list too large for 32-bit offsets")
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, slot_count, position).ljust(HEADER_SIZE, b"\0"))
+        offsets.tofile(f)
+        slots.tofile(f)
+        for word in ordered:
+            f.write(word)
+    os.replace(tmp_path, out_path)
+    return n
+
+
+class CommonPasswordList:
+    """Lazily memory-mapped, read-only common password lookup"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+        self._mm: Optional[mmap.mmap] = None
+
+    def _open(self) -> mmap.mmap:
+        """Map the file on first use so application startup stays fast"""
+        if self._mm is None:
+            self._file = open(self.path, "rb")
+            mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, n, slot_count, blob_size = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                mm.close()
+                self._file.close()
+                self._file = None
+                raise ValueError(f"{self.path} is not a common password list (v{VERSION})")
+            self._count = n
+            self._mask = slot_count - 1
+            self._offsets_off = HEADER_SIZE
+            self._slots_off = HEADER_SIZE + 4 * (n + 1)
+            self._blob_off = self._slots_off + 4 * slot_count
+            self._mm = mm
+        return self._mm
+
+    def rank(self, word: str) -> Optional[int]:
+        """0-based popularity rank of a (lowercase) word, or None if absent"""
+        mm = self._open()
+        encoded = word.encode("utf-8", "surrogatepass")
+        slot = _hash(encoded) & self._mask
+        slots_off = self._slots_off
+        while True:
+            entry = _U32.unpack_from(mm, slots_off + 4 * slot)[0]
+            if not entry:
+                return None
+            start, end = _U32_PAIR.unpack_from(mm, self._offsets_off + 4 * (entry - 1))
+            if end - start == len(encoded) and \
+                    mm[self._blob_off + start:self._blob_off + end] == encoded:
+                return entry - 1
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, word: str) -> bool:
+        return self.rank(word) is not None
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+            self._file = None
+
+    def __getstate__(self):
+        # Worker processes re-map the file themselves
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
@@ -0,0 +1,685 @@
+"""
+Guess Estimator Service
+zxcvbn-style estimate of how many guesses an attacker needs for a password
+
+Matchers enumerate dictionary (plain, reversed and l33t), keyboard-adjacency,
+sequence, repeat, date and recent-year matches; a dynamic program then finds
+the sequence of non-overlapping matches (gaps filled by brute force) with the
+fewest total guesses. Every matcher only looks at matches *ending* at each
+position, so the per-position results and DP rows of a prefix stay valid as
+the password grows - they are cached (under a keyed hash of the prefix) and
+keystroke-by-keystroke calls only pay for the new characters.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+from itertools import product
+from math import comb, factorial, log10
+from typing import Any, Dict, List, Optional, Tuple
+
+from .common_passwords import CommonPasswordList
+
+MAX_LENGTH = 64                 # only the first 64 characters are estimated
+MAX_WORD_LENGTH = 24            # longest dictionary token considered
+MAX_REPEAT_BASE = 16            # longest repeated base token considered
+MAX_L33T_COMBINATIONS = 16
+
+BRUTEFORCE_CARDINALITY = 10.0
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000.0
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10.0
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50.0
+# A sequence of l matches costs at least MIN_GUESSES_BEFORE_GROWING_SEQUENCE^(l-1),
+# so past this many it loses to brute-forcing all MAX_LENGTH characters
+MAX_SEQUENCE_LENGTH = 2 + int(MAX_LENGTH * log10(BRUTEFORCE_CARDINALITY)
+                              / log10(MIN_GUESSES_BEFORE_GROWING_SEQUENCE))
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = date.today().year
+DATE_MIN_YEAR = 1000
+DATE_MAX_YEAR = 2050
+
+# Offline attack against a slow hash (bcrypt/scrypt/argon2), as in zxcvbn
+GUESSES_PER_SECOND = 1e4
+
+# ==================== Dictionaries (most common first) ====================
+
+PASSWORDS = """
+123456 password 12345678 qwerty 123456789 12345 1234 111111 1234567 dragon
+123123 baseball abc123 football monkey letmein 696969 shadow master 666666
+qwertyuiop 123321 mustang 1234567890 michael 654321 superman 1qaz2wsx 7777777
+121212 000000 qazwsx 123qwe killer trustno1 jordan jennifer zxcvbnm asdfgh
+hunter buster soccer harley batman andrew tigger sunshine iloveyou 2000
+charlie robert thomas hockey ranger daniel starwars klaster 112233 george
+computer michelle jessica pepper 1111 zxcvbn 555555 11111111 131313 freedom
+777777 pass maggie 159753 aaaaaa ginger princess joshua cheese amanda summer
+love ashley nicole chelsea biteme matthew access yankees 987654321 dallas
+austin thunder taylor matrix admin welcome login passw0rd whatever ninja root
+administrator foobar secret shadow1 password1 password123 qwerty123 abcdef
+abcd1234 letmein1 welcome1 monkey1 dragon1 master1 hello hello123 test test123
+guest changeme default asdf asdfasdf zaq12wsx q1w2e3r4 1q2w3e4r
+""".split()
+
+ENGLISH_WORDS = """
+the of and to in is you that it he was for on are as with his they at be
+this have from or one had by word but not what all were we when your can
+said there use each which she do how their if will up other about out many
+then them these so some her would make like him into time has look two more
+write go see number no way could people my than first water been call who
+oil its now find long down day did get come made may part over new sound
+take only little work know place year live me back give most very after thing
+our just name good sentence man think say great where help through much before
+line right too mean old any same tell boy follow came want show also around
+form three small set put end does another well large must big even such
+because turn here why ask went men read need land different home us move try
+kind hand picture again change off play spell air away animal house point
+page letter mother answer found study still learn should america world
+correct horse battery staple monkey dragon sun moon star fire ice rain snow
+love heart angel blue red green black white gold silver summer winter spring
+magic secret shadow tiger lion eagle falcon ocean river mountain forest
+""".split()
+
+NAMES = """
+michael james john robert david william richard joseph thomas charles
+christopher daniel matthew anthony mark donald steven paul andrew joshua
+mary patricia jennifer linda elizabeth barbara susan jessica sarah karen
+nancy lisa betty margaret sandra ashley kimberly emily donna michelle
+smith johnson williams brown jones garcia miller davis rodriguez martinez
+""".split()
+
+
+def _ranked(words: List[str]) -> Dict[str, int]:
+    ranks: Dict[str, int] = {}
+    for rank, word in enumerate(words, 1):
+        ranks.setdefault(word, rank)
+    return ranks
+
+
+# word -> (rank, dictionary name), keeping each word's best rank
+RANKED_DICTIONARY: Dict[str, Tuple[int, str]] = {}
+for _name, _words in (("passwords", PASSWORDS), ("english", ENGLISH_WORDS), ("names", NAMES)):
+    for _word, _rank in _ranked(_words).items():
+        if _word not in RANKED_DICTIONARY or _rank < RANKED_DICTIONARY[_word][0]:
+            RANKED_DICTIONARY[_word] = (_rank, _name)
+
+L33T_TABLE = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "[": "c", "<": "c",
+    "3": "e", "6": "g", "9": "g", "1": "il", "!": "i", "|": "il", "0": "o",
+    "$": "s", "5": "s", "+": "t", "7": "tl", "%": "x", "2": "z",
+}
+L33T_CHARS = frozenset(L33T_TABLE)
+
+# ==================== Keyboard adjacency graphs ====================
+
+QWERTY_ROWS = [
+    (0, "`~ 1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+"),
+    (1, "qQ wW eE rR tT yY uU iI oO pP [{ ]} \\|"),
+    (1, "aA sS dD fF gG hH jJ kK lL ;: '\""),
+    (1, "zZ xX cC vV bB nN mM ,< .> /?"),
+]
+KEYPAD_ROWS = [
+    (1, "/ * -"),
+    (0, "7 8 9 +"),
+    (0, "4 5 6"),
+    (0, "1 2 3"),
+    (1, "0 .")
+]
+
+SLANTED_NEIGHBOURS = [(-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1)]
+ALIGNED_NEIGHBOURS = [(-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1)]
+
+
+def build_adjacency_graph(rows, neighbours) -> Dict[str, List[Optional[str]]]:
+    """Map every character to its neighbouring key tokens, in direction order"""
+    positions = {}
+    for y, (offset, line) in enumerate(rows):
+        for x, token in enumerate(line.split(), offset):
+            positions[(x, y)] = token
+    graph = {}
+    for (x, y), token in positions.items():
+        adjacent = [positions.get((x + dx, y + dy)) for dx, dy in neighbours]
+        for ch in token:
+            graph[ch] = adjacent
+    return graph
+
+
+def _graph_stats(graph: Dict[str, List[Optional[str]]]) -> Tuple[int, float]:
+    """(starting positions, average degree) used by the spatial guess formula"""
+    degrees = [sum(1 for n in adjacent if n) for adjacent in graph.values()]
+    return len(graph), sum(degrees) / len(degrees)
+
+
+GRAPHS = {
+    "qwerty": build_adjacency_graph(QWERTY_ROWS, SLANTED_NEIGHBOURS),
+    "keypad": build_adjacency_graph(KEYPAD_ROWS, ALIGNED_NEIGHBOURS),
+}
+GRAPH_STATS = {name: _graph_stats(graph) for name, graph in GRAPHS.items()}
+SHIFTED = frozenset(token[1] for _, line in QWERTY_ROWS for token in line.split())
+
+# ==================== Dates ====================
+
+DATE_SPLITS = {
+    4: [(1, 2), (2, 3)],
+    5: [(1, 3), (2, 3)],
+    6: [(1, 2), (2, 4), (4, 5)],
+    7: [(1, 3), (2, 3), (4, 5), (4, 6)],
+    8: [(2, 4), (4, 6)],
+}
+DATE_WITH_SEPARATOR = re.compile(r"^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$")
+RECENT_YEAR = re.compile(r"^(?:19|20)\d\d$")
+
+
+def _map_ints_to_dm(ints) -> Optional[Tuple[int, int]]:
+    for day, month in (ints, ints[::-1]):
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            return day, month
+    return None
+
+
+def _map_ints_to_dmy(ints) -> Optional[Tuple[int, int, int]]:
+    """Interpret three integers as a (day, month, year), zxcvbn's rules"""
+    if ints[1] > 31 or ints[1] <= 0:
+        return None
+    over_12 = over_31 = under_1 = 0
+    for value in ints:
+        if 99 < value < DATE_MIN_YEAR or value > DATE_MAX_YEAR:
+            return None
+        over_31 += value > 31
+        over_12 += value > 12
+        under_1 += value <= 0
+    if over_31 >= 2 or over_12 == 3 or under_1 >= 2:
+        return None
+
+    year_splits = [(ints[2], ints[:2]), (ints[0], ints[1:])]
+    for year, rest in year_splits:
+        if DATE_MIN_YEAR <= year <= DATE_MAX_YEAR:
+            dm = _map_ints_to_dm(rest)
+            return (dm[0], dm[1], year) if dm else None
+    for year, rest in year_splits:
+        dm = _map_ints_to_dm(rest)
+        if dm:
+            year = year if year > 99 else (1900 + year if year > 50 else 2000 + year)
+            return dm[0], dm[1], year
+    return None
+
+
+# ==================== Matches ====================
+
+class Match:
+    """One candidate explanation of password[i:j + 1]"""
+
+    __slots__ = ("i", "j", "pattern", "guesses", "info")
+
+    def __init__(self, i: int, j: int, pattern: str, guesses: float, info: Optional[Dict] = None):
+        self.i = i
+        self.j = j
+        self.pattern = pattern
+        self.guesses = guesses
+        self.info = info
+
+
+class _Row:
+    """DP state for one end position: best match / guesses per sequence length"""
+
+    __slots__ = ("m", "pi", "g")
+
+    def __init__(self):
+        self.m: Dict[int, Match] = {}
+        self.pi: Dict[int, float] = {}
+        self.g: Dict[int, float] = {}
+
+
+class _State:
+    """Matches and DP rows of one password prefix, plus its final result"""
+
+    __slots__ = ("matches", "rows", "result")
+
+    def __init__(self, matches: List[List[Match]], rows: List[_Row], result: Dict[str, Any]):
+        self.matches = matches
+        self.rows = rows
+        self.result = result
+
+
+def _uppercase_variations(token: str) -> float:
+    if token.islower() or not any(c.isalpha() for c in token):
+        return 1.0
+    if token.isupper() or (token[0].isupper() and token[1:].islower()) or \
+            (token[-1].isupper() and token[:-1].islower()):
+        return 2.0
+    upper = sum(c.isupper() for c in token)
+    lower = sum(c.islower() for c in token)
+    return float(sum(comb(upper + lower, i) for i in range(1, min(upper, lower) + 1)))
+
+
+def _l33t_variations(token: str, subs: Dict[str, str]) -> float:
+    variations = 1.0
+    lowered = token.lower()
+    for subbed, unsubbed in subs.items():
+        s = lowered.count(subbed)
+        u = lowered.count(unsubbed)
+        if s == 0 or u == 0:
+            variations *= 2
+        else:
+            variations *= sum(comb(s + u, i) for i in range(1, min(s, u) + 1))
+    return variations
+
+
+def _spatial_guesses(graph: str, length: int, turns: int, shifted: int) -> float:
+    starts, degree = GRAPH_STATS[graph]
+    guesses = 0.0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += comb(i - 1, j - 1) * starts * degree ** j
+    if shifted:
+        unshifted = length - shifted
+        if unshifted == 0:
+            guesses *= 2
+        else:
+            guesses *= sum(comb(length, i) for i in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+def _date_guesses(year: int, separator: bool) -> float:
+    guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365.0
+    return guesses * 4 if separator else guesses
+
+
+def _score(guesses: float) -> int:
+    for score, threshold in enumerate((1e3, 1e6, 1e8, 1e10)):
+        if guesses < threshold + 5:
+            return score
+    return 4
+
+
+def _display_time(seconds: float) -> str:
+    units = [("second", 60), ("minute", 60), ("hour", 24), ("day", 31), ("month", 12), ("year", 100)]
+    if seconds < 1:
+        return "less than a second"
+    value = seconds
+    for unit, size in units:
+        if value < size:
+            value = round(value)
+            return f"{value} {unit}{'' if value == 1 else 's'}"
+        value /= size
+    return "centuries"
+
+
+class GuessEstimator:
+    """Minimum-guesses password strength estimator with a prefix cache"""
+
+    def __init__(
+        self,
+        common_passwords: Optional[CommonPasswordList] = None,
+        cache_size: int = 2048
+    ):
+        """
+        Args:
+            common_passwords: Large ranked list used as an extra dictionary
+            cache_size: Password prefixes whose matches and DP rows are kept
+        """
+        self.common_passwords = common_passwords
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, _State]" = OrderedDict()
+        # estimate() can run on the event loop and in to_thread workers at once
+        self._lock = threading.Lock()
+        # Prefixes are cached under a keyed hash, never as plaintext
+        self._key = os.urandom(32)
+        self.hits = 0
+        self.misses = 0
+        self.reused_positions = 0
+
+    def __getstate__(self):
+        # Worker processes start with an empty cache and their own key
+        return {"common_passwords": self.common_passwords, "cache_size": self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def estimate(self, password: str) -> Dict[str, Any]:
+        """
+        Estimate the guesses needed to crack a password.
+
+        Returns:
+            Dictionary with guesses, guesses_log10, score (0-4), an offline
+            crack time and the optimal match sequence (no password text).
+            The dictionary is shared with the cache and must not be mutated.
+        """
+        password = password[:MAX_LENGTH]
+        n = len(password)
+        if n == 0:
+            return self._result(1.0, [])
+
+        # Resume from the longest prefix seen before (the previous keystroke)
+        keys = [self._prefix_key(password[:p]) for p in range(n, 0, -1)]
+        with self._lock:
+            for key in keys:
+                state = self._cache.get(key)
+                if state is not None:
+                    self._cache.move_to_end(key)
+                    break
+            if state is not None and len(state.rows) == n:
+                self.hits += 1
+                return state.result
+            self.misses += 1
+
+        # Copies, so the DP runs outside the lock without touching cached state
+        matches = list(state.matches) if state is not None else []
+        rows = list(state.rows) if state is not None else []
+        reused = len(rows)
+
+        guesses, sequence = self._extend(password, matches, rows, {})
+        result = self._result(guesses, sequence)
+
+        with self._lock:
+            self.reused_positions += reused
+            self._cache[keys[0]] = _State(matches, rows, result)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reused_positions": self.reused_positions
+        }
+
+    def _prefix_key(self, prefix: str) -> bytes:
+        return hashlib.blake2b(prefix.encode("utf-8", "surrogatepass"),
+                               key=self._key, digest_size=16).digest()
+
+    def _guesses_only(self, token: str, bases: Dict[str, float]) -> float:
+        """Estimate of a sub-token (base of a repeat match), memoized per call"""
+        guesses = bases.get(token)
+        if guesses is None:
+            guesses, _ = self._extend(token, [], [], bases)
+            bases[token] = guesses
+        return guesses
+
+    # ==================== Dynamic program ====================
+
+    def _extend(self, password: str, matches: List[List[Match]], rows: List[_Row],
+                bases: Dict[str, float]) -> Tuple[float, List[Match]]:
+        """
+        Add matches and DP rows for the positions not covered yet, then unwind
+        the optimal sequence for the whole password. Repeat bases estimated
+        along the way are kept in `bases` (nested repeats share it).
+        """
+        n = len(password)
+        folded = password.lower()
+        if len(folded) != n:
+            folded = "".join(ch.lower()[:1] for ch in password)
+
+        for k in range(len(rows), n):
+            matches.append(self._matches_ending_at(password, folded, k, bases))
+            rows.append(self._row(password, k, matches[k], rows, None))
+
+        # The last row again, with whole-password matches exempt from the
+        # submatch minimums (stored rows assume more characters may follow)
+        final = self._row(password, n - 1, matches[n - 1], rows, n)
+        length = min(final.g, key=lambda l: final.g[l])
+        guesses = final.g[length]
+
+        sequence = [final.m[length]]
+        k = sequence[0].i - 1
+        length -= 1
+        while k >= 0:
+            match = rows[k].m[length]
+            sequence.append(match)
+            k = match.i - 1
+            length -= 1
+        sequence.reverse()
+        return guesses, sequence
+
+    def _row(self, password: str, k: int, matches_k: List[Match], rows: List[_Row],
+             whole_length: Optional[int]) -> _Row:
+        row = _Row()
+
+        def update(match: Match, length: int) -> None:
+            if length > MAX_SEQUENCE_LENGTH:
+                return
+            pi = self._match_guesses(match, whole_length)
+            if length > 1:
+                pi *= rows[match.i - 1].pi[length - 1]
+            g = factorial(length) * pi + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (length - 1)
+            for other_length, other_g in row.g.items():
+                if other_length <= length and other_g <= g:
+                    return
+            row.m[length] = match
+            row.pi[length] = pi
+            row.g[length] = g
+
+        for match in matches_k:
+            if match.i > 0:
+                for length in list(rows[match.i - 1].m):
+                    update(match, length + 1)
+            else:
+                update(match, 1)
+
+        update(Match(0, k, "bruteforce", 0.0), 1)
+        for i in range(1, k + 1):
+            brute = Match(i, k, "bruteforce", 0.0)
+            for length, last in rows[i - 1].m.items():
+                if last.pattern != "bruteforce":
+                    update(brute, length + 1)
+        return row
+
+    @staticmethod
+    def _match_guesses(match: Match, whole_length: Optional[int]) -> float:
+        length = match.j - match.i + 1
+        guesses = BRUTEFORCE_CARDINALITY ** length if match.pattern == "bruteforce" else match.guesses
+        if length == whole_length:
+            minimum = 1.0
+        elif length == 1:
+            minimum = MIN_SUBMATCH_GUESSES_SINGLE_CHAR
+        else:
+            minimum = MIN_SUBMATCH_GUESSES_MULTI_CHAR
+        return max(guesses, minimum)
+
+    # ==================== Matchers ====================
+
+    def _matches_ending_at(self, password: str, folded: str, k: int,
+                           bases: Dict[str, float]) -> List[Match]:
+        matches = self._dictionary_matches(password, folded, k)
+        matches += self._spatial_matches(password, k)
+        matches += self._sequence_matches(password, k)
+        matches += self._repeat_matches(password, k, bases)
+        matches += self._date_matches(password, k)
+        return matches
+
+    def _rank(self, word: str) -> Optional[Tuple[int, str]]:
+        ranked = RANKED_DICTIONARY.get(word)
+        if self.common_passwords is not None and 4 <= len(word):
+            rank = self.common_passwords.rank(word)
+            if rank is not None and (ranked is None or rank + 1 < ranked[0]):
+                return rank + 1, "common_passwords"
+        return ranked
+
+    def _dictionary_matches(self, password: str, folded: str, k: int) -> List[Match]:
+        matches = []
+        for i in range(max(0, k - MAX_WORD_LENGTH + 1), k + 1):
+            word = folded[i:k + 1]
+            token = password[i:k + 1]
+
+            found = self._rank(word)
+            if found is not None:
+                rank, name = found
+                matches.append(Match(i, k, "dictionary", rank * _uppercase_variations(token),
+                                     {"dictionary": name, "rank": rank}))
+
+            if len(word) >= 3:
+                reversed_word = word[::-1]
+                if reversed_word != word:
+                    found = self._rank(reversed_word)
+                    if found is not None:
+                        rank, name = found
+                        matches.append(Match(i, k, "dictionary", 2 * rank * _uppercase_variations(token),
+                                             {"dictionary": name, "rank": rank, "reversed": True}))
+
+            matches += self._l33t_matches(token, word, i, k)
+        return matches
+
+    def _l33t_matches(self, token: str, word: str, i: int, k: int) -> List[Match]:
+        if L33T_CHARS.isdisjoint(word):
+            return []
+        options = [L33T_TABLE.get(c, c) for c in word]
+
+        matches = []
+        for count, candidate in enumerate(product(*options)):
+            if count >= MAX_L33T_COMBINATIONS:
+                break
+            unl33ted = "".join(candidate)
+            if unl33ted == word:
+                continue
+            found = self._rank(unl33ted)
+            if found is None:
+                continue
+            subs = {c: u for c, u in zip(word, unl33ted) if c != u}
+            rank, name = found
+            guesses = rank * _uppercase_variations(token) * _l33t_variations(token, subs)
+            matches.append(Match(i, k, "dictionary", guesses,
+                                 {"dictionary": name, "rank": rank, "l33t": True}))
+        return matches
+
+    @staticmethod
+    def _adjacent_step(graph: Dict[str, List[Optional[str]]], prev: str, cur: str) -> Optional[Tuple[int, bool]]:
+        """(direction, shifted) if cur is a neighbour of prev on this keyboard"""
+        adjacent = graph.get(prev)
+        if adjacent is None:
+            return None
+        for direction, token in enumerate(adjacent):
+            if token and cur in token:
+                return direction, token.index(cur) == 1
+        return None
+
+    def _spatial_matches(self, password: str, k: int) -> List[Match]:
+        matches = []
+        for name, graph in GRAPHS.items():
+            i = k
+            while i > 0 and self._adjacent_step(graph, password[i - 1], password[i]) is not None:
+                i -= 1
+            if k - i + 1 < 3:
+                continue
+
+            turns = 0
+            last_direction = None
+            shifted = 1 if name == "qwerty" and password[i] in SHIFTED else 0
+            for pos in range(i + 1, k + 1):
+                direction, is_shifted = self._adjacent_step(graph, password[pos - 1], password[pos])
+                if direction != last_direction:
+                    turns += 1
+                    last_direction = direction
+                shifted += is_shifted
+            matches.append(Match(i, k, "spatial", _spatial_guesses(name, k - i + 1, turns, shifted),
+                                 {"graph": name, "turns": turns}))
+        return matches
+
+    @staticmethod
+    def _sequence_matches(password: str, k: int) -> List[Match]:
+        if k == 0:
+            return []
+        delta = ord(password[k]) - ord(password[k - 1])
+        if delta == 0 or abs(delta) > 5:
+            return []
+        i = k - 1
+        while i > 0 and ord(password[i]) - ord(password[i - 1]) == delta:
+            i -= 1
+        length = k - i + 1
+        if length < 3 and abs(delta) != 1:
+            return []
+
+        first = password[i]
+        if first in "aAzZ019":
+            base = 4
+        elif first.isdigit():
+            base = 10
+        else:
+            base = 26
+        guesses = base * length * (2 if delta < 0 else 1)
+        return [Match(i, k, "sequence", float(guesses), {"ascending": delta > 0})]
+
+    def _repeat_matches(self, password: str, k: int, bases: Dict[str, float]) -> List[Match]:
+        matches = []
+        for period in range(1, min(MAX_REPEAT_BASE, (k + 1) // 2) + 1):
+            base = password[k - period + 1:k + 1]
+            i = k - period + 1
+            while i - period >= 0 and password[i - period:i] == base:
+                i -= period
+            count = (k - i + 1) // period
+            if count < 2:
+                continue
+            # Only the shortest period explains a given span
+            if matches and matches[-1].i == i:
+                continue
+            base_guesses = self._guesses_only(base, bases)
+            matches.append(Match(i, k, "repeat", base_guesses * count,
+                                 {"repeat_count": count, "base_length": period}))
+        return matches
+
+    @staticmethod
+    def _date_matches(password: str, k: int) -> List[Match]:
+        matches = []
+
+        year_token = password[k - 3:k + 1] if k >= 3 else ""
+        if RECENT_YEAR.match(year_token):
+            year = int(year_token)
+            matches.append(Match(k - 3, k, "regex",
+                                 float(max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)),
+                                 {"regex": "recent_year"}))
+
+        best: Optional[Tuple[int, Match]] = None
+        for length, splits in DATE_SPLITS.items():
+            i = k - length + 1
+            if i < 0:
+                continue
+            token = password[i:k + 1]
+            if not token.isdigit() or not token.isascii():
+                continue
+            for a, b in splits:
+                dmy = _map_ints_to_dmy((int(token[:a]), int(token[a:b]), int(token[b:])))
+                if dmy is None:
+                    continue
+                distance = abs(dmy[2] - REFERENCE_YEAR)
+                match = Match(i, k, "date", _date_guesses(dmy[2], False), {"separator": False})
+                if best is None or distance < best[0] or \
+                        (distance == best[0] and match.i < best[1].i):
+                    best = (distance, match)
+        if best is not None:
+            matches.append(best[1])
+
+        for length in range(6, 11):
+            i = k - length + 1
+            if i < 0:
+                break
+            found = DATE_WITH_SEPARATOR.match(password[i:k + 1])
+            if found is None:
+                continue
+            dmy = _map_ints_to_dmy((int(found.group(1)), int(found.group(3)), int(found.group(4))))
+            if dmy is not None:
+                matches.append(Match(i, k, "date", _date_guesses(dmy[2], True), {"separator": True}))
+        return matches
+
+    # ==================== Output ====================
+
+    @staticmethod
+    def _result(guesses: float, sequence: List[Match]) -> Dict[str, Any]:
+        crack_seconds = guesses / GUESSES_PER_SECOND
+        return {
+            "guesses": guesses,
+            "guesses_log10": round(log10(guesses), 2) if guesses > 0 else 0.0,
+            "score": _score(guesses),
+            "crack_time_seconds": crack_seconds,
+            "crack_time_display": _display_time(crack_seconds),
+            "sequence": [
+                {
+                    "pattern": match.pattern,
+                    "i": match.i,
+                    "j": match.j,
+                    **(match.info or {})
+                }
+                for match in sequence
+            ]
+        }
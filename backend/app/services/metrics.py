@@ -0,0 +1,175 @@
+"""
+Metrics Service
+Prometheus text-format metrics without a client library: histograms that
+are updated inline on the hot path, and counters/gauges read from the
+services' existing counters only when /metrics is scraped
+
+Every uvicorn worker keeps its own numbers (plain ints and floats updated
+from the event loop thread, so no locks); Prometheus scrapes each worker
+or sums over the instance label as usual.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# Upper bounds in seconds: 50 us (cached analysis) up to 10 s (HIBP timeout)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+Labels = Dict[str, str]
+Samples = Iterable[Tuple[Labels, float]]
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def since(self, started: float) -> None:
+        """Observe the time elapsed since a time.perf_counter() reading"""
+        self.observe(time.perf_counter() - started)
+
+
+class HistogramFamily:
+    """Histograms keyed by one label value, created on first use"""
+
+    def __init__(self, label: str, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.label = label
+        self.bounds = bounds
+        self.children: Dict[str, Histogram] = {}
+
+    def get(self, value: str) -> Histogram:
+        histogram = self.children.get(value)
+        if histogram is None:
+            histogram = self.children[value] = Histogram(self.bounds)
+        return histogram
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Named metrics rendered in the Prometheus text exposition format.
+
+    Counters and gauges are callables returning a number or (labels, value)
+    pairs, evaluated at scrape time, so services keep counting with plain
+    attributes and pay nothing extra per request.
+    """
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: List[Tuple[str, str, str, object]] = []
+
+    def _add(self, name: str, kind: str, help_text: str, source: object) -> None:
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        if any(existing[0] == full_name for existing in self._metrics):
+            raise ValueError(f"Metric {full_name!r} is already registered")
+        self._metrics.append((full_name, kind, help_text, source))
+
+    def counter(self, name: str, help_text: str, collect: Callable[[], Union[float, Samples]]) -> None:
+        self._add(name, "counter", help_text, collect)
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Union[float, Samples]]) -> None:
+        self._add(name, "gauge", help_text, collect)
+
+    def histogram(self, name: str, help_text: str,
+                  source: Optional[Union[Histogram, HistogramFamily]] = None) -> Union[Histogram, HistogramFamily]:
+        """Register (and return) a histogram or labelled histogram family"""
+        if source is None:
+            source = Histogram()
+        self._add(name, "histogram", help_text, source)
+        return source
+
+    def render(self) -> str:
+        lines = []
+        for name, kind, help_text, source in self._metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                if isinstance(source, HistogramFamily):
+                    for value, histogram in sorted(source.children.items()):
+                        self._render_histogram(lines, name, histogram, {source.label: value})
+                else:
+                    self._render_histogram(lines, name, source, {})
+                continue
+
+            samples = source()
+            if samples is None:
+                continue
+            if isinstance(samples, (int, float)):
+                samples = [({}, samples)]
+            for labels, value in samples:
+                if value is not None:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(lines: List[str], name: str, histogram: Histogram, labels: Labels) -> None:
+        # Snapshot first: observations may land between these reads
+        counts = list(histogram.counts)
+        total, count = histogram.sum, histogram.count
+        cumulative = 0
+        for bound, bucket in zip(histogram.bounds + (float("inf"),), counts):
+            cumulative += bucket
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {repr(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+
+class RequestTimer:
+    """
+    ASGI middleware recording total request time per route template.
+
+    The label is the matched route's path ("/api/analyze"), never the raw
+    URL, so unknown paths can't grow the label set; unmatched requests are
+    counted as "other". WebSocket connections are not timed.
+    """
+
+    def __init__(self, app, histograms: HistogramFamily):
+        self.app = app
+        self.histograms = histograms
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "other"
+            self.histograms.get(path).since(started)
@@ -0,0 +1,212 @@
+"""
+Offline Pwned Passwords Index
+Compact sorted binary copy of the HIBP SHA-1 corpus, searched through mmap
+
+File layout (all integers little-endian):
+    header        64 bytes   magic, version, record count, section offsets
+    prefix table  (2^20 + 1) x u64   index of the first record per 20-bit prefix
+    hashes        n x 20 bytes       raw SHA-1 digests, sorted
+    count blocks  ceil(n / 64) x u64 byte offset of every 64th count
+    counts        n x varint         breach counts (LEB128)
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from typing import BinaryIO, Iterable, Optional, Tuple
+
+MAGIC = b"LSAPWIDX"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQQ")
+HEADER_SIZE = 64
+HASH_SIZE = 20
+PREFIX_BITS = 20
+PREFIX_COUNT = 1 << PREFIX_BITS
+BLOCK_SIZE = 64
+
+_U64 = struct.Struct("<Q")
+
+
+def encode_varint(value: int) -> bytes:
+    """LEB128-encode a non-negative integer"""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _prefix_of(digest: bytes) -> int:
+    """First 20 bits (5 hex chars) of a digest"""
+    return (digest[0] << 12) | (digest[1] << 4) | (digest[2] >> 4)
+
+
+def parse_dump_line(line: str) -> Optional[Tuple[bytes, int]]:
+    """Parse a "SHA1HEX:COUNT" dump line into (digest, count)"""
+    line = line.strip()
+    if not line:
+        return None
+    hash_hex, _, count = line.partition(":")
+    if len(hash_hex) != 40:
+        raise ValueError(f"Not a SHA-1 dump line: {line[:60]!r}")
+    return bytes.fromhex(hash_hex), int(count or 1)
+
+
+def build_index(records: Iterable[Tuple[bytes, int]], out_path: str) -> int:
+    """
+    Write an offline index from (digest, count) records sorted by digest.
+
+    Records are streamed to temporary section files, so memory stays flat
+    (aside from the 8 MB prefix table) no matter how large the corpus is.
+    Duplicate digests are merged by summing their counts.
+
+    Returns:
+        Number of records written
+    """
+    prefix_table = array("Q", bytes(8 * (PREFIX_COUNT + 1)))
+    work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(out_path)))
+    hashes_path = os.path.join(work_dir, "hashes")
+    blocks_path = os.path.join(work_dir, "blocks")
+    counts_path = os.path.join(work_dir, "counts")
+
+    try:
+        n = 0
+        counts_size = 0
+        with open(hashes_path, "wb") as hashes, \
+                open(blocks_path, "wb") as blocks, \
+                open(counts_path, "wb") as counts:
+
+            pending: Optional[bytes] = None
+            pending_count = 0
+
+            def flush(digest: bytes, count: int) -> None:
+                nonlocal n, counts_size
+                if n % BLOCK_SIZE == 0:
+                    blocks.write(_U64.pack(counts_size))
+                prefix_table[_prefix_of(digest) + 1] += 1
+                hashes.write(digest)
+                encoded = encode_varint(count)
+                counts.write(encoded)
+                counts_size += len(encoded)
+                n += 1
+
+            for digest, count in records:
+                if pending is not None:
+                    if digest == pending:
+                        pending_count += count
+                        continue
+                    if digest < pending:
+                        raise ValueError(
+                            "Dump is not sorted by hash; sort it first or pass --sort"
+                        )
+                    flush(pending, pending_count)
+                pending, pending_count = digest, count
+
+            if pending is not None:
+                flush(pending, pending_count)
+
+        # Turn per-prefix counts into cumulative start indices
+        for i in range(1, PREFIX_COUNT + 1):
+            prefix_table[i] += prefix_table[i - 1]
+
+        table_off = HEADER_SIZE
+        hashes_off = table_off + 8 * (PREFIX_COUNT + 1)
+        blocks_off = hashes_off + HASH_SIZE * n
+        counts_off = blocks_off + 8 * ((n + BLOCK_SIZE - 1) // BLOCK_SIZE)
+
+        tmp_out = out_path + ".tmp"
+        with open(tmp_out, "wb") as out:
+            header = HEADER.pack(MAGIC, VERSION, BLOCK_SIZE, n,
+                                 table_off, hashes_off, blocks_off, counts_off)
+            out.write(header.ljust(HEADER_SIZE, b"\0"))
+            prefix_table.tofile(out)
+            for path in (hashes_path, blocks_path, counts_path):
+                with open(path, "rb") as section:
+                    shutil.copyfileobj(section, out, 1024 * 1024)
+        os.replace(tmp_out, out_path)
+        return n
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class OfflineIndex:
+    """Memory-mapped, read-only lookup of breach counts by SHA-1 digest"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: BinaryIO = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, block_size, n, table_off, hashes_off, blocks_off, counts_off = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an offline password index (v{VERSION})")
+
+        self.block_size = block_size
+        self.record_count = n
+        self._table_off = table_off
+        self._hashes_off = hashes_off
+        self._blocks_off = blocks_off
+        self._counts_off = counts_off
+
+    def lookup(self, digest: bytes) -> int:
+        """
+        Return the breach count for a 20-byte SHA-1 digest (0 if absent).
+
+        The prefix table narrows the search to one 20-bit bucket, then a
+        binary search over the fixed-width hashes finds the record. Pages
+        are read straight from the mapping; nothing is loaded up front.
+        """
+        mm = self._mm
+        prefix = _prefix_of(digest)
+        lo, hi = struct.unpack_from("<QQ", mm, self._table_off + 8 * prefix)
+        base = self._hashes_off
+
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            off = base + mid * HASH_SIZE
+            probe = mm[off:off + HASH_SIZE]
+            if probe < digest:
+                lo = mid + 1
+            elif probe > digest:
+                hi = mid
+            else:
+                return self._count_at(mid)
+        return 0
+
+    def _count_at(self, index: int) -> int:
+        mm = self._mm
+        block, skip = divmod(index, self.block_size)
+        pos = self._counts_off + _U64.unpack_from(mm, self._blocks_off + 8 * block)[0]
+
+        # Skip the earlier varints in this block, then decode ours
+        while skip:
+            if not mm[pos] & 0x80:
+                skip -= 1
+            pos += 1
+
+        value = 0
+        shift = 0
+        while True:
+            byte = mm[pos]
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+            pos += 1
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return self.record_count
@@ -4,7 +4,150 @@ Analyzes passwords for strength, patterns, and vulnerabilities
 """
 
 import re
-from typing import Dict, List, Any
+import string
+from collections import deque
+from operator import itemgetter
+from typing import Dict, List, Any, Iterable, NamedTuple, Optional, Tuple
+
+from .common_passwords import CommonPasswordList
+from .guess_estimator import GuessEstimator
+
+# Pattern kinds reported by the keyword automaton (bit flags)
+KEYBOARD = 1
+SEQUENTIAL = 2
+
+# Boolean details fields in result order; bit i of a flags value is field i
+DETAIL_FLAGS = (
+    "has_uppercase", "has_lowercase", "has_numbers", "has_symbols",
+    "is_common", "has_patterns", "has_repeated"
+)
+# One details template per flags value, so a result copies instead of building
+DETAILS_BY_FLAGS = [
+    {name: bool(flags >> bit & 1) for bit, name in enumerate(DETAIL_FLAGS)}
+    for flags in range(1 << len(DETAIL_FLAGS))
+]
+detail_values = itemgetter(*DETAIL_FLAGS)
+FLAGS_BY_DETAILS = {detail_values(details): flags for flags, details in enumerate(DETAILS_BY_FLAGS)}
+
+# (feedback, suggestion) per issue code
+MESSAGES = {
+    "common": ("⚠️ This is a commonly used password!", "Choose a unique password that isn't commonly used"),
+    "too_short": ("Password is too short", "Use at least 8 characters (12+ recommended)"),
+    "very_short": ("Password is very short", "Use at least 8 characters (12+ recommended)"),
+    "no_uppercase": ("No uppercase letters", "Add uppercase letters (A-Z)"),
+    "no_lowercase": ("No lowercase letters", "Add lowercase letters (a-z)"),
+    "no_numbers": ("No numbers", "Add numbers (0-9)"),
+    "no_symbols": ("No special characters", "Add special characters (!@#$%^&*)"),
+    "keyboard": ("Keyboard pattern detected", "Avoid keyboard patterns like 'qwerty' or 'asdf'"),
+    "sequential": ("Sequential pattern detected", "Avoid sequential characters like '123' or 'abc'"),
+    "repeated": ("Repeated characters detected", "Avoid repeating the same character multiple times")
+}
+NO_ISSUES = "✅ Great password!"
+ISSUE_CODES = {feedback: code for code, (feedback, _) in MESSAGES.items()}
+
+# Result fields a compact result replaces or leaves out
+VERBOSE_FIELDS = frozenset({"strength_color", "feedback", "suggestions", "details", "breach_message"})
+
+UPPERCASE = frozenset(string.ascii_uppercase)
+LOWERCASE = frozenset(string.ascii_lowercase)
+DIGITS = frozenset(string.digits)
+# Exactly the characters of the original [!@#$%^&*()_+\-=\[\]{};':"\\|,.<>\/?`~] class
+SYMBOLS = frozenset(string.punctuation)
+
+# Past this length (or with non-ASCII text) C-level substring checks beat
+# the per-character loop (benchmarks/bench_analyzer.py)
+LOOP_SCAN_MAX_LENGTH = 8
+# 3+ identical characters in a row; '.' never matches a newline
+REPEATED_CHARS = re.compile(r'(.)\1\1')
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Lean form of an analysis result, for clients that render messages
+    themselves: feedback and suggestions become "issues" (MESSAGES codes,
+    in feedback order), details become "length", "flags" (DETAIL_FLAGS
+    bits) and, with a guess estimate, "guesses_log10". Extra fields such
+    as a full analysis' breach status are kept, except breach_message.
+    """
+    details = result["details"]
+    compact = {key: value for key, value in result.items() if key not in VERBOSE_FIELDS}
+    compact["length"] = details["length"]
+    compact["flags"] = FLAGS_BY_DETAILS[detail_values(details)]
+    compact["issues"] = [ISSUE_CODES[f] for f in result["feedback"] if f in ISSUE_CODES]
+    estimate = details.get("guess_estimate")
+    if estimate is not None:
+        compact["guesses_log10"] = estimate["guesses_log10"]
+    return compact
+
+
+class Verdict(NamedTuple):
+    """Everything in a result except details; shared by all passwords that score alike"""
+    score: int
+    strength: str
+    strength_color: str
+    feedback: Tuple[str, ...]
+    suggestions: Tuple[str, ...]
+
+
+class ScanState(NamedTuple):
+    """Scan state after a prefix of the password, for incremental analysis"""
+    automaton: int = 0
+    patterns: int = 0
+    previous: Optional[str] = None
+    run: int = 0
+    repeated: bool = False
+    uppercase: int = 0
+    lowercase: int = 0
+    numbers: int = 0
+    symbols: int = 0
+
+
+def build_automaton(keywords: Iterable[Tuple[str, int]]) -> Tuple[List[Dict[str, int]], List[int]]:
+    """
+    Build an Aho-Corasick automaton over (keyword, flag) pairs.
+    
+    Failure links are folded into the transition tables, so matching is a
+    single dict lookup per character with no backtracking. Characters that
+    appear in no keyword aren't stored and send the automaton back to the
+    root (state 0).
+    
+    Returns:
+        (transitions, outputs) where outputs[state] is the OR of the flags of
+        every keyword ending in that state
+    """
+    goto: List[Dict[str, int]] = [{}]
+    outputs = [0]
+    for keyword, flag in keywords:
+        state = 0
+        for ch in keyword:
+            if ch not in goto[state]:
+                goto.append({})
+                outputs.append(0)
+                goto[state][ch] = len(goto) - 1
+            state = goto[state][ch]
+        outputs[state] |= flag
+    
+    alphabet = {ch for edges in goto for ch in edges}
+    fail = [0] * len(goto)
+    transitions: List[Dict[str, int]] = [dict() for _ in goto]
+    transitions[0] = {ch: goto[0].get(ch, 0) for ch in alphabet}
+    queue = deque(goto[0].values())
+    
+    while queue:
+        state = queue.popleft()
+        outputs[state] |= outputs[fail[state]]
+        for ch in alphabet:
+            child = goto[state].get(ch)
+            if child is None:
+                transitions[state][ch] = transitions[fail[state]][ch]
+            else:
+                fail[child] = transitions[fail[state]][ch]
+                transitions[state][ch] = child
+                queue.append(child)
+    
+    # Root-bound transitions are implied by the .get(ch, 0) default
+    transitions = [{ch: nxt for ch, nxt in edges.items() if nxt} for edges in transitions]
+    return transitions, outputs
 
 
 class PasswordAnalyzer:
@@ -36,37 +179,204 @@ class PasswordAnalyzer:
         "qrs", "rst", "stu", "tuv", "uvw", "vwx", "wxy", "xyz"
     ]
     
-    # Repeated patterns
-    REPEATED_CHARS = re.compile(r'(.)\1{2,}')  # 3+ repeated chars
+    # Keyboard + sequential keywords, matched together in one pass (built once)
+    TRANSITIONS, OUTPUTS = build_automaton(
+        [(p, KEYBOARD) for p in KEYBOARD_PATTERNS] +
+        [(p, SEQUENTIAL) for p in SEQUENTIAL_PATTERNS]
+    )
+    
+    def __init__(
+        self,
+        common_passwords: Optional[CommonPasswordList] = None,
+        estimator: Optional[GuessEstimator] = None
+    ):
+        """
+        Args:
+            common_passwords: Large top-N list checked in addition to
+                COMMON_PASSWORDS (memory-mapped on first use)
+            estimator: Guess estimator whose result is added to details as
+                "guess_estimate" (None leaves it out)
+        """
+        self.common_passwords = common_passwords
+        self.estimator = estimator
+        # (flags, verdict) by (length capped at 16, is_common, scan)
+        self._verdicts: Dict[tuple, Tuple[int, Verdict]] = {}
     
-    def analyze(self, password: str) -> Dict[str, Any]:
+    def analyze(self, password: str, estimate: bool = True) -> Dict[str, Any]:
         """
         Analyze a password and return detailed strength information.
         
+        Args:
+            password: Password to analyze
+            estimate: Add the guess estimate (if enabled); callers that drop
+                "details" skip it, as it costs far more than the rest
+        
         Returns:
             Dictionary containing score, strength level, feedback, and details
         """
         if not password:
             return self._empty_result()
         
-        score = 0
-        feedback = []
-        suggestions = []
-        details = {
-            "length": len(password),
-            "has_uppercase": False,
-            "has_lowercase": False,
-            "has_numbers": False,
-            "has_symbols": False,
-            "is_common": False,
-            "has_patterns": False,
-            "has_repeated": False
-        }
+        return self._finish(password, self._scan(password), estimate)
+    
+    def step(self, state: ScanState, ch: str) -> ScanState:
+        """
+        Advance a scan state by one character - the per-keystroke unit of work.
         
-        # ==================== Length Analysis ====================
+        Feeding a password's characters one at a time from ScanState() ends in
+        the same classes, patterns and runs that a full _scan() finds.
+        """
+        automaton, patterns = state.automaton, state.patterns
+        transitions = self.TRANSITIONS
+        for c in ch.lower():
+            automaton = transitions[automaton].get(c, 0)
+            patterns |= self.OUTPUTS[automaton]
+        
+        if ch == state.previous:
+            run = state.run + 1
+            repeated = state.repeated or (run == 3 and ch != '\n')
+        else:
+            run = 1
+            repeated = state.repeated
+        
+        return ScanState(
+            automaton, patterns, ch, run, repeated,
+            state.uppercase + (ch in UPPERCASE),
+            state.lowercase + (ch in LOWERCASE),
+            state.numbers + (ch in DIGITS or (not ch.isascii() and ch.isdecimal())),
+            state.symbols + (ch in SYMBOLS)
+        )
+    
+    def analyze_state(self, password: str, state: ScanState, estimate: bool = True) -> Dict[str, Any]:
+        """Analysis result for a password whose scan state is already known"""
+        if not password:
+            return self._empty_result()
+        
+        return self._finish(password, (
+            state.uppercase > 0, state.lowercase > 0, state.numbers > 0, state.symbols > 0,
+            state.patterns, state.repeated
+        ), estimate)
+    
+    def _finish(
+        self,
+        password: str,
+        scan: Tuple[bool, bool, bool, bool, int, bool],
+        estimate: bool = True
+    ) -> Dict[str, Any]:
+        """Score a scanned password, adding the guess estimate if enabled"""
         length = len(password)
-        details["length"] = length
+        flags, verdict = self._assess(length, self._is_common(password.lower()), scan)
+        details = {"length": length, **DETAILS_BY_FLAGS[flags]}
+        if estimate and self.estimator is not None:
+            details["guess_estimate"] = self.estimator.estimate(password)
+        return {
+            "score": verdict.score,
+            "strength": verdict.strength,
+            "strength_color": verdict.strength_color,
+            "feedback": list(verdict.feedback),
+            "suggestions": list(verdict.suggestions),
+            "details": details
+        }
+    
+    def _assess(
+        self,
+        length: int,
+        is_common: bool,
+        scan: Tuple[bool, bool, bool, bool, int, bool]
+    ) -> Tuple[int, Verdict]:
+        """Detail flags and verdict for a scanned password, memoized per distinct outcome"""
+        # Scores only distinguish lengths up to 16, so there are few of them
+        key = (length if length < 16 else 16, is_common, scan)
+        known = self._verdicts.get(key)
+        if known is None:
+            has_uppercase, has_lowercase, has_numbers, has_symbols, patterns, has_repeated = scan
+            flags = (has_uppercase | has_lowercase << 1 | has_numbers << 2 | has_symbols << 3
+                     | is_common << 4 | bool(patterns) << 5 | has_repeated << 6)
+            known = self._verdicts[key] = (flags, self._build_verdict(length, is_common, *scan))
+        return known
+    
+    def _is_common(self, password_lower: str) -> bool:
+        """Check the built-in list, then the large list if one is configured"""
+        if password_lower in self.COMMON_PASSWORDS:
+            return True
+        return self.common_passwords is not None and password_lower in self.common_passwords
+    
+    def _scan(self, password: str) -> Tuple[bool, bool, bool, bool, int, bool]:
+        """
+        Single pass over the password.
         
+        Character classes come from one set() of the characters (a C-level
+        pass); a single Python loop then drives the keyword automaton over
+        the lowercased text and tracks runs of identical characters. Long or
+        non-ASCII passwords use substring checks and a regex instead, whose
+        C loops outrun the Python one there.
+        
+        Returns:
+            (has_uppercase, has_lowercase, has_numbers, has_symbols,
+             pattern_flags, has_repeated)
+        """
+        chars = set(password)
+        upper = not UPPERCASE.isdisjoint(chars)
+        lower = not LOWERCASE.isdisjoint(chars)
+        digit = not DIGITS.isdisjoint(chars)
+        symbol = not SYMBOLS.isdisjoint(chars)
+        if not digit and not password.isascii():
+            # \d also matches non-ASCII decimal digits
+            digit = any(ch.isdecimal() for ch in chars)
+        
+        folded = password.lower()
+        if len(password) > LOOP_SCAN_MAX_LENGTH or not password.isascii():
+            patterns = 0
+            for keyword in self.KEYBOARD_PATTERNS:
+                if keyword in folded:
+                    patterns = KEYBOARD
+                    break
+            for keyword in self.SEQUENTIAL_PATTERNS:
+                if keyword in folded:
+                    patterns |= SEQUENTIAL
+                    break
+            return upper, lower, digit, symbol, patterns, REPEATED_CHARS.search(password) is not None
+        
+        transitions = self.TRANSITIONS
+        outputs = self.OUTPUTS
+        patterns = 0
+        state = 0
+        repeated = False
+        previous = None
+        run = 0
+        
+        # Short ASCII text: every character lowercases to exactly one
+        for ch, low in zip(password, folded):
+            state = transitions[state].get(low, 0)
+            patterns |= outputs[state]
+            
+            # 3+ identical characters in a row ('.' never matched a newline)
+            if ch == previous:
+                run += 1
+                if run == 3 and ch != '\n':
+                    repeated = True
+            else:
+                previous = ch
+                run = 1
+        
+        return upper, lower, digit, symbol, patterns, repeated
+    
+    def _build_verdict(
+        self,
+        length: int,
+        is_common: bool,
+        has_uppercase: bool,
+        has_lowercase: bool,
+        has_numbers: bool,
+        has_symbols: bool,
+        patterns: int,
+        has_repeated: bool
+    ) -> Verdict:
+        """Score a scanned password and assemble feedback"""
+        score = 0
+        issues = []
+        
+        # ==================== Length Analysis ====================
         if length >= 16:
             score += 30
         elif length >= 12:
@@ -77,93 +387,63 @@ class PasswordAnalyzer:
             score += 15
         elif length >= 6:
             score += 10
-            feedback.append("Password is too short")
-            suggestions.append("Use at least 8 characters (12+ recommended)")
+            issues.append("too_short")
         else:
             score += 5
-            feedback.append("Password is very short")
-            suggestions.append("Use at least 8 characters (12+ recommended)")
+            issues.append("very_short")
         
         # ==================== Character Variety ====================
         
         # Uppercase letters
-        if re.search(r'[A-Z]', password):
+        if has_uppercase:
             score += 15
-            details["has_uppercase"] = True
         else:
-            feedback.append("No uppercase letters")
-            suggestions.append("Add uppercase letters (A-Z)")
+            issues.append("no_uppercase")
         
         # Lowercase letters
-        if re.search(r'[a-z]', password):
+        if has_lowercase:
             score += 10
-            details["has_lowercase"] = True
         else:
-            feedback.append("No lowercase letters")
-            suggestions.append("Add lowercase letters (a-z)")
+            issues.append("no_lowercase")
         
         # Numbers
-        if re.search(r'\d', password):
+        if has_numbers:
             score += 15
-            details["has_numbers"] = True
         else:
-            feedback.append("No numbers")
-            suggestions.append("Add numbers (0-9)")
+            issues.append("no_numbers")
         
         # Special characters
-        if re.search(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?`~]', password):
+        if has_symbols:
             score += 20
-            details["has_symbols"] = True
         else:
-            feedback.append("No special characters")
-            suggestions.append("Add special characters (!@#$%^&*)")
+            issues.append("no_symbols")
         
         # ==================== Pattern Detection ====================
         
         # Common password check
-        if password.lower() in self.COMMON_PASSWORDS:
+        if is_common:
             score = max(5, score - 40)
-            details["is_common"] = True
-            feedback.insert(0, "⚠️ This is a commonly used password!")
-            suggestions.insert(0, "Choose a unique password that isn't commonly used")
+            issues.insert(0, "common")
         
         # Keyboard patterns
-        password_lower = password.lower()
-        for pattern in self.KEYBOARD_PATTERNS:
-            if pattern in password_lower:
-                score = max(5, score - 15)
-                details["has_patterns"] = True
-                if "Keyboard pattern detected" not in feedback:
-                    feedback.append("Keyboard pattern detected")
-                    suggestions.append("Avoid keyboard patterns like 'qwerty' or 'asdf'")
-                break
+        if patterns & KEYBOARD:
+            score = max(5, score - 15)
+            issues.append("keyboard")
         
         # Sequential patterns
-        for pattern in self.SEQUENTIAL_PATTERNS:
-            if pattern in password_lower:
-                score = max(5, score - 10)
-                details["has_patterns"] = True
-                if "Sequential pattern detected" not in feedback:
-                    feedback.append("Sequential pattern detected")
-                    suggestions.append("Avoid sequential characters like '123' or 'abc'")
-                break
+        if patterns & SEQUENTIAL:
+            score = max(5, score - 10)
+            issues.append("sequential")
         
         # Repeated characters
-        if self.REPEATED_CHARS.search(password):
+        if has_repeated:
             score = max(5, score - 10)
-            details["has_repeated"] = True
-            feedback.append("Repeated characters detected")
-            suggestions.append("Avoid repeating the same character multiple times")
+            issues.append("repeated")
         
         # ==================== Calculate Final Score ====================
         
         # Bonus for mixing character types
-        char_types = sum([
-            details["has_uppercase"],
-            details["has_lowercase"],
-            details["has_numbers"],
-            details["has_symbols"]
-        ])
+        char_types = has_uppercase + has_lowercase + has_numbers + has_symbols
         
         if char_types >= 4:
             score += 10
@@ -177,17 +457,10 @@ class PasswordAnalyzer:
         strength, strength_color = self._get_strength_level(score)
         
         # Add encouragement if password is good
-        if not feedback:
-            feedback.append("✅ Great password!")
+        feedback = tuple(MESSAGES[issue][0] for issue in issues) or (NO_ISSUES,)
+        suggestions = tuple(MESSAGES[issue][1] for issue in issues)
         
-        return {
-            "score": score,
-            "strength": strength,
-            "strength_color": strength_color,
-            "feedback": feedback,
-            "suggestions": suggestions,
-            "details": details
-        }
+        return Verdict(score, strength, strength_color, feedback, suggestions)
     
     def _get_strength_level(self, score: int) -> tuple:
         """Get strength level and color based on score"""
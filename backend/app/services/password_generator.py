@@ -3,9 +3,16 @@ Secure Password Generator Service
 Generates cryptographically secure random passwords
 """
 
-import secrets
+import math
+import os
 import string
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from .wordlist import Wordlist
+
+MIN_LENGTH = 4
+MAX_LENGTH = 128
+MAX_WORDS = 20
 
 
 class PasswordGenerator:
@@ -20,6 +27,57 @@ class PasswordGenerator:
     # Ambiguous characters that can be confused
     AMBIGUOUS = "0O1lI|"
     
+    # Built-in passphrase words, used when no wordlist file is configured
+    # In production, use a larger word list like EFF's dice word list
+    PASSPHRASE_WORDS = [
+        "apple", "banana", "cherry", "dragon", "eagle", "falcon",
+        "galaxy", "harbor", "island", "jungle", "kindle", "lemon",
+        "mango", "nebula", "ocean", "phoenix", "quartz", "river",
+        "sunset", "tiger", "umbrella", "violin", "window", "xylophone",
+        "yellow", "zebra", "anchor", "bridge", "castle", "diamond",
+        "eclipse", "forest", "glacier", "horizon", "iceberg", "jasmine",
+        "kingdom", "lantern", "mountain", "nitrogen", "oxygen", "pyramid",
+        "quantum", "rainbow", "satellite", "thunder", "universe", "volcano",
+        "winter", "crystal", "dolphin", "elephant", "firefly", "garden"
+    ]
+    
+    def __init__(self, wordlist: Optional[Wordlist] = None):
+        """
+        Args:
+            wordlist: Passphrase wordlist, e.g. Wordlist.load() of the EFF
+                long list (defaults to PASSPHRASE_WORDS)
+        """
+        self.wordlist = wordlist if wordlist is not None else Wordlist(self.PASSPHRASE_WORDS)
+        # One GeneratorSpec per option combination (at most 32), built on first use
+        self._specs: Dict[Tuple[bool, ...], GeneratorSpec] = {}
+    
+    def spec(
+        self,
+        uppercase: bool = True,
+        lowercase: bool = True,
+        numbers: bool = True,
+        symbols: bool = True,
+        exclude_ambiguous: bool = True
+    ) -> "GeneratorSpec":
+        """Cached character tables and entropy for one combination of options"""
+        key = (uppercase, lowercase, numbers, symbols, exclude_ambiguous)
+        spec = self._specs.get(key)
+        if spec is None:
+            sets = [
+                chars for chars, wanted in (
+                    (self.UPPERCASE, uppercase),
+                    (self.LOWERCASE, lowercase),
+                    (self.NUMBERS, numbers),
+                    (self.SYMBOLS, symbols)
+                ) if wanted
+            ]
+            if exclude_ambiguous:
+                sets = [''.join(c for c in chars if c not in self.AMBIGUOUS) for chars in sets]
+            
+            # Fallback if no options selected
+            spec = self._specs[key] = GeneratorSpec(sets or [self.LOWERCASE])
+        return spec
+    
     def generate(
         self,
         length: int = 16,
@@ -43,59 +101,29 @@ class PasswordGenerator:
         Returns:
             A secure random password string
         """
-        # Validate length
-        length = max(4, min(128, length))
-        
-        # Build character set based on options
-        charset = ""
-        required_chars = []
-        
-        if uppercase:
-            chars = self.UPPERCASE
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.AMBIGUOUS)
-            charset += chars
-            required_chars.append(secrets.choice(chars))
-        
-        if lowercase:
-            chars = self.LOWERCASE
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.AMBIGUOUS)
-            charset += chars
-            required_chars.append(secrets.choice(chars))
-        
-        if numbers:
-            chars = self.NUMBERS
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.AMBIGUOUS)
-            charset += chars
-            required_chars.append(secrets.choice(chars))
-        
-        if symbols:
-            chars = self.SYMBOLS
-            if exclude_ambiguous:
-                chars = ''.join(c for c in chars if c not in self.AMBIGUOUS)
-            charset += chars
-            required_chars.append(secrets.choice(chars))
-        
-        # Fallback if no options selected
-        if not charset:
-            charset = self.LOWERCASE
-            required_chars = [secrets.choice(charset)]
-        
-        # Generate remaining characters
-        remaining_length = length - len(required_chars)
-        remaining_chars = [secrets.choice(charset) for _ in range(remaining_length)]
-        
-        # Combine and shuffle
-        all_chars = required_chars + remaining_chars
+        spec = self.spec(uppercase, lowercase, numbers, symbols, exclude_ambiguous)
+        return spec.generate(1, length)[0]
+    
+    def generate_many(
+        self,
+        n: int,
+        length: int = 16,
+        uppercase: bool = True,
+        lowercase: bool = True,
+        numbers: bool = True,
+        symbols: bool = True,
+        exclude_ambiguous: bool = True
+    ) -> List[str]:
+        """
+        Generate many passwords at once (provisioning jobs).
         
-        # Use Fisher-Yates shuffle with secrets for security
-        for i in range(len(all_chars) - 1, 0, -1):
-            j = secrets.randbelow(i + 1)
-            all_chars[i], all_chars[j] = all_chars[j], all_chars[i]
+        Same rules and distribution as generate(); see GeneratorSpec.generate.
         
-        return ''.join(all_chars)
+        Returns:
+            n password strings
+        """
+        spec = self.spec(uppercase, lowercase, numbers, symbols, exclude_ambiguous)
+        return spec.generate(n, length)
     
     def generate_passphrase(
         self,
@@ -114,25 +142,111 @@ class PasswordGenerator:
         Returns:
             A passphrase string
         """
-        # Simple word list for passphrases
-        # In production, use a larger word list like EFF's dice word list
-        words = [
-            "apple", "banana", "cherry", "dragon", "eagle", "falcon",
-            "galaxy", "harbor", "island", "jungle", "kindle", "lemon",
-            "mango", "nebula", "ocean", "phoenix", "quartz", "river",
-            "sunset", "tiger", "umbrella", "violin", "window", "xylophone",
-            "yellow", "zebra", "anchor", "bridge", "castle", "diamond",
-            "eclipse", "forest", "glacier", "horizon", "iceberg", "jasmine",
-            "kingdom", "lantern", "mountain", "nitrogen", "oxygen", "pyramid",
-            "quantum", "rainbow", "satellite", "thunder", "universe", "volcano",
-            "winter", "crystal", "dolphin", "elephant", "firefly", "garden"
-        ]
-        
-        # Select random words
-        selected = [secrets.choice(words) for _ in range(word_count)]
+        return self.generate_passphrases(1, word_count, separator, capitalize)[0]
+    
+    def generate_passphrases(
+        self,
+        n: int,
+        word_count: int = 4,
+        separator: str = "-",
+        capitalize: bool = True
+    ) -> List[str]:
+        """Generate n passphrases, drawing every word index in one batch"""
+        word_count = max(1, min(MAX_WORDS, word_count))
+        words = self.wordlist.words(n * word_count)
         
         # Capitalize if requested
         if capitalize:
-            selected = [word.capitalize() for word in selected]
+            words = [word.capitalize() for word in words]
         
-        return separator.join(selected)
+        return [separator.join(words[i:i + word_count]) for i in range(0, len(words), word_count)]
+    
+    def passphrase_entropy_bits(self, word_count: int) -> float:
+        """Entropy of a passphrase: word_count x log2(wordlist size)"""
+        return self.wordlist.entropy_bits(max(1, min(MAX_WORDS, word_count)))
+
+
+class GeneratorSpec:
+    """
+    Precomputed generation tables for one combination of options.
+    
+    Each character set (and their union) gets a 256-entry bytes.translate
+    table mapping a random byte onto the set, plus the bytes to delete: those
+    at or above the largest multiple of the set size (the rejection-sampling
+    threshold), so every character is equally likely.
+    """
+    
+    def __init__(self, sets: List[str]):
+        self.sets = tuple(sets)
+        self.charset = ''.join(sets)
+        self.tables = [self._table(chars) for chars in self.sets]
+        self.charset_table = self._table(self.charset)
+        self.bits_per_char = math.log2(len(self.charset))
+    
+    @staticmethod
+    def _table(chars: str) -> Tuple[bytes, bytes, int]:
+        size = len(chars)
+        limit = 256 - 256 % size
+        table = bytes(ord(chars[b % size]) if b < limit else 0 for b in range(256))
+        return table, bytes(range(limit, 256)), limit
+    
+    def entropy_bits(self, length: int) -> float:
+        """Charset entropy of a password of this length: length x log2(charset size)"""
+        return max(MIN_LENGTH, min(MAX_LENGTH, length)) * self.bits_per_char
+    
+    def generate(self, n: int, length: int) -> List[str]:
+        """
+        n passwords with one character from each set and the rest from their
+        union, in random order.
+        
+        Randomness comes from a few large os.urandom reads, mapped through the
+        precomputed tables in C; required characters are then inserted at
+        uniform positions (an inside-out shuffle).
+        """
+        length = max(MIN_LENGTH, min(MAX_LENGTH, length))
+        step = length - len(self.sets)
+        fill = _random_chars(self.charset_table, n * step)
+        required = [_random_chars(table, n) for table in self.tables]
+        slots = _RandomBytes(2 * n * len(self.sets))
+        
+        passwords = []
+        for i in range(n):
+            chars = list(fill[i * step:(i + 1) * step])
+            for chars_of_set in required:
+                chars.insert(slots.below(len(chars) + 1), chars_of_set[i])
+            passwords.append(''.join(chars))
+        return passwords
+
+
+def _random_chars(table: Tuple[bytes, bytes, int], count: int) -> str:
+    """count uniformly random characters through a GeneratorSpec table"""
+    translation, rejected, limit = table
+    out = []
+    have = 0
+    while have < count:
+        need = count - have
+        chunk = os.urandom(need * 256 // limit + 16).translate(translation, rejected)[:need]
+        out.append(chunk)
+        have += len(chunk)
+    return b''.join(out).decode('ascii')
+
+
+class _RandomBytes:
+    """Buffered os.urandom bytes for many small unbiased draws"""
+    
+    def __init__(self, size: int = 4096):
+        self.size = max(64, size)
+        self.buffer = os.urandom(self.size)
+        self.pos = 0
+    
+    def below(self, n: int) -> int:
+        """Uniform integer in [0, n) for 1 <= n <= 256"""
+        limit = 256 - 256 % n
+        while True:
+            if self.pos == len(self.buffer):
+                self.buffer = os.urandom(self.size)
+                self.pos = 0
+            byte = self.buffer[self.pos]
+            self.pos += 1
+            if byte < limit:
+                return byte % n
@@ -0,0 +1,99 @@
+"""
+Range Cache Service
+Bounded in-memory cache for parsed HIBP range responses
+Entries expire after a TTL and are evicted least-recently-used by byte size
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Approximate cost of one parsed entry: a 35-char suffix string, a small int
+# and the dict slot that holds them
+ENTRY_OVERHEAD_BYTES = 140
+
+
+class RangeCache:
+    """LRU + TTL cache of {prefix: {suffix: count}} range maps"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600.0):
+        """
+        Args:
+            max_bytes: Approximate memory budget for all cached ranges
+            ttl: Seconds a range stays fresh before it is fetched again
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, int]]]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, prefix: str) -> Optional[Dict[str, int]]:
+        """Return the cached range for a prefix, or None if missing/expired"""
+        entry = self._entries.get(prefix)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, size, counts = entry
+        if expires_at <= time.monotonic():
+            self._remove(prefix)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(prefix)
+        self.hits += 1
+        return counts
+
+    def put(self, prefix: str, counts: Dict[str, int]) -> None:
+        """Store a parsed range, evicting the least recently used ranges if needed"""
+        size = self.estimate_size(counts)
+        if size > self.max_bytes:
+            return
+
+        if prefix in self._entries:
+            self._remove(prefix)
+
+        self._entries[prefix] = (time.monotonic() + self.ttl, size, counts)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached range"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    @staticmethod
+    def estimate_size(counts: Dict[str, int]) -> int:
+        """Approximate memory used by one parsed range"""
+        return ENTRY_OVERHEAD_BYTES * (len(counts) + 1)
+
+    def _remove(self, prefix: str) -> None:
+        _, size, _ = self._entries.pop(prefix)
+        self.current_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
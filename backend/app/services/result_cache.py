@@ -0,0 +1,92 @@
+"""
+Result Cache Service
+Memoizes analysis results for passwords that are submitted again (repeated
+debounces, the extension re-checking on focus). Entries are keyed by an
+HMAC-SHA256 of the password under a per-process secret, so the cache never
+holds a plaintext password, and they expire after a TTL with LRU eviction.
+"""
+
+import hashlib
+import hmac
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResultCache:
+    """LRU + TTL cache of result dictionaries keyed by a keyed password hash"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0, enabled: bool = True):
+        """
+        Args:
+            max_entries: Results kept before the least recently used is evicted
+            ttl: Seconds a result stays valid
+            enabled: False turns every lookup into a miss and stores nothing
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._secret = os.urandom(32)
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, password: str) -> bytes:
+        return hmac.new(self._secret, password.encode("utf-8", "surrogatepass"), hashlib.sha256).digest()
+
+    def get(self, password: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a password, or None if missing/expired"""
+        if not self.enabled:
+            return None
+
+        key = self.key(password)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, password: str, result: Dict[str, Any]) -> None:
+        """Store a result (treated as read-only from now on)"""
+        if not self.enabled or self.max_entries <= 0:
+            return
+
+        key = self.key(password)
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
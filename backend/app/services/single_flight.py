@@ -0,0 +1,54 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one in-flight call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls by key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        The first caller starts the call; everyone arriving while it is still
+        running awaits the same future and receives the same result (or
+        exception). Cancelling one waiter never cancels the shared call.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Retrieve the exception so an unawaited failure isn't logged as lost
+        if not future.cancelled():
+            future.exception()
+
+    @property
+    def inflight(self) -> int:
+        """Number of distinct keys currently being fetched"""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": self.inflight
+        }
@@ -0,0 +1,237 @@
+"""
+Upstream Guard
+Protects the HIBP range API (and our tail latency) from each other: an
+adaptive token bucket for outgoing requests, jittered retry backoff that
+honors Retry-After, and a circuit breaker that fails fast while upstream
+is down
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class UpstreamUnavailable(Exception):
+    """The request was not sent: circuit open or local rate limit exhausted"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """
+    Async token bucket with AIMD rate adaptation.
+
+    Each acquire() claims a token immediately (the balance may go negative)
+    and sleeps until it is paid for, so concurrent callers queue in order
+    without a lock. A caller that would wait longer than max_wait is
+    rejected with UpstreamUnavailable instead of piling up.
+
+    A 429 halves the rate (down to min_rate, at most once per second so a
+    burst of 429s counts once) and, with a Retry-After, holds every request
+    until that much time has passed, then releases them at the current
+    rate; every success adds back 5% of the configured rate.
+    """
+
+    def __init__(self, rate: float, burst: int = 10, max_wait: float = 1.0, min_rate: Optional[float] = None):
+        """
+        Args:
+            rate: Requests per second; 0 disables limiting
+            burst: Tokens that can accumulate while idle
+            max_wait: Longest a caller may wait for a token, in seconds
+            min_rate: Floor for the adapted rate (default: rate / 20)
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 20
+        self.burst = max(1, burst)
+        self.max_wait = max_wait
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.penalized_at = float("-inf")
+        self.waits = 0
+        self.rejected = 0
+
+    def _refill(self) -> None:
+        # No tokens accrue during a Retry-After pause, so waiters resume
+        # spread out at the current rate instead of all at once
+        now = time.monotonic()
+        accrued = now - max(self.updated, self.resume_at)
+        if accrued > 0:
+            self.tokens = min(self.burst, self.tokens + accrued * self.rate)
+        self.updated = now
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """Wait for a token, at most max_wait seconds (default: self.max_wait)"""
+        if self.max_rate <= 0:
+            return
+        self._refill()
+        self.tokens -= 1
+        wait = max(0.0, self.resume_at - self.updated) + max(0.0, -self.tokens / self.rate)
+        if wait == 0:
+            return
+
+        if wait > (self.max_wait if max_wait is None else min(max_wait, self.max_wait)):
+            self.tokens += 1
+            self.rejected += 1
+            raise UpstreamUnavailable(f"HIBP request rate limit reached ({self.rate:g}/s)")
+        self.waits += 1
+        await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Back off after a 429"""
+        if self.max_rate <= 0:
+            return
+        self._refill()
+        if retry_after:
+            self.resume_at = max(self.resume_at, self.updated + retry_after)
+        if self.updated - self.penalized_at < 1.0:
+            return
+        self.penalized_at = self.updated
+        rate = max(self.min_rate, self.rate / 2)
+        if self.tokens < 0:
+            # Keep the queued callers' wait the same at the new rate
+            self.tokens *= rate / self.rate
+        self.rate = rate
+
+    def reward(self) -> None:
+        """Recover towards the configured rate after a success"""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def stats(self) -> Dict:
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "tokens": round(self.tokens, 3),
+            "waits": self.waits,
+            "rejected": self.rejected
+        }
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding window of requests.
+
+    closed: requests flow; once the last `window` requests include at least
+    failure_ratio failures, it opens.
+    open: requests are refused until reset_timeout has passed.
+    half_open: a single probe request is let through; its success closes
+    the circuit, its failure opens it again for another reset_timeout.
+
+    allow() hands out a ticket for each request it lets through, and its
+    outcome is recorded with that ticket. Once the circuit has opened, only
+    the probe's ticket changes state: outcomes of requests sent before it
+    opened neither close it early nor extend it, and only the probe frees
+    the probe slot in release().
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    # Ticket for every request that isn't the half-open probe
+    PASS = object()
+
+    def __init__(self, failure_ratio: float = 0.5, window: int = 100, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_ratio: Fraction of failed requests in the window that
+                opens the circuit (0 = never)
+            window: Requests considered; the circuit can't open before this
+                many outcomes are recorded
+            reset_timeout: Seconds to stay open before probing upstream again
+        """
+        self.failure_ratio = failure_ratio
+        self.window = max(1, window)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=self.window)
+        self._failures = 0
+        self.opened_at = 0.0
+        self._probe: Optional[object] = None
+        self.opens = 0
+        self.short_circuited = 0
+
+    def allow(self) -> Optional[object]:
+        """
+        Ticket for sending a request now, or None if the circuit refuses it
+        (claims the probe when half-open).
+        """
+        if self.state == self.CLOSED:
+            return self.PASS
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                return None
+            self.state = self.HALF_OPEN
+        if self._probe is not None:
+            self.short_circuited += 1
+            return None
+        self._probe = object()
+        return self._probe
+
+    def release(self, ticket: object) -> None:
+        """Give back a ticket whose request had no verdict (never sent, or throttled)"""
+        if ticket is self._probe:
+            self._probe = None
+
+    def _record(self, failed: bool) -> None:
+        if len(self._outcomes) == self.window:
+            self._failures -= self._outcomes[0]
+        self._outcomes.append(failed)
+        self._failures += failed
+
+    def record_success(self, ticket: object) -> None:
+        if self.state != self.CLOSED:
+            if ticket is not self._probe:
+                return
+            self.state = self.CLOSED
+            self._probe = None
+            self._outcomes.clear()
+            self._failures = 0
+        self._record(False)
+
+    def record_failure(self, ticket: object) -> None:
+        if self.state == self.CLOSED:
+            self._record(True)
+            if not (self.failure_ratio and len(self._outcomes) == self.window
+                    and self._failures >= self.failure_ratio * self.window):
+                return
+        elif ticket is not self._probe:
+            return
+        self.opens += 1
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe = None
+        self._outcomes.clear()
+        self._failures = 0
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "window_failures": self._failures,
+            "window_requests": len(self._outcomes),
+            "opens": self.opens,
+            "short_circuited": self.short_circuited
+        }
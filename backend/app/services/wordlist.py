@@ -0,0 +1,86 @@
+"""
+Passphrase Wordlist
+Loads a diceware wordlist once into one packed UTF-8 buffer plus an offset
+array (two allocations instead of thousands of str objects) and picks words
+with batched, unbiased random indices
+
+Accepts the EFF long wordlist format ("11111<TAB>abacus", 7776 words; see
+https://www.eff.org/dice) or a plain file with one word per line.
+"""
+
+import math
+import os
+from array import array
+from typing import Iterable, List
+
+
+class Wordlist:
+    """Read-only list of distinct words, packed into a single buffer"""
+
+    def __init__(self, words: Iterable[str]):
+        seen = set()
+        packed = bytearray()
+        offsets = array("I", [0])
+        for word in words:
+            if word in seen:
+                continue
+            seen.add(word)
+            packed += word.encode("utf-8")
+            offsets.append(len(packed))
+        if len(offsets) - 1 < 2:
+            raise ValueError("A passphrase wordlist needs at least 2 distinct words")
+        if len(offsets) - 1 > 1 << 16:
+            raise ValueError("Wordlists are limited to 65536 words")
+
+        self._buffer = bytes(packed)
+        self._offsets = offsets
+        self.bits_per_word = math.log2(len(self))
+
+    @classmethod
+    def load(cls, path: str) -> "Wordlist":
+        """Read an EFF-style dice wordlist or a one-word-per-line file"""
+        with open(path, encoding="utf-8") as f:
+            return cls(cls._parse(f))
+
+    @staticmethod
+    def _parse(lines: Iterable[str]) -> Iterable[str]:
+        for line in lines:
+            fields = line.split()
+            if not fields:
+                continue
+            # "11111<TAB>abacus": drop the dice roll
+            if len(fields) == 2 and fields[0].isdigit():
+                yield fields[1]
+            elif len(fields) == 1:
+                yield fields[0]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def entropy_bits(self, word_count: int) -> float:
+        return word_count * self.bits_per_word
+
+    def random_indices(self, count: int) -> List[int]:
+        """
+        count uniform random word indices.
+
+        Drawn as 16-bit values from batched os.urandom reads; values at or
+        above the largest multiple of the list size are rejected, so there
+        is no modulo bias.
+        """
+        size = len(self)
+        limit = 65536 - 65536 % size
+        indices: List[int] = []
+        while len(indices) < count:
+            need = count - len(indices)
+            values = array("H")
+            values.frombytes(os.urandom(2 * (need * 65536 // limit + 8)))
+            indices += [v % size for v in values if v < limit][:need]
+        return indices
+
+    def words(self, count: int) -> List[str]:
+        """count words chosen uniformly at random"""
+        return [self[i] for i in self.random_indices(count)]
@@ -0,0 +1,2 @@
+# Login Security Analyzer - Backend
+# Benchmarks (run from backend/: python -m benchmarks.<name>)
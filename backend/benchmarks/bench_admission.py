@@ -0,0 +1,136 @@
+"""
+Admission control benchmark
+Measures what per-client rate limiting and the concurrency cap cost per
+request (sketch lookup, middleware, and end to end on /api/generate) and
+how often the sketch wrongly limits well-behaved clients as the number of
+simultaneously active clients grows
+
+Usage:
+    python -m benchmarks.bench_admission [--requests 5000] [--width 4096] [--depth 4]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from app.services.admission import AdmissionControl, ClientRateLimiter, ConcurrencyLimiter
+
+
+def bench_sketch(args) -> None:
+    limiter = ClientRateLimiter(rate=1e9, burst=1e9, width=args.width, depth=args.depth)
+    keys = [f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(100_000)]
+    started = time.perf_counter()
+    for key in keys:
+        limiter.acquire(key)
+    per_call = (time.perf_counter() - started) / len(keys) * 1e9
+    print(f"ClientRateLimiter.acquire: {per_call:,.0f} ns/call "
+          f"({limiter.stats()['bytes'] / 1024:,.0f} KB for {args.width} x {args.depth} buckets)")
+
+    async def concurrency() -> float:
+        cap = ConcurrencyLimiter(64, 128)
+        rounds = 100_000
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await cap.acquire()
+            cap.release()
+        return (time.perf_counter() - started) / rounds * 1e9
+
+    print(f"ConcurrencyLimiter acquire+release: {asyncio.run(concurrency()):,.0f} ns")
+
+
+def bench_accuracy(args) -> None:
+    """
+    Within one refill window: light clients send 4 requests each (under a
+    burst of 20), 10 heavy clients send 200. Ideally no light request is
+    refused and every heavy client gets exactly 20.
+    """
+    print(f"\n{'active clients':>15} {'light refused':>14} {'heavy allowed/client':>21}")
+    for active in (1_000, 5_000, 20_000, 50_000):
+        limiter = ClientRateLimiter(rate=1e-9, burst=20, width=args.width, depth=args.depth)
+        refused = 0
+        for _ in range(4):
+            for i in range(active):
+                refused += limiter.acquire(f"ip:light-{i}") > 0
+        heavy_allowed = 0
+        for i in range(10):
+            heavy_allowed += sum(limiter.acquire(f"ip:heavy-{i}") == 0 for _ in range(200))
+        print(f"{active:>15,} {refused / (4 * active):>14.3%} {heavy_allowed / 10:>21.1f}")
+
+
+async def bench_middleware(args) -> None:
+    """Middleware cost alone, in front of an app that does nothing"""
+
+    async def empty_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    guarded = AdmissionControl(
+        empty_app,
+        {"/api/generate": ClientRateLimiter(1e9, 1e9, args.width, args.depth)},
+        ConcurrencyLimiter(64, 128)
+    )
+    scopes = [
+        {"type": "http", "method": "POST", "path": "/api/generate", "headers": [],
+         "client": (f"10.0.{i >> 8 & 255}.{i & 255}", 1234)}
+        for i in range(10_000)
+    ]
+    for name, app in (("bare", empty_app), ("admission", guarded)):
+        started = time.perf_counter()
+        for scope in scopes:
+            await app(scope, receive, send)
+        print(f"ASGI call, {name:>9}: {(time.perf_counter() - started) / len(scopes) * 1e6:6.2f} us")
+
+
+async def bench_endpoint(args) -> None:
+    """End to end: /api/generate through the app, with and without admission control"""
+    os.environ["ADMISSION_ENABLED"] = "false"
+    from app import main
+
+    guarded = AdmissionControl(
+        main.app,
+        {"/api/generate": ClientRateLimiter(1e9, 1e9, args.width, args.depth)},
+        ConcurrencyLimiter(64, 128)
+    )
+    print()
+    for name, app in (("without", main.app), ("with", guarded)):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(100):
+                await client.post("/api/generate", json={"length": 16})
+            latencies = []
+            started = time.perf_counter()
+            for i in range(args.requests):
+                before = time.perf_counter()
+                await client.post("/api/generate", json={"length": 16})
+                latencies.append(time.perf_counter() - before)
+            elapsed = time.perf_counter() - started
+        latencies.sort()
+        print(f"/api/generate {name:>7} admission: {args.requests / elapsed:8,.0f} req/s, "
+              f"p50 {latencies[len(latencies) // 2] * 1e6:6.0f} us, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:6.0f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per end-to-end run")
+    parser.add_argument("--width", type=int, default=4096)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    bench_sketch(args)
+    asyncio.run(bench_middleware(args))
+    bench_accuracy(args)
+    asyncio.run(bench_endpoint(args))
+
+
+if __name__ == "__main__":
+    main()
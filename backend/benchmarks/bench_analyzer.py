@@ -0,0 +1,244 @@
+"""
+PasswordAnalyzer microbenchmark and golden check
+Times analyze() against the original regex / linear-scan implementation
+and verifies that both produce byte-identical JSON on a golden corpus
+
+Usage:
+    python -m benchmarks.bench_analyzer [--corpus 20000]
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import timeit
+from typing import Any, Dict, List
+
+from app.services.password_analyzer import PasswordAnalyzer
+
+
+class ReferenceAnalyzer(PasswordAnalyzer):
+    """The original implementation: four re.search calls, two linear pattern scans"""
+    
+    REPEATED_CHARS = re.compile(r'(.)\1{2,}')  # 3+ repeated chars
+    
+    def analyze(self, password: str) -> Dict[str, Any]:
+        """
+        Analyze a password and return detailed strength information.
+        
+        Returns:
+            Dictionary containing score, strength level, feedback, and details
+        """
+        if not password:
+            return self._empty_result()
+        
+        score = 0
+        feedback = []
+        suggestions = []
+        details = {
+            "length": len(password),
+            "has_uppercase": False,
+            "has_lowercase": False,
+            "has_numbers": False,
+            "has_symbols": False,
+            "is_common": False,
+            "has_patterns": False,
+            "has_repeated": False
+        }
+        
+        # ==================== Length Analysis ====================
+        length = len(password)
+        details["length"] = length
+        
+        if length >= 16:
+            score += 30
+        elif length >= 12:
+            score += 25
+        elif length >= 10:
+            score += 20
+        elif length >= 8:
+            score += 15
+        elif length >= 6:
+            score += 10
+            feedback.append("Password is too short")
+            suggestions.append("Use at least 8 characters (12+ recommended)")
+        else:
+            score += 5
+            feedback.append("Password is very short")
+            suggestions.append("Use at least 8 characters (12+ recommended)")
+        
+        # ==================== Character Variety ====================
+        
+        # Uppercase letters
+        if re.search(r'[A-Z]', password):
+            score += 15
+            details["has_uppercase"] = True
+        else:
+            feedback.append("No uppercase letters")
+            suggestions.append("Add uppercase letters (A-Z)")
+        
+        # Lowercase letters
+        if re.search(r'[a-z]', password):
+            score += 10
+            details["has_lowercase"] = True
+        else:
+            feedback.append("No lowercase letters")
+            suggestions.append("Add lowercase letters (a-z)")
+        
+        # Numbers
+        if re.search(r'\d', password):
+            score += 15
+            details["has_numbers"] = True
+        else:
+            feedback.append("No numbers")
+            suggestions.append("Add numbers (0-9)")
+        
+        # Special characters
+        if re.search(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?`~]', password):
+            score += 20
+            details["has_symbols"] = True
+        else:
+            feedback.append("No special characters")
+            suggestions.append("Add special characters (!@#$%^&*)")
+        
+        # ==================== Pattern Detection ====================
+        
+        # Common password check
+        if password.lower() in self.COMMON_PASSWORDS:
+            score = max(5, score - 40)
+            details["is_common"] = True
+            feedback.insert(0, "⚠️ This is a commonly used password!")
+            suggestions.insert(0, "Choose a unique password that isn't commonly used")
+        
+        # Keyboard patterns
+        password_lower = password.lower()
+        for pattern in self.KEYBOARD_PATTERNS:
+            if pattern in password_lower:
+                score = max(5, score - 15)
+                details["has_patterns"] = True
+                if "Keyboard pattern detected" not in feedback:
+                    feedback.append("Keyboard pattern detected")
+                    suggestions.append("Avoid keyboard patterns like 'qwerty' or 'asdf'")
+                break
+        
+        # Sequential patterns
+        for pattern in self.SEQUENTIAL_PATTERNS:
+            if pattern in password_lower:
+                score = max(5, score - 10)
+                details["has_patterns"] = True
+                if "Sequential pattern detected" not in feedback:
+                    feedback.append("Sequential pattern detected")
+                    suggestions.append("Avoid sequential characters like '123' or 'abc'")
+                break
+        
+        # Repeated characters
+        if self.REPEATED_CHARS.search(password):
+            score = max(5, score - 10)
+            details["has_repeated"] = True
+            feedback.append("Repeated characters detected")
+            suggestions.append("Avoid repeating the same character multiple times")
+        
+        # ==================== Calculate Final Score ====================
+        
+        # Bonus for mixing character types
+        char_types = sum([
+            details["has_uppercase"],
+            details["has_lowercase"],
+            details["has_numbers"],
+            details["has_symbols"]
+        ])
+        
+        if char_types >= 4:
+            score += 10
+        elif char_types >= 3:
+            score += 5
+        
+        # Cap score at 100
+        score = min(100, max(0, score))
+        
+        # Determine strength level
+        strength, strength_color = self._get_strength_level(score)
+        
+        # Add encouragement if password is good
+        if not feedback:
+            feedback.append("✅ Great password!")
+        
+        return {
+            "score": score,
+            "strength": strength,
+            "strength_color": strength_color,
+            "feedback": feedback,
+            "suggestions": suggestions,
+            "details": details
+        }
+
+
+# Fragments that exercise every branch: patterns, repeats, unicode case
+# folding (e.g. 'İ' lowercases to two characters), non-ASCII digits, newlines
+FRAGMENTS = (
+    list(PasswordAnalyzer.KEYBOARD_PATTERNS) + list(PasswordAnalyzer.SEQUENTIAL_PATTERNS) +
+    sorted(PasswordAnalyzer.COMMON_PASSWORDS) +
+    ["QWERTY", "AbC", "aaa", "111", "!!!", "\n\n\n", "zz", "İ", "Σ", "٣", "１２３", "ß", "é",
+     "pass", "word", "2024", " ", "\t", "🔐", "ǅ", "ﬃ"]
+)
+ALPHABET = string.ascii_letters + string.digits + string.punctuation + " éßİΣ٣😀\n"
+
+
+def golden_corpus(n: int, seed: int = 1234) -> List[str]:
+    rng = random.Random(seed)
+    corpus = ["", "a", "password", "Password", "P@ssw0rd!", "Tr0ub4dor&3",
+              "correct horse battery staple", "x" * 200]
+    corpus += sorted(PasswordAnalyzer.COMMON_PASSWORDS)
+    while len(corpus) < n:
+        parts = []
+        for _ in range(rng.randint(1, 5)):
+            if rng.random() < 0.4:
+                parts.append(rng.choice(FRAGMENTS))
+            else:
+                parts.append("".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 8))))
+        word = "".join(parts)
+        corpus.append(word.upper() if rng.random() < 0.1 else word)
+    return corpus
+
+
+def dump(result: Dict[str, Any]) -> bytes:
+    return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PasswordAnalyzer benchmark")
+    parser.add_argument("--corpus", type=int, default=20_000)
+    args = parser.parse_args()
+
+    corpus = golden_corpus(args.corpus)
+    reference = ReferenceAnalyzer()
+    analyzer = PasswordAnalyzer()
+
+    mismatches = [p for p in corpus if dump(reference.analyze(p)) != dump(analyzer.analyze(p))]
+    print(f"Golden corpus: {len(corpus):,} passwords, {len(mismatches)} mismatches")
+    for password in mismatches[:5]:
+        print(f"  {password!r}")
+    if mismatches:
+        raise SystemExit(1)
+
+    samples = {
+        "short (8)": "abc12345",
+        "typical (12)": "Summer2024!x",
+        "long (64)": "Xk9#mQ2$vL7@pR4&" * 4,
+        "unicode (16)": "пароль٣İΣéßpass!",
+    }
+    print(f"{'input':<14} {'reference':>12} {'single-pass':>12} {'speedup':>8}")
+    for label, password in samples.items():
+        ref = min(timeit.repeat(lambda: reference.analyze(password), number=20000, repeat=5)) / 20000
+        new = min(timeit.repeat(lambda: analyzer.analyze(password), number=20000, repeat=5)) / 20000
+        print(f"{label:<14} {ref * 1e6:>9.2f} us {new * 1e6:>9.2f} us {ref / new:>7.2f}x")
+
+    ref = min(timeit.repeat(lambda: [reference.analyze(p) for p in corpus], number=1, repeat=3))
+    new = min(timeit.repeat(lambda: [analyzer.analyze(p) for p in corpus], number=1, repeat=3))
+    print(f"{'whole corpus':<14} {ref / len(corpus) * 1e6:>9.2f} us {new / len(corpus) * 1e6:>9.2f} us "
+          f"{ref / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
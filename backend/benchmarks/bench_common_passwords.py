@@ -0,0 +1,89 @@
+"""
+Common-password list benchmark
+Compares memory, load time and lookup latency of the memory-mapped
+CommonPasswordList against a plain Python set of the same words
+
+Usage:
+    python -m benchmarks.bench_common_passwords [--words 1000000]
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from app.services.common_passwords import CommonPasswordList, build_common_passwords
+
+
+def synthetic_words(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + string.digits
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(alphabet) for _ in range(rng.randint(5, 14))))
+    return sorted(words, key=lambda w: rng.random())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Common-password list benchmark")
+    parser.add_argument("--words", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    words = synthetic_words(args.words)
+    hits = random.Random(1).sample(words, 1000)
+    misses = [w + "#" for w in hits]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "common.cpw")
+        text_path = os.path.join(tmp, "common.txt")
+        with open(text_path, "w") as f:
+            f.write("\n".join(words))
+
+        started = time.perf_counter()
+        build_common_passwords(words, path)
+        build_time = time.perf_counter() - started
+        file_size = os.path.getsize(path)
+
+        # The set baseline loads the text list the way a naive loader would
+        def load_set():
+            with open(text_path) as f:
+                return set(f.read().split("\n"))
+
+        started = time.perf_counter()
+        plain = load_set()
+        set_load = time.perf_counter() - started
+
+        del plain
+        tracemalloc.start()
+        plain = load_set()
+        set_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        mapped = CommonPasswordList(path)
+        len(mapped)  # force the mapping
+        map_load = time.perf_counter() - started
+
+        assert all(w in mapped for w in hits) and not any(w in mapped for w in misses)
+
+        def per_lookup(container, sample):
+            return min(timeit.repeat(lambda: [w in container for w in sample],
+                                     number=20, repeat=5)) / (20 * len(sample))
+
+        print(f"{len(words):,} words (built in {build_time:.1f}s)")
+        print(f"{'':<22} {'python set':>14} {'mmap table':>14}")
+        print(f"{'memory':<22} {set_bytes / 2**20:>11.1f} MB {file_size / 2**20:>11.1f} MB (file, paged on demand)")
+        print(f"{'load':<22} {set_load * 1e3:>11.1f} ms {map_load * 1e3:>11.3f} ms")
+        print(f"{'lookup (hit)':<22} {per_lookup(plain, hits) * 1e6:>11.3f} us "
+              f"{per_lookup(mapped, hits) * 1e6:>11.3f} us")
+        print(f"{'lookup (miss)':<22} {per_lookup(plain, misses) * 1e6:>11.3f} us "
+              f"{per_lookup(mapped, misses) * 1e6:>11.3f} us")
+        mapped.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Analysis pool benchmark
+Measures bulk PasswordAnalyzer throughput against the number of worker
+processes, and how responsive the event loop stays while a batch runs
+
+Usage:
+    python -m benchmarks.bench_pool [--passwords 200000] [--max-workers 8]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import string
+import time
+
+from app.services.analysis_pool import AnalysisPool
+from app.services.password_analyzer import PasswordAnalyzer
+
+
+def make_corpus(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(6, 20))) for _ in range(n)]
+
+
+async def measure(pool: AnalysisPool, passwords: list) -> tuple:
+    """Return (passwords/s, worst event-loop stall in ms) for one run"""
+    worst_stall = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal worst_stall
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst_stall = max(worst_stall, time.perf_counter() - before - 0.01)
+
+    ticker = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await pool.analyze_many(passwords, ("score", "strength"))
+    elapsed = time.perf_counter() - started
+    running = False
+    await ticker
+    return len(passwords) / elapsed, worst_stall * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--passwords", type=int, default=200_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    passwords = make_corpus(args.passwords)
+    analyzer = PasswordAnalyzer()
+    print(f"{len(passwords):,} passwords, {os.cpu_count()} cores visible")
+    print(f"{'workers':>8} {'passwords/s':>12} {'speedup':>8} {'max loop stall':>15}")
+
+    baseline = None
+    for workers in [0] + [w for w in (1, 2, 4, 8, 16, 32) if w <= args.max_workers]:
+        pool = AnalysisPool(analyzer, workers=workers, chunk_size=args.chunk_size)
+        pool.start()
+        try:
+            # Warm up worker processes before timing
+            await pool.analyze_many(passwords[:args.chunk_size * max(workers, 1)])
+            rate, stall = await measure(pool, passwords)
+        finally:
+            pool.close()
+        baseline = baseline or rate
+        label = "thread" if workers == 0 else str(workers)
+        print(f"{label:>8} {rate:>12,.0f} {rate / baseline:>7.2f}x {stall:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
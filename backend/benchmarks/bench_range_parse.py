@@ -0,0 +1,72 @@
+"""
+Range parsing microbenchmark
+Compares the per-check CPU cost of scanning a HIBP range body line by line
+(the original check loop, and the per-line dict parse it was first cached
+with) against the single-pass byte parser and a cached dict lookup
+
+Usage:
+    python -m benchmarks.bench_range_parse
+"""
+
+import timeit
+
+from app.fake_hibp import range_lines
+from app.services.breach_checker import parse_range
+
+
+def legacy_scan(body: bytes, suffix: str) -> int:
+    """The original BreachChecker loop: splitlines + split(':') + upper() per line"""
+    for line in body.decode('utf-8').splitlines():
+        if ':' in line:
+            hash_suffix, count = line.split(':')
+            if hash_suffix.upper() == suffix:
+                return int(count)
+    return 0
+
+
+def per_line_parse(body: bytes):
+    """The per-line dict parse: splitlines + split(':') + upper() + int() per line"""
+    counts = {}
+    for line in body.decode('utf-8').splitlines():
+        if ':' in line:
+            hash_suffix, count = line.split(':')
+            count = int(count)
+            if count:
+                counts[hash_suffix.upper()] = count
+    return counts
+
+
+def bench(label: str, fn, number: int = 500) -> float:
+    per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<34} {per_call * 1e6:9.1f} us/check")
+    return per_call
+
+
+def main() -> None:
+    rows = range_lines("ABCDE", {}, entries=800, padding=True)
+    body = "\r\n".join(f"{suffix}:{count}" for suffix, count in rows).encode()
+    present = next(suffix for suffix, count in rows if count)
+    absent = "F" * 35
+
+    parsed = parse_range(body)
+    assert parsed[present] == legacy_scan(body, present)
+    assert absent not in parsed
+    assert parsed == per_line_parse(body)
+
+    print(f"Range body: {len(rows)} lines ({len(body):,} bytes, {len(rows) - len(parsed)} padding)")
+    print("Miss (suffix absent - the common case, scans the whole body):")
+    scan = bench("legacy scan, no cache", lambda: legacy_scan(body, absent))
+    base = bench("per-line dict parse", lambda: per_line_parse(body).get(absent, 0))
+    new = bench("single-pass parse_range", lambda: parse_range(body).get(absent, 0))
+    cached = bench("cached dict lookup", lambda: parsed.get(absent, 0), number=1_000_000)
+    print(f"  parse speedup {base / new:.1f}x vs per-line parse; "
+          f"cached check {scan / cached:,.0f}x cheaper than a full scan")
+
+    print("Hit (suffix halfway down the body):")
+    bench("legacy scan, no cache", lambda: legacy_scan(body, present))
+    bench("per-line dict parse", lambda: per_line_parse(body).get(present, 0))
+    bench("single-pass parse_range", lambda: parse_range(body).get(present, 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Response path benchmark
+Requests/sec of the hot endpoints served the old way (dict validated
+through the response_model and encoded by the stdlib json module) against
+the direct orjson response and the compact schema, measured by calling the
+ASGI app in-process so no client or network cost hides the difference
+
+Usage:
+    python -m benchmarks.bench_responses [--requests 20000] [--passwords 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import string
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+from fastapi.responses import JSONResponse
+
+from app.fake_hibp import create_app
+from app.services.password_analyzer import compact_result
+
+
+def make_scope(path: str, query: str) -> Dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "server": ("bench", 80),
+        "client": ("127.0.0.1", 1234),
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")]
+    }
+
+
+async def call(app, scope: Dict, body: bytes) -> Tuple[int, bytes]:
+    status, chunks = 0, []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        else:
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def measure(app, path: str, bodies: List[bytes], requests: int) -> Dict[str, float]:
+    route, _, query = path.partition("?")
+    scope = make_scope(route, query)
+    for body in bodies:
+        status, content = await call(app, dict(scope), body)
+        if status != 200:
+            raise RuntimeError(f"{path}: HTTP {status} {content[:200]!r}")
+    size = len(content)
+    started = time.perf_counter()
+    for i in range(requests):
+        await call(app, dict(scope), bodies[i % len(bodies)])
+    elapsed = time.perf_counter() - started
+    return {"rps": requests / elapsed, "us": elapsed / requests * 1e6, "bytes": size}
+
+
+def add_legacy_routes(main) -> None:
+    """The pre-existing handlers: return a dict and let FastAPI validate it"""
+
+    async def legacy_analyze(request: main.PasswordRequest):
+        return await main.analyze_cached(request.password)
+
+    async def legacy_full(request: main.PasswordRequest):
+        # Warm cache hits only: the first pass fills the cache through the real endpoint
+        result = main.full_analysis_cache.get(request.password)
+        if result is None:
+            await main.full_analysis(request)
+            result = main.full_analysis_cache.get(request.password)
+        return result
+
+    async def legacy_generate(request: main.GenerateRequest):
+        spec = main.password_generator.spec(
+            uppercase=request.include_uppercase,
+            lowercase=request.include_lowercase,
+            numbers=request.include_numbers,
+            symbols=request.include_symbols,
+            exclude_ambiguous=request.exclude_ambiguous
+        )
+        password = spec.generate(1, request.length)[0]
+        analysis = await main.analyze_cached(password)
+        return {
+            "password": password,
+            "score": analysis["score"],
+            "strength": analysis["strength"],
+            "entropy_bits": round(spec.entropy_bits(request.length), 2)
+        }
+
+    for path, endpoint, model in (
+        ("/legacy/analyze", legacy_analyze, main.AnalysisResponse),
+        ("/legacy/full-analysis", legacy_full, main.FullAnalysisResponse),
+        ("/legacy/generate", legacy_generate, main.GenerateResponse),
+    ):
+        main.app.add_api_route(path, endpoint, methods=["POST"], response_model=model)
+
+
+def bench_encoders(results: List[Dict]) -> None:
+    """Encoding alone, per result"""
+    from pydantic import TypeAdapter
+    from app.main import AnalysisResponse, FastJSONResponse
+
+    model = TypeAdapter(AnalysisResponse)
+    cases: List[Tuple[str, Callable]] = [
+        # What FastAPI does with a response_model: newer releases dump JSON in
+        # pydantic-core, older ones dump Python objects for the json module
+        ("model, pydantic json", lambda r: model.dump_json(model.validate_python(r))),
+        ("model, json module", lambda r: JSONResponse(model.dump_python(model.validate_python(r), mode="json")).body),
+        ("json module", lambda r: JSONResponse(r).body),
+        ("FastJSONResponse", lambda r: FastJSONResponse(r).body),
+        ("compact", lambda r: FastJSONResponse(compact_result(r)).body),
+    ]
+    print(f"{'encoding one result':<24} {'us':>8}")
+    for name, encode in cases:
+        started = time.perf_counter()
+        for _ in range(20):
+            for result in results:
+                encode(result)
+        print(f"{name:<24} {(time.perf_counter() - started) / (20 * len(results)) * 1e6:>8.2f}")
+
+
+async def run(args) -> None:
+    # One client sends everything; keep per-client limits and the HIBP quota out of it
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    os.environ.setdefault("HIBP_RATE_LIMIT", "0")
+    from app import main
+
+    main.breach_checker.transport = httpx.ASGITransport(app=create_app())
+    await main.breach_checker.start()
+    add_legacy_routes(main)
+
+    rng = random.Random(3)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    passwords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(6, 20))) for _ in range(args.passwords)]
+    bodies = [json.dumps({"password": p}).encode() for p in passwords]
+    generate = [json.dumps({"length": 16}).encode()]
+
+    bench_encoders([await main.analyze_cached(p) for p in passwords])
+
+    cases = [
+        ("/api/analyze", [("legacy", "/legacy/analyze"), ("orjson", "/api/analyze"),
+                          ("compact", "/api/analyze?compact=true")], bodies),
+        ("/api/full-analysis", [("legacy", "/legacy/full-analysis"), ("orjson", "/api/full-analysis"),
+                                ("compact", "/api/full-analysis?compact=true")], bodies),
+        ("/api/generate", [("legacy", "/legacy/generate"), ("orjson", "/api/generate")], generate),
+    ]
+    print(f"\n{'endpoint (warm caches)':<22} {'path':<8} {'req/s':>9} {'us/req':>8} {'bytes':>6} {'speedup':>8}")
+    for endpoint, variants, inputs in cases:
+        base = None
+        for name, path in variants:
+            r = await measure(main.app, path, inputs, args.requests)
+            base = base or r["rps"]
+            print(f"{endpoint:<22} {name:<8} {r['rps']:>9,.0f} {r['us']:>8.1f} {r['bytes']:>6} "
+                  f"{r['rps'] / base:>7.2f}x")
+
+    await main.breach_checker.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per case")
+    parser.add_argument("--passwords", type=int, default=200, help="Distinct passwords (results cached after the first pass)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Shared range cache benchmark
+Runs several simulated uvicorn workers (processes) over the same skewed
+stream of breach checks and compares the range cache hit rate, upstream
+fetches and wall time of the memory, sqlite and redis (fake) backends,
+plus the size and speed of the binary range encoding
+
+Usage:
+    python -m benchmarks.bench_shared_cache [--workers 4] [--checks 3000]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from app.fake_hibp import range_lines
+from app.fake_redis import FakeRedis
+from app.services.breach_checker import BreachChecker
+from app.services.cache_backends import create_backend, decode_range, encode_range
+from app.services.range_cache import RangeCache
+
+
+def make_stream(n: int, prefixes: int, seed: int) -> list:
+    """Passwords whose SHA-1 prefixes follow a Zipf-like popularity curve"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(prefixes)]
+    return [f"password-{i}" for i in rng.choices(range(prefixes), weights, k=n)]
+
+
+def run_worker(kind: str, path: str, url: str, checks: int, prefixes: int, seed: int,
+               latency: float, results) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        prefix = request.url.path.rsplit("/", 1)[-1]
+        body = "\r\n".join(f"{s}:{c}" for s, c in range_lines(prefix, {}))
+        return httpx.Response(200, text=body)
+
+    async def main() -> dict:
+        checker = BreachChecker(
+            transport=httpx.MockTransport(handler),
+            cache=create_backend(kind, RangeCache(), path=path, url=url)
+        )
+        await checker.start()
+        started = time.perf_counter()
+        for password in make_stream(checks, prefixes, seed):
+            await checker.check(password)
+        elapsed = time.perf_counter() - started
+        stats = checker.coalescing_stats()
+        await checker.close()
+        return {"fetches": stats["calls"], "elapsed": elapsed}
+
+    results.put(asyncio.run(main()))
+
+
+def run_fake_redis(port: int, ready) -> None:
+    async def main() -> None:
+        server = await FakeRedis().serve("127.0.0.1", port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def measure(kind: str, args, path: str = "", url: str = "") -> dict:
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(
+            kind, path, url, args.checks, args.prefixes, seed, args.latency / 1000, results))
+        for seed in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    totals = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - started
+    fetches = sum(t["fetches"] for t in totals)
+    checks = args.checks * args.workers
+    return {"fetches": fetches, "hit_rate": 1 - fetches / checks, "wall": wall}
+
+
+def bench_encoding() -> None:
+    counts = dict(range_lines("ABCDE", {}))
+    binary = encode_range(counts)
+    text = json.dumps(counts).encode()
+    assert decode_range(binary) == counts
+
+    rounds = 2000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        encode_range(counts)
+    encode_us = (time.perf_counter() - started) / rounds * 1e6
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode_range(binary)
+    decode_us = (time.perf_counter() - started) / rounds * 1e6
+    print(f"range of {len(counts)} entries: {len(binary):,} bytes binary vs {len(text):,} bytes JSON "
+          f"({len(text) / len(binary):.1f}x); encode {encode_us:.0f} us, decode {decode_us:.0f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checks", type=int, default=3000, help="Breach checks per worker")
+    parser.add_argument("--prefixes", type=int, default=2000, help="Distinct ranges in the stream")
+    parser.add_argument("--latency", type=float, default=2.0, help="Simulated upstream latency (ms)")
+    parser.add_argument("--redis-port", type=int, default=6391)
+    args = parser.parse_args()
+
+    bench_encoding()
+    print(f"{args.workers} workers x {args.checks:,} checks over {args.prefixes:,} ranges, "
+          f"{args.latency:g} ms upstream latency")
+    print(f"{'backend':>8} {'upstream fetches':>17} {'hit rate':>9} {'wall':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ready = multiprocessing.Event()
+        redis = multiprocessing.Process(target=run_fake_redis, args=(args.redis_port, ready), daemon=True)
+        redis.start()
+        ready.wait(10)
+        try:
+            for kind, kwargs in (
+                ("memory", {}),
+                ("sqlite", {"path": os.path.join(tmp, "ranges.db")}),
+                ("redis", {"url": f"redis://127.0.0.1:{args.redis_port}/0"}),
+            ):
+                result = measure(kind, args, **kwargs)
+                print(f"{kind:>8} {result['fetches']:>17,} {result['hit_rate']:>9.1%} {result['wall']:>7.2f}s")
+        finally:
+            redis.terminate()
+
+
+if __name__ == "__main__":
+    main()
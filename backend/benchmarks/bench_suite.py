@@ -0,0 +1,264 @@
+"""
+Benchmark suite
+Microbenchmarks time each service method on fixed corpora; macrobenchmarks
+drive the API endpoints through an in-process ASGI client, with breach
+checks answered by the local fake HIBP app. Every case reports p50/p99
+latency and throughput as JSON, optionally compared against a saved
+baseline (exit status 1 when a case regressed beyond the threshold).
+
+Usage:
+    python -m benchmarks.bench_suite -o results.json
+    python -m benchmarks.bench_suite --save-baseline baseline.json
+    python -m benchmarks.bench_suite --baseline baseline.json [--threshold 0.15]
+    python -m benchmarks.bench_suite --only micro     (or macro)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.fake_hibp import DEFAULT_BREACHED, create_app, range_lines
+from app.services.breach_checker import BreachChecker, parse_range
+from app.services.guess_estimator import GuessEstimator
+from app.services.password_analyzer import PasswordAnalyzer
+from app.services.password_generator import PasswordGenerator
+
+# ==================== Corpora ====================
+
+
+def corpora(size: int, seed: int = 42) -> Dict[str, List[str]]:
+    """Fixed, seeded inputs so runs are comparable"""
+    rng = random.Random(seed)
+    printable = string.ascii_letters + string.digits + "!@#$%^&*()-_=+"
+    unicode_chars = "äöüßéèçñåøæ€£¥Ωπλжщюあいう中文字😀🔒"
+
+    def word(alphabet: str, low: int, high: int) -> str:
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+    common = sorted(PasswordAnalyzer.COMMON_PASSWORDS)
+    return {
+        "short": [word(printable, 4, 8) for _ in range(size)],
+        "long": [word(printable, 48, 64) for _ in range(size)],
+        "unicode": [word(printable + unicode_chars * 3, 10, 20) for _ in range(size)],
+        "common": [common[i % len(common)] for i in range(size)],
+        "breached": [list(DEFAULT_BREACHED)[i % len(DEFAULT_BREACHED)] for i in range(size)],
+    }
+
+
+# ==================== Measurement ====================
+
+
+def summarize(latencies_ns: List[int], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies_ns)
+    n = len(ordered)
+    return {
+        "n": n,
+        "p50_us": round(ordered[n // 2] / 1000, 2),
+        "p99_us": round(ordered[min(n - 1, int(n * 0.99))] / 1000, 2),
+        "mean_us": round(sum(ordered) / n / 1000, 2),
+        "throughput": round(n / elapsed, 1)
+    }
+
+
+def time_calls(fn: Callable, inputs: list, warmup: int = 50) -> Dict[str, float]:
+    """Time fn(x) for every input, one sample per call"""
+    for x in inputs[:warmup]:
+        fn(x)
+    clock = time.perf_counter_ns
+    latencies = []
+    started = time.perf_counter()
+    for x in inputs:
+        before = clock()
+        fn(x)
+        latencies.append(clock() - before)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def time_async_calls(fn: Callable, inputs: list, concurrency: int = 1,
+                           warmup: int = 20) -> Dict[str, float]:
+    """Time await fn(x) for every input, with up to `concurrency` in flight"""
+    for x in inputs[:warmup]:
+        await fn(x)
+    clock = time.perf_counter_ns
+    latencies = []
+    queue = iter(inputs)
+
+    async def worker():
+        for x in queue:
+            before = clock()
+            await fn(x)
+            latencies.append(clock() - before)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+# ==================== Microbenchmarks ====================
+
+
+def micro(size: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    inputs = corpora(size)
+
+    analyzer = PasswordAnalyzer()
+    for name, passwords in inputs.items():
+        results[f"micro.analyze.{name}"] = time_calls(analyzer.analyze, passwords)
+
+    # Guess estimator without its prefix cache: the cost of a cold password
+    estimating = PasswordAnalyzer(estimator=GuessEstimator(cache_size=0))
+    for name in ("short", "long", "common"):
+        results[f"micro.analyze_estimate.{name}"] = time_calls(estimating.analyze, inputs[name][:size // 4])
+
+    generator = PasswordGenerator()
+    results["micro.generate.16"] = time_calls(lambda _: generator.generate(16), range(size))
+    results["micro.generate.64"] = time_calls(lambda _: generator.generate(64), range(size))
+    results["micro.generate_many.1000"] = time_calls(lambda _: generator.generate_many(1000), range(100), warmup=5)
+    results["micro.passphrase.6"] = time_calls(lambda _: generator.generate_passphrase(6), range(size))
+
+    bodies = [
+        "\r\n".join(f"{s}:{c}" for s, c in range_lines(f"{i:05X}", {}, padding=True)).encode()
+        for i in range(50)
+    ]
+    results["micro.parse_range"] = time_calls(parse_range, bodies * 4, warmup=5)
+
+    async def warm_checks() -> Dict[str, float]:
+        checker = BreachChecker(transport=httpx.ASGITransport(app=create_app()))
+        passwords = inputs["breached"] + inputs["common"]
+        for password in set(passwords):
+            await checker.check(password)
+        try:
+            return await time_async_calls(checker.check, passwords)
+        finally:
+            await checker.close()
+
+    results["micro.breach_check.cached"] = asyncio.run(warm_checks())
+    return results
+
+
+# ==================== Macrobenchmarks ====================
+
+
+async def macro(size: int, concurrency: int) -> Dict[str, Dict[str, float]]:
+    # Imported here: app.main reads its configuration from the environment.
+    # Every request comes from one client, so per-client limits stay off
+    # (bench_admission measures their cost), and the HIBP request quota
+    # would only throttle the in-process fake
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    os.environ.setdefault("HIBP_RATE_LIMIT", "0")
+    from app import main
+
+    main.breach_checker.transport = httpx.ASGITransport(app=create_app())
+    await main.breach_checker.start()
+    main.analysis_pool.start()
+
+    inputs = corpora(size, seed=7)
+    unique = inputs["short"] + inputs["long"]
+    repeated = inputs["common"]
+    results = {}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def post(path: str, body: dict) -> None:
+            response = await client.post(path, json=body)
+            response.raise_for_status()
+
+        cases = [
+            ("macro.analyze.unique", "/api/analyze", unique),
+            ("macro.analyze.repeated", "/api/analyze", repeated),
+            ("macro.full_analysis.unique", "/api/full-analysis", unique),
+            ("macro.full_analysis.repeated", "/api/full-analysis", repeated),
+        ]
+        for name, path, passwords in cases:
+            results[name] = await time_async_calls(
+                lambda p, path=path: post(path, {"password": p}), passwords, concurrency)
+
+        results["macro.generate"] = await time_async_calls(
+            lambda _: post("/api/generate", {"length": 16}), range(size), concurrency)
+
+    main.analysis_pool.close()
+    await main.breach_checker.close()
+    return results
+
+
+# ==================== Baseline comparison ====================
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases"""
+    regressions = []
+    print(f"{'case':<34} {'p50 us':>10} {'base':>10} {'p99 us':>10} {'ops/s':>10} {'base':>10}  status")
+    for name, current in results["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<34} {current['p50_us']:>10} {'-':>10} {current['p99_us']:>10} "
+                  f"{current['throughput']:>10} {'-':>10}  new")
+            continue
+        slower = current["p50_us"] > old["p50_us"] * (1 + threshold)
+        fewer = current["throughput"] < old["throughput"] * (1 - threshold)
+        status = "REGRESSED" if slower or fewer else "ok"
+        if status != "ok":
+            regressions.append(name)
+        print(f"{name:<34} {current['p50_us']:>10} {old['p50_us']:>10} {current['p99_us']:>10} "
+              f"{current['throughput']:>10} {old['throughput']:>10}  {status}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", choices=("micro", "macro"), help="Run one layer only")
+    parser.add_argument("--size", type=int, default=2000, help="Inputs per corpus")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight (macro)")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Write results JSON as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed p50/throughput change before a case counts as regressed")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    if args.only != "macro":
+        results.update(micro(args.size))
+    if args.only != "micro":
+        results.update(asyncio.run(macro(args.size, args.concurrency)))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "size": args.size,
+            "concurrency": args.concurrency
+        },
+        "results": results
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    baseline: Optional[Dict] = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressed: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+    elif not args.output and not args.save_baseline:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Upstream fault benchmark
+Offers a steady stream of breach checks (cache misses) while the fake HIBP
+server goes through injected faults - a 100 requests/s limit answered with
+429 + Retry-After, stalls and 5xx, a full outage, then recovery - and
+compares latency, failed lookups and requests sent upstream for a checker
+with no protection against one with the rate limiter, retries and circuit
+breaker
+
+Usage:
+    python -m benchmarks.bench_upstream_faults [--rate 150] [--seconds 4] [--port 8011]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.services.breach_checker import BreachChecker
+
+PHASES = [
+    ("healthy", {}),
+    ("throttled", {"max_rps": 100, "retry_after": 1}),
+    ("degraded", {"stall_rate": 0.2, "stall_seconds": 5.0, "error_rate": 0.2}),
+    ("outage", {"error_rate": 1.0}),
+    ("recovered", {}),
+]
+
+CLEAR = {"stall_rate": 0.0, "max_rps": 0, "rate_limit_rate": 0.0, "error_rate": 0.0}
+
+CONFIGS = {
+    "unguarded": {"max_retries": 0, "breaker_failure_ratio": 0},
+    "guarded": {"rate_limit": 200, "rate_burst": 50, "max_retries": 2, "retry_budget": 3.0,
+                "breaker_failure_ratio": 0.5, "breaker_window": 100, "breaker_reset": 2.0},
+}
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_phase(checker: BreachChecker, control: httpx.AsyncClient, name: str, label: str,
+                    rate: float, seconds: float) -> dict:
+    """Open loop: start rate checks per second for seconds, however slow they are"""
+    before = (await control.get("/faults")).json()["counts"]
+    latencies, failures = [], 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        started = time.perf_counter()
+        result = await checker.check(f"{label}-{name}-{i}")
+        latencies.append(time.perf_counter() - started)
+        failures += bool(result.get("error"))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for i in range(int(rate * seconds)):
+        await asyncio.sleep(max(0.0, start + i / rate - loop.time()))
+        tasks.append(asyncio.create_task(one(i)))
+    await asyncio.gather(*tasks)
+    after = (await control.get("/faults")).json()["counts"]
+    latencies.sort()
+    return {
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "max": latencies[-1] * 1000,
+        "failed": failures / len(latencies),
+        "upstream": sum(after.values()) - sum(before.values()),
+        "breaker": checker.breaker.state
+    }
+
+
+async def run(args) -> None:
+    base = f"http://127.0.0.1:{args.port}"
+    async with httpx.AsyncClient(base_url=base) as control:
+        for label, options in CONFIGS.items():
+            checker = BreachChecker(api_url=f"{base}/range/", timeout=args.timeout, http2=False, **options)
+            await checker.start()
+            print(f"\n{label}: {options}")
+            print(f"{'phase':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'failed':>7} {'upstream':>9}  breaker")
+            for name, faults in PHASES:
+                await control.put("/faults", json={**CLEAR, **faults})
+                r = await run_phase(checker, control, name, label, args.rate, args.seconds)
+                print(f"{name:>10} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['max']:>8.1f} {r['failed']:>7.1%} "
+                      f"{r['upstream']:>9}  {r['breaker']}")
+            await checker.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=150, help="Breach checks started per second")
+    parser.add_argument("--seconds", type=float, default=4, help="Duration of each phase")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Client timeout (s)")
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.fake_hibp", "--port", str(args.port), "--seed", "1"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{args.port}/faults")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Shared fixtures: a BreachChecker wired to the in-process fake range API"""
+
+import httpx
+import pytest
+
+from app.fake_hibp import Faults, create_app
+from app.services.breach_checker import BreachChecker
+
+
+@pytest.fixture
+def faults() -> Faults:
+    return Faults(seed=1)
+
+
+@pytest.fixture
+def make_checker(faults):
+    """Build a BreachChecker against the fake API; options override the defaults"""
+
+    def make(**options) -> BreachChecker:
+        options.setdefault("http2", False)
+        options.setdefault("backoff_base", 0.001)
+        options.setdefault("backoff_cap", 0.01)
+        return BreachChecker(transport=httpx.ASGITransport(app=create_app(faults=faults)), **options)
+
+    return make
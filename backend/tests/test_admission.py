@@ -0,0 +1,105 @@
+"""AdmissionControl: route prefixes, cost classes, WebSocket handshakes and client identity"""
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.services.admission import AdmissionControl, ClientRateLimiter, ConcurrencyLimiter
+
+ROUTES = {
+    "/api/generate": "generate",
+    "/api/generate/batch": "batch",
+    "/api/audit": "stream",
+    "/ws/analyze": "stream",
+}
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+async def live(websocket):
+    await websocket.accept()
+    await websocket.send_text("hello")
+    await websocket.close()
+
+
+def make_app(burst: float = 1, **options):
+    inner = Starlette(routes=[
+        Route("/api/{path:path}", ok, methods=["GET", "POST"]),
+        WebSocketRoute("/ws/analyze", live),
+    ])
+    limiters = {name: ClientRateLimiter(rate=0.001, burst=burst, width=64, depth=2)
+                for name in set(ROUTES.values())}
+    return AdmissionControl(inner, limiters, routes=ROUTES, **options), limiters
+
+
+def statuses(app, paths, headers=None):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [(await client.post(path, headers=headers)).status_code for path in paths]
+    return asyncio.run(scenario())
+
+
+def test_sub_routes_share_their_prefix_limit():
+    app, limiters = make_app()
+    assert statuses(app, ["/api/generate", "/api/generate/", "/api/generate/x"]) == [200, 429, 429]
+    assert statuses(app, ["/api/audit/stream", "/api/audit/stream"]) == [200, 429]
+    assert limiters["generate"].rejected == 2
+
+
+def test_longest_prefix_picks_the_cost_class():
+    app, limiters = make_app()
+    assert statuses(app, ["/api/generate/batch", "/api/generate", "/api/generate/batch"]) == [200, 200, 429]
+    assert limiters["batch"].rejected == 1
+    assert limiters["generate"].rejected == 0
+
+
+def test_unlisted_paths_pass_through():
+    app, _ = make_app()
+    assert statuses(app, ["/api/analyze"] * 3) == [200] * 3
+
+
+def test_websocket_handshakes_are_limited():
+    app, limiters = make_app()
+    client = TestClient(app)
+    with client.websocket_connect("/ws/analyze") as ws:
+        assert ws.receive_text() == "hello"
+    with pytest.raises(WebSocketDisconnect) as refused:
+        with client.websocket_connect("/ws/analyze"):
+            pass
+    assert refused.value.code == 1008
+    assert limiters["stream"].rejected == 1
+
+
+def test_proxy_client_is_the_last_forwarded_entry():
+    app, _ = make_app(trust_proxy=True)
+    assert statuses(app, ["/api/generate"], {"X-Forwarded-For": "1.1.1.1, 203.0.113.7"}) == [200]
+    # A spoofed first entry doesn't buy a fresh bucket
+    assert statuses(app, ["/api/generate"], {"X-Forwarded-For": "9.9.9.9, 203.0.113.7"}) == [429]
+    assert statuses(app, ["/api/generate"], {"X-Forwarded-For": "203.0.113.8"}) == [200]
+
+
+def test_long_lived_classes_skip_the_concurrency_cap():
+    concurrency = ConcurrencyLimiter(max_concurrent=1, max_queue=0)
+    app, _ = make_app(burst=10, concurrency=concurrency, long_lived=("stream",))
+
+    async def scenario():
+        await concurrency.acquire()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                stream = await client.post("/api/audit/stream")
+                generate = await client.post("/api/generate")
+        finally:
+            concurrency.release()
+        return stream.status_code, generate.status_code
+
+    assert asyncio.run(scenario()) == (200, 503)
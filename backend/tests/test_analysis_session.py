@@ -0,0 +1,83 @@
+"""AnalysisSession edits and SessionStore expiry, eviction and limits"""
+
+import time
+
+import pytest
+
+from app.services.analysis_session import AnalysisSession, SessionNotFound, SessionStore
+from app.services.password_analyzer import PasswordAnalyzer
+
+analyzer = PasswordAnalyzer()
+
+
+def test_edits_match_a_full_analysis():
+    store = SessionStore(analyzer)
+    session_id, _ = store.update(password="Tr0ub4dor")
+    for delete, append, expected in [
+        (0, "&3", "Tr0ub4dor&3"),
+        (3, "", "Tr0ub4do"),
+        (2, "qwerty🔑", "Tr0ub4qwerty🔑"),
+        (1, "!", "Tr0ub4qwerty!"),
+    ]:
+        same_id, result = store.update(session_id=session_id, delete=delete, append=append)
+        assert same_id == session_id
+        assert result == analyzer.analyze(expected)
+
+
+def test_delete_past_the_start_changes_nothing():
+    session = AnalysisSession()
+    session.append(analyzer, "abc")
+    with pytest.raises(ValueError):
+        session.delete(4)
+    with pytest.raises(ValueError):
+        session.delete(-1)
+    assert session.password == "abc"
+    assert len(session.states) == 4
+
+    store = SessionStore(analyzer)
+    session_id, _ = store.update(password="abc")
+    with pytest.raises(ValueError):
+        store.update(session_id=session_id, delete=4, append="xyz")
+    _, result = store.update(session_id=session_id)
+    assert result["details"]["length"] == 3
+
+
+def test_overlong_edits_are_rejected():
+    store = SessionStore(analyzer, max_length=8)
+    session_id, _ = store.update(password="12345678")
+    with pytest.raises(ValueError):
+        store.update(session_id=session_id, append="9")
+    _, result = store.update(session_id=session_id, delete=1, append="9")
+    assert result["details"]["length"] == 8
+
+
+def test_sessions_expire():
+    store = SessionStore(analyzer, ttl=0.05)
+    session_id, _ = store.update(password="secret")
+    time.sleep(0.06)
+    with pytest.raises(SessionNotFound):
+        store.update(session_id=session_id, append="x")
+    assert store.stats()["expirations"] == 1
+
+    # A full password starts over under a new id
+    revived, result = store.update(session_id=session_id, password="secretx")
+    assert revived != session_id
+    assert result == analyzer.analyze("secretx")
+
+
+def test_byte_budget_evicts_least_recently_used():
+    one = AnalysisSession()
+    one.append(analyzer, "x" * 10)
+    store = SessionStore(analyzer, max_bytes=3 * one.size())
+    first, _ = store.update(password="x" * 10)
+    second, _ = store.update(password="y" * 10)
+    third, _ = store.update(password="z" * 10)
+    store.update(session_id=first, append="")
+    store.update(password="w" * 10)
+
+    assert store.stats()["evictions"] == 1
+    assert store.current_bytes <= store.max_bytes
+    with pytest.raises(SessionNotFound):
+        store.update(session_id=second, append="")
+    store.update(session_id=first, append="")
+    store.update(session_id=third, append="")
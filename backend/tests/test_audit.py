@@ -0,0 +1,101 @@
+"""Bulk audit: line splitting, input formats and per-line errors"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.audit import MAX_LINE_BYTES, audit, iter_lines, parse_line
+from app.services.batch_analyzer import BatchAnalyzer
+from app.services.password_analyzer import PasswordAnalyzer
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def split(*chunks: bytes, max_line_bytes: int = MAX_LINE_BYTES):
+    async def collect():
+        return [line async for line in iter_lines(stream(*chunks), max_line_bytes)]
+    return asyncio.run(collect())
+
+
+def run_audit(make_checker, body: bytes, **options):
+    async def collect():
+        checker = make_checker()
+        try:
+            batch = BatchAnalyzer(PasswordAnalyzer(), checker)
+            return [item async for chunk in audit(stream(body), batch, **options) for item in chunk]
+        finally:
+            await checker.close()
+    return asyncio.run(collect())
+
+
+def test_lines_are_split_across_chunks():
+    assert split(b"hun", b"ter2\nsec", b"ret\n\nlast") == [b"hunter2", b"secret", b"", b"last"]
+    assert split(b"one\r\ntwo\n") == [b"one\r", b"two"]
+
+
+def test_long_lines_are_dropped_not_buffered():
+    assert split(b"ok\n" + b"x" * 20 + b"\nfine", max_line_bytes=8) == [b"ok", None, b"fine"]
+    # Overflowing a chunk boundary: the rest of the line is discarded
+    assert split(b"x" * 6, b"x" * 6, b"xx\nnext\n", max_line_bytes=8) == [None, b"next"]
+    assert split(b"short\n", b"x" * 9, max_line_bytes=8) == [b"short", None]
+
+
+def test_raw_lines_are_taken_verbatim():
+    for password in ['{weird', '"quoted', '"quoted"', '{"password": "x"}']:
+        assert parse_line(password.encode()) == (password, None)
+
+
+def test_ndjson_lines():
+    assert parse_line(b'"hunter2"', "ndjson") == ("hunter2", None)
+    assert parse_line(b'{"password": "hunter2", "id": 7}\r', "ndjson") == ("hunter2", 7)
+    for line in [b"hunter2", b'{"id": 7}', b"[1]", b"[" * 100000]:
+        with pytest.raises(ValueError):
+            parse_line(line, "ndjson")
+
+
+def test_mixed_lines_get_per_line_results(make_checker):
+    body = b"\n".join([
+        b'"password"',
+        b'{"password": "Tr0ub4dor&3xyz", "id": "u1"}',
+        b"not json",
+        b"[" * 20000,
+        b"\xff\xfe",
+        b"",
+        b'"x' + b"y" * MAX_LINE_BYTES + b'"',
+        b'{"password": "abc"}',
+    ])
+    results = run_audit(make_checker, body, chunk_size=3, input_format="ndjson")
+    assert [r["line"] for r in results] == [1, 2, 3, 4, 5, 7, 8]
+    assert results[0]["strength"] == "Very Weak"
+    assert results[1]["id"] == "u1" and "score" in results[1]
+    assert all("error" in r for r in results[2:6])
+    assert "score" in results[6]
+
+
+def test_unknown_format_is_rejected(make_checker):
+    with pytest.raises(ValueError):
+        run_audit(make_checker, b"x\n", input_format="csv")
+
+
+def test_endpoint_format_and_chunk_size():
+    with TestClient(main.app) as client:
+        body = b'{weird\n"quoted"\n'
+        lines = client.post("/api/audit/stream", content=body).text.splitlines()
+        assert ["error" in json.loads(line) for line in lines] == [False, False]
+
+        lines = client.post("/api/audit/stream?format=ndjson", content=body).text.splitlines()
+        assert ["error" in json.loads(line) for line in lines] == [True, False]
+
+        lines = client.post("/api/audit/stream", content=body,
+                            headers={"Content-Type": "application/x-ndjson"}).text.splitlines()
+        assert ["error" in json.loads(line) for line in lines] == [True, False]
+
+        assert client.post("/api/audit/stream?chunk_size=100000000", content=body).status_code == 422
+        assert client.post("/api/audit/stream?chunk_size=0", content=body).status_code == 422
+        assert client.post("/api/audit/stream?format=csv", content=body).status_code == 422
@@ -0,0 +1,196 @@
+"""BreachChecker against the fake range API: caching, coalescing and upstream failures"""
+
+import asyncio
+import time
+
+from app.fake_hibp import range_lines
+from app.services.breach_checker import parse_range
+from app.services.range_cache import RangeCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def upstream_requests(faults) -> int:
+    return sum(faults.counts.values())
+
+
+async def check_all(checker, passwords):
+    try:
+        return [await checker.check(p) for p in passwords]
+    finally:
+        await checker.close()
+
+
+def reference_parse(body: bytes):
+    counts = {}
+    for line in body.decode("ascii").splitlines():
+        suffix, _, count = line.strip().partition(":")
+        if suffix and int(count):
+            counts[suffix.upper()] = int(count)
+    return counts
+
+
+def test_parse_range_drops_padding_rows():
+    rows = range_lines("21BD1", {"2D87E2C4B6A5F6E1F0B8E7D6C5B4A392810": 7}, entries=50, padding=True)
+    assert sum(count == 0 for _, count in rows) == 200
+    body = "\r\n".join(f"{suffix}:{count}" for suffix, count in rows).encode()
+    parsed = parse_range(body)
+    assert parsed == reference_parse(body)
+    assert len(parsed) == 50
+    assert 0 not in parsed.values()
+
+
+def test_parse_range_edge_cases():
+    assert parse_range(b"") == {}
+    assert parse_range(b"abc:0\r\n") == {}
+    # Lowercase suffixes, no trailing newline, LF-only lines
+    assert parse_range(b"0018a45c4d1def81644b54ab7f969b88d65:3\n00D4F6:12") == {
+        "0018A45C4D1DEF81644B54AB7F969B88D65": 3, "00D4F6": 12}
+
+
+def test_breached_and_clean_passwords(make_checker):
+    breached, clean = run(check_all(make_checker(), ["password", "correct horse battery staple 42"]))
+    assert breached["breached"] is True
+    assert breached["breach_count"] == 9659365
+    assert clean["breached"] is False
+    assert clean["breach_count"] == 0
+    assert "error" not in breached and "error" not in clean
+
+
+def test_repeated_prefix_is_served_from_cache(make_checker, faults):
+    checker = make_checker()
+    results = run(check_all(checker, ["password"] * 3))
+    assert [r["breach_count"] for r in results] == [9659365] * 3
+    assert upstream_requests(faults) == 1
+    stats = checker.cache_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_expired_range_is_fetched_again(make_checker, faults):
+    checker = make_checker(cache=RangeCache(ttl=0.05))
+
+    async def scenario():
+        await checker.check("password")
+        await checker.check("password")
+        await asyncio.sleep(0.1)
+        await checker.check("password")
+        await checker.close()
+
+    run(scenario())
+    assert upstream_requests(faults) == 2
+    assert checker.cache_stats()["expirations"] == 1
+
+
+def test_concurrent_misses_share_one_request(make_checker, faults):
+    checker = make_checker()
+
+    async def scenario():
+        faults.latency = 0.05
+        try:
+            return await asyncio.gather(*(checker.check("password") for _ in range(10)))
+        finally:
+            await checker.close()
+
+    results = run(scenario())
+    assert all(r["breach_count"] == 9659365 for r in results)
+    assert upstream_requests(faults) == 1
+    assert checker.coalescing_stats()["calls"] == 1
+
+
+def test_upstream_errors_are_retried_then_reported(make_checker, faults):
+    faults.error_rate = 1.0
+    checker = make_checker(max_retries=2)
+    result, = run(check_all(checker, ["password"]))
+    assert result["error"] is True
+    assert result["breached"] is False
+    assert "HTTP 503" in result["message"]
+    assert faults.counts["errors"] == 3
+    assert checker.retries == 2
+    # One coalesced flight, three HTTP attempts
+    assert checker.coalescing_stats()["calls"] == 1
+    assert checker.upstream_stats()["requests"] == 3
+
+
+def test_failed_lookups_are_not_cached(make_checker, faults):
+    faults.error_rate = 1.0
+    checker = make_checker(max_retries=0)
+
+    async def scenario():
+        first = await checker.check("password")
+        faults.error_rate = 0.0
+        second = await checker.check("password")
+        await checker.close()
+        return first, second
+
+    first, second = run(scenario())
+    assert first["error"] is True
+    assert second["breach_count"] == 9659365
+
+
+def test_transient_error_recovers_on_retry(make_checker, faults):
+    # Seeded draws: the first request fails, the retry succeeds
+    faults.error_rate = 0.5
+    checker = make_checker(max_retries=5)
+    result, = run(check_all(checker, ["password"]))
+    assert result["breach_count"] == 9659365
+    assert faults.counts["ok"] == 1
+    assert faults.counts["errors"] >= 1
+    assert checker.retries == faults.counts["errors"]
+
+
+def test_client_errors_are_not_retried(make_checker, faults):
+    faults.error_rate = 1.0
+    faults.error_status = 404
+    checker = make_checker(max_retries=2)
+    result, = run(check_all(checker, ["password"]))
+    assert result["error"] is True
+    assert faults.counts["errors"] == 1
+    assert checker.retries == 0
+
+
+def test_rate_limited_response_honors_retry_after(make_checker, faults):
+    faults.max_rps = 1
+    faults.retry_after = 1
+    checker = make_checker(max_retries=1, retry_budget=3.0)
+
+    async def scenario():
+        await checker.check("password")
+        started = time.monotonic()
+        # A different prefix: the second request this second is answered 429
+        result = await checker.check("letmein")
+        await checker.close()
+        return result, time.monotonic() - started
+
+    result, elapsed = run(scenario())
+    assert result["breach_count"] == 1094289
+    assert checker.rate_limited >= 1
+    assert elapsed >= 0.5
+
+
+def test_open_circuit_fails_fast(make_checker, faults):
+    faults.error_rate = 1.0
+    checker = make_checker(max_retries=0, breaker_window=4, breaker_failure_ratio=0.5, breaker_reset=60)
+
+    async def scenario():
+        results = [await checker.check(f"outage-{i}") for i in range(10)]
+        await checker.close()
+        return results
+
+    results = run(scenario())
+    assert all(r["error"] for r in results)
+    assert faults.counts["errors"] == 4
+    assert checker.breaker.state == checker.breaker.OPEN
+    assert "temporarily unavailable" in results[-1]["message"]
+
+
+def test_pool_stats_tolerate_unexpected_internals(make_checker):
+    class Transport:
+        class _pool:
+            connections = [object()]
+
+    checker = make_checker()
+    checker._client = type("Client", (), {"_transport": Transport()})()
+    assert checker.pool_stats() is None
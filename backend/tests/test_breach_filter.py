@@ -0,0 +1,75 @@
+"""XorFilter: no false negatives, sharded builds, the on-disk formats and the size limit"""
+
+import random
+import struct
+
+import pytest
+
+from app.services import breach_filter
+from app.services.breach_filter import HEADER_SIZE, MAGIC, XorFilter
+
+
+def random_keys(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(n)]
+
+
+@pytest.mark.parametrize("shard_bits", [0, 3])
+def test_every_key_is_found(shard_bits):
+    keys = random_keys(20_000)
+    xor_filter = XorFilter.build(keys + keys[:100], seed=1, shard_bits=shard_bits)
+    assert xor_filter.key_count == 20_000
+    assert all(xor_filter.contains_key(key) for key in keys)
+    assert xor_filter.measure_false_positive_rate(50_000) < 0.01
+    assert xor_filter.stats()["shards"] == 1 << shard_bits
+
+
+def test_written_filter_matches_in_memory_build(tmp_path):
+    keys = random_keys(20_000)
+    path = str(tmp_path / "keys.xor")
+    key_count, fpr = XorFilter.write(iter(keys), path, shard_bits=4, seed=1,
+                                     fpr_samples=50_000, tmp_dir=str(tmp_path))
+    assert key_count == 20_000
+    assert fpr < 0.01
+
+    loaded = XorFilter.load(path)
+    built = XorFilter.build(keys, seed=1, shard_bits=4)
+    try:
+        assert loaded.false_positive_rate == fpr
+        assert loaded.size_bytes == built.size_bytes
+        assert all(loaded.contains_key(key) for key in keys)
+        probes = random_keys(5_000, seed=8)
+        assert [loaded.contains_key(k) for k in probes] == [built.contains_key(k) for k in probes]
+    finally:
+        loaded.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["keys.xor"]
+
+
+def test_saved_filter_round_trips(tmp_path):
+    keys = random_keys(5_000)
+    path = str(tmp_path / "keys.xor")
+    XorFilter.build(keys, seed=1, shard_bits=2).save(path)
+    loaded = XorFilter.load(path)
+    try:
+        assert loaded.key_count == 5_000
+        assert all(loaded.contains_key(key) for key in keys)
+    finally:
+        loaded.close()
+
+
+@pytest.mark.parametrize("magic, version", [(b"NOTAXOR\0", 2), (MAGIC, 1), (MAGIC, 3)])
+def test_other_files_are_rejected(tmp_path, magic, version):
+    path = tmp_path / "not.xor"
+    path.write_bytes(struct.pack("<8sI", magic, version).ljust(HEADER_SIZE, b"\0"))
+    with pytest.raises(ValueError):
+        XorFilter.load(str(path))
+
+
+def test_oversized_shard_is_rejected(monkeypatch, tmp_path):
+    monkeypatch.setattr(breach_filter, "MAX_SHARD_KEYS", 1_000)
+    keys = random_keys(3_000)
+    with pytest.raises(ValueError, match="more shard bits"):
+        XorFilter.build(keys)
+    with pytest.raises(ValueError, match="more shard bits"):
+        XorFilter.write(iter(keys), str(tmp_path / "keys.xor"), shard_bits=1, tmp_dir=str(tmp_path))
+    assert XorFilter.build(keys, shard_bits=3).key_count == 3_000
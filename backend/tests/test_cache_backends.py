@@ -0,0 +1,121 @@
+"""Range cache backends: the abstract interface and Redis connection ownership"""
+
+import asyncio
+
+import pytest
+
+from app.services.cache_backends import (CacheBackend, RedisBackend, SQLiteBackend, TieredBackend,
+                                         decode_range, encode_range)
+from app.services.range_cache import RangeCache
+
+RANGE = {"0018A45C4D1DEF81644B54AB7F969B88D65": 10, "00D4F6E8FA6EECAD2A3AA415EEC418D38EC": 2}
+
+
+async def fake_redis(reply: bytes = b"$-1\r\n", hang_up: bool = False):
+    """A RESP server that answers every command with reply (default nil)"""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                count = await reader.readline()
+                if not count:
+                    break
+                for _ in range(int(count[1:])):
+                    length = await reader.readline()
+                    await reader.readexactly(int(length[1:]) + 2)
+                writer.write(reply)
+                await writer.drain()
+                if hang_up:
+                    break
+        except (ConnectionError, EOFError):
+            pass
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_backends_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+    class Partial(CacheBackend):
+        async def get(self, prefix):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_range_encoding_round_trips():
+    assert decode_range(encode_range(RANGE)) == RANGE
+    assert decode_range(encode_range({})) == {}
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:-8],
+    lambda data: data + b"\0",
+    lambda data: data[:3],
+    lambda data: b"",
+    lambda data: b"\xff\xff\xff\xff" + data[4:],
+])
+def test_corrupt_ranges_are_rejected(corrupt):
+    with pytest.raises(ValueError):
+        decode_range(corrupt(encode_range(RANGE)))
+
+
+def test_corrupt_sqlite_values_are_misses(tmp_path):
+    async def scenario():
+        shared = SQLiteBackend(str(tmp_path / "ranges.db"))
+        tiered = TieredBackend(RangeCache(), shared)
+        await shared.put("ABCDE", RANGE)
+        shared._connect().execute("UPDATE ranges SET data = substr(data, 1, 30)")
+        try:
+            assert await tiered.get("ABCDE") is None
+            assert tiered.local.get("ABCDE") is None
+            assert shared.errors == 1
+        finally:
+            await tiered.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("reply, hang_up", [
+    # Cut off mid bulk string
+    (b"$100\r\n" + b"x" * 10, True),
+    # A complete value that isn't an encoded range
+    (b"$3\r\nabc\r\n", False),
+])
+def test_bad_redis_replies_are_misses(reply, hang_up):
+    async def scenario():
+        server, port = await fake_redis(reply, hang_up)
+        backend = RedisBackend(port=port, timeout=0.5)
+        try:
+            assert await backend.get("ABCDE") is None
+            assert backend.stats()["errors"] == 1
+            await backend.put("ABCDE", RANGE)
+        finally:
+            await backend.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_waiting_for_the_connection_does_not_drop_it():
+    async def scenario():
+        server, port = await fake_redis()
+        backend = RedisBackend(port=port, timeout=0.05)
+        try:
+            await backend.execute(b"GET", b"warm")
+            writer = backend._writer
+            async with backend._lock:
+                with pytest.raises(asyncio.TimeoutError):
+                    await backend.execute(b"GET", b"queued")
+            assert backend._writer is writer
+            assert await backend.execute(b"GET", b"after") is None
+            assert backend._writer is writer
+        finally:
+            await backend.close()
+            server.close()
+
+    asyncio.run(scenario())
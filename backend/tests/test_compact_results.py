@@ -0,0 +1,78 @@
+"""Compact results and orjson rendering: same content as the verbose JSON"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+from app import main
+from app.services.password_analyzer import (
+    DETAIL_FLAGS, DETAILS_BY_FLAGS, MESSAGES, NO_ISSUES, VERBOSE_FIELDS, PasswordAnalyzer, compact_result
+)
+
+PASSWORDS = [
+    "password", "a", "Tr0ub4dor&3", "qwerty123aaa", "abcABC123!!!",
+    "correct horse battery staple", "日本語パスワード",
+    "Tr0ub4qwerty\U0001f511", "line\nbreak\ttab\"quote\\",
+]
+
+
+@pytest.fixture(scope="module")
+def results():
+    analyzer = PasswordAnalyzer()
+    return [analyzer.analyze(password) for password in PASSWORDS]
+
+
+def expand(compact: dict) -> dict:
+    """Rebuild the verbose fields from a compact result, as a client would"""
+    feedback = [MESSAGES[code][0] for code in compact["issues"]] or [NO_ISSUES]
+    return {
+        "feedback": feedback,
+        "suggestions": [MESSAGES[code][1] for code in compact["issues"]],
+        "details": {"length": compact["length"], **DETAILS_BY_FLAGS[compact["flags"]]},
+    }
+
+
+def test_compact_results_carry_the_same_information(results):
+    for result in results:
+        compact = compact_result(result)
+        assert not VERBOSE_FIELDS & compact.keys()
+        assert {k: v for k, v in result.items() if k not in VERBOSE_FIELDS} == \
+            {k: v for k, v in compact.items() if k not in ("length", "flags", "issues")}
+
+        expanded = expand(compact)
+        assert expanded["feedback"] == result["feedback"]
+        assert expanded["suggestions"] == result["suggestions"]
+        assert expanded["details"] == result["details"]
+
+
+def test_extra_fields_are_kept_except_breach_message(results):
+    full = {**results[0], "breached": True, "breach_count": 3, "breach_message": "Found", "breach_status": "complete"}
+    compact = compact_result(full)
+    assert (compact["breached"], compact["breach_count"], compact["breach_status"]) == (True, 3, "complete")
+    assert "breach_message" not in compact
+
+    estimate = {"guesses_log10": 7.25, "crack_time_seconds": 1.0}
+    compact = compact_result({**results[0], "details": {**results[0]["details"], "guess_estimate": estimate}})
+    assert compact["guesses_log10"] == 7.25
+
+
+def test_orjson_rendering_matches_json_response(results):
+    for result in results + [compact_result(r) for r in results]:
+        fast = main.FastJSONResponse(result).body
+        assert json.loads(fast) == json.loads(JSONResponse(result).body) == result
+
+
+def test_endpoint_compact_parity():
+    password = "Tr0ub4dor&3xyz"
+    with TestClient(main.app) as client:
+        verbose = client.post("/api/analyze", json={"password": password}).json()
+        compact = client.post("/api/analyze?compact=true", json={"password": password}).json()
+        tables = client.get("/api/messages").json()
+
+    assert compact == compact_result(verbose)
+    main.CompactAnalysisResponse.model_validate(compact)
+    main.AnalysisResponse.model_validate(verbose)
+    assert tables["flags"] == list(DETAIL_FLAGS)
+    assert set(tables["issues"]) == set(MESSAGES)
@@ -0,0 +1,44 @@
+"""/api/full-analysis: the breach lookup's latency budget and the pending path"""
+
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.fake_hibp import Faults, create_app
+
+
+@pytest.fixture
+def slow_upstream(monkeypatch):
+    faults = Faults(latency=0.3)
+    monkeypatch.setattr(main.breach_checker, "transport", httpx.ASGITransport(app=create_app(faults=faults)))
+    monkeypatch.setattr(main, "full_analysis_budget", 0.05)
+    with TestClient(main.app) as client:
+        yield client, faults
+
+
+def test_slow_lookup_returns_pending_then_completes_from_cache(slow_upstream):
+    client, faults = slow_upstream
+    body = {"password": "pending path password 1"}
+
+    started = time.monotonic()
+    first = client.post("/api/full-analysis", json=body).json()
+    assert time.monotonic() - started < 0.25
+    assert first["breach_status"] == "pending"
+    assert first["breached"] is False
+    assert first["score"] == main.password_analyzer.analyze(body["password"])["score"]
+
+    # The lookup kept running in the background and warmed the range cache
+    time.sleep(0.4)
+    second = client.post("/api/full-analysis", json=body).json()
+    assert second["breach_status"] == "complete"
+    assert sum(faults.counts.values()) == 1
+
+
+def test_pending_results_are_not_cached(slow_upstream):
+    client, _ = slow_upstream
+    body = {"password": "pending path password 2"}
+    assert client.post("/api/full-analysis", json=body).json()["breach_status"] == "pending"
+    assert main.full_analysis_cache.get(body["password"]) is None
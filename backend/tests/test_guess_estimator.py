@@ -0,0 +1,71 @@
+"""GuessEstimator: worst-case inputs stay cheap and the prefix cache is thread-safe"""
+
+import asyncio
+import threading
+import time
+
+from app.services.analysis_pool import _project
+from app.services.guess_estimator import GuessEstimator
+from app.services.password_analyzer import PasswordAnalyzer
+
+
+def test_repeated_inputs_are_bounded():
+    for password in ["a" * 64, "1" * 1024, "ab" * 32, "abc" * 22]:
+        started = time.perf_counter()
+        result = GuessEstimator().estimate(password)
+        assert time.perf_counter() - started < 0.5, password[:8]
+        assert result["sequence"][0]["pattern"] == "repeat"
+
+
+def test_estimates_do_not_depend_on_the_cache():
+    warm = GuessEstimator()
+    for p in range(1, 21):
+        warm.estimate("correcthorse1990"[:p])
+    assert warm.estimate("correcthorse1990") == GuessEstimator().estimate("correcthorse1990")
+    assert warm.stats()["reused_positions"] > 0
+
+
+def test_shared_cache_survives_threads():
+    estimator = GuessEstimator(cache_size=8)
+    errors = []
+
+    def hammer(offset):
+        try:
+            for i in range(300):
+                estimator.estimate(f"pass{(i + offset) % 40}word")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=hammer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(estimator._cache) <= 8
+
+
+def test_projections_without_details_skip_the_estimate():
+    estimator = GuessEstimator()
+    analyzer = PasswordAnalyzer(estimator=estimator)
+    assert _project(analyzer, ["hunter2", "Tr0ub4dor&3"], ("score", "strength"))
+    assert estimator.stats()["misses"] == 0
+    full = _project(analyzer, ["hunter2"], None)
+    assert "guess_estimate" in full[0]["details"]
+
+
+def test_long_passwords_are_estimated_off_the_event_loop(monkeypatch):
+    from app import main
+
+    offloaded = []
+
+    async def to_thread(func, *args):
+        offloaded.append(args)
+        return func(*args)
+
+    monkeypatch.setattr(main.asyncio, "to_thread", to_thread)
+    short, long = "hunter2", "19901990" * 8
+    for password in (short, long):
+        result = asyncio.run(main.analyze_cached(password))
+        assert result == main.password_analyzer.analyze(password)
+    assert offloaded == [(long,)]
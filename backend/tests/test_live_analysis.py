@@ -0,0 +1,55 @@
+"""/ws/analyze: message validation and the per-connection message budget"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_edits_are_applied(client):
+    with client.websocket_connect("/ws/analyze") as ws:
+        ws.send_json({"id": 1, "password": "hunter", "check_breaches": False})
+        assert ws.receive_json()["details"]["length"] == 6
+        ws.send_json({"id": 2, "delete": 1, "append": "r2", "check_breaches": False})
+        reply = ws.receive_json()
+        assert reply["id"] == 2
+        assert reply["details"]["length"] == 7
+
+
+@pytest.mark.parametrize("message", [
+    {"delete": True},
+    {"delete": 1.0},
+    {"append": 5},
+    {"password": "x", "check_breaches": "no"},
+])
+def test_invalid_messages_are_rejected(client, message):
+    with client.websocket_connect("/ws/analyze") as ws:
+        ws.send_json({"password": "abc", "check_breaches": False})
+        ws.receive_json()
+        ws.send_json(message)
+        assert ws.receive_json()["type"] == "error"
+        # The session is untouched
+        ws.send_json({"append": "", "check_breaches": False})
+        assert ws.receive_json()["details"]["length"] == 3
+
+
+def test_fast_clients_are_slowed_down(client, monkeypatch):
+    monkeypatch.setattr(main, "ws_message_rate", 10.0)
+    monkeypatch.setattr(main, "ws_message_burst", 2)
+    with client.websocket_connect("/ws/analyze") as ws:
+        started = time.monotonic()
+        for i in range(5):
+            ws.send_json({"id": i, "append": "a", "check_breaches": False})
+        replies = [ws.receive_json() for _ in range(5)]
+        elapsed = time.monotonic() - started
+    assert [r["id"] for r in replies] == list(range(5))
+    assert replies[-1]["details"]["length"] == 5
+    assert elapsed >= 0.25
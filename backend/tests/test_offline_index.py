@@ -0,0 +1,92 @@
+"""OfflineIndex: build -> lookup round trips over the binary format"""
+
+import hashlib
+import random
+
+import pytest
+
+from app.build_index import iter_dump
+from app.services.offline_index import BLOCK_SIZE, OfflineIndex, build_index, encode_varint
+
+FIRST = bytes(20)
+LAST = b"\xff" * 20
+
+
+def test_varints():
+    assert encode_varint(0) == b"\x00"
+    assert encode_varint(127) == b"\x7f"
+    assert encode_varint(128) == b"\x80\x01"
+    assert encode_varint(300) == b"\xac\x02"
+
+
+@pytest.fixture
+def records():
+    rng = random.Random(4)
+    # Enough records in one 20-bit bucket to cross several count blocks
+    bucket = sorted({b"\x12\x34\x50" + rng.randbytes(17) for _ in range(3 * BLOCK_SIZE)})
+    spread = sorted({rng.randbytes(20) for _ in range(500)})
+    digests = sorted(set(bucket + spread + [FIRST, LAST]))
+    counts = [rng.choice([1, 2, 127, 128, 300, 16_384, 2 ** 40]) for _ in digests]
+    return list(zip(digests, counts)), bucket
+
+
+def test_round_trip(tmp_path, records):
+    records, bucket = records
+    path = str(tmp_path / "pwned.idx")
+    assert build_index(records, path) == len(records)
+
+    index = OfflineIndex(path)
+    try:
+        assert len(index) == len(records)
+        for digest, count in records:
+            assert index.lookup(digest) == count
+        # Block boundaries inside one bucket, and multi-byte counts after them
+        start = [digest for digest, _ in records].index(bucket[0])
+        for i in (BLOCK_SIZE - start % BLOCK_SIZE - 1, BLOCK_SIZE - start % BLOCK_SIZE):
+            digest, count = records[start + i]
+            assert index.lookup(digest) == count
+        assert index.lookup(FIRST) == records[0][1]
+        assert index.lookup(LAST) == records[-1][1]
+
+        # Missing: inside a populated bucket, and in an empty one
+        missing = bucket[0][:19] + bytes([bucket[0][19] ^ 1])
+        assert missing not in dict(records)
+        assert index.lookup(missing) == 0
+        assert index.lookup(b"\xab\xcd\xe0" + bytes(17)) == 0
+    finally:
+        index.close()
+
+
+def test_duplicates_merge_and_order_is_checked(tmp_path):
+    digest = hashlib.sha1(b"password").digest()
+    path = str(tmp_path / "dupes.idx")
+    assert build_index([(FIRST, 3), (digest, 128), (digest, 2)], path) == 2
+    index = OfflineIndex(path)
+    try:
+        assert index.lookup(digest) == 130
+    finally:
+        index.close()
+
+    with pytest.raises(ValueError, match="not sorted"):
+        build_index([(LAST, 1), (FIRST, 1)], str(tmp_path / "unsorted.idx"))
+
+
+def test_dump_files_round_trip(tmp_path):
+    digest = hashlib.sha1(b"password").digest()
+    dump = tmp_path / "dump.txt"
+    dump.write_text(f"{FIRST.hex().upper()}:1\n\n{digest.hex().upper()}:9659365\n{LAST.hex()}\n")
+    path = str(tmp_path / "dump.idx")
+    assert build_index(iter_dump(str(dump)), path) == 3
+    index = OfflineIndex(path)
+    try:
+        assert index.lookup(digest) == 9659365
+        assert index.lookup(LAST) == 1
+    finally:
+        index.close()
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "not.idx"
+    path.write_bytes(bytes(128))
+    with pytest.raises(ValueError):
+        OfflineIndex(str(path))
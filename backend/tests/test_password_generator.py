@@ -0,0 +1,88 @@
+"""PasswordGenerator: cached specs, required character sets and entropy"""
+
+import math
+import string
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.password_generator import MAX_LENGTH, MIN_LENGTH, PasswordGenerator
+
+
+@pytest.fixture
+def generator():
+    return PasswordGenerator()
+
+
+def test_specs_are_cached_per_option_combination(generator):
+    spec = generator.spec()
+    assert generator.spec() is spec
+    assert generator.spec(symbols=False) is not spec
+    assert generator.spec(symbols=False) is generator.spec(symbols=False)
+
+
+def test_spec_charsets(generator):
+    spec = generator.spec()
+    assert not set(spec.charset) & set(PasswordGenerator.AMBIGUOUS)
+    assert len(spec.sets) == 4
+
+    spec = generator.spec(uppercase=False, symbols=False, exclude_ambiguous=False)
+    assert spec.charset == string.ascii_lowercase + string.digits
+
+    # Nothing selected falls back to lowercase letters
+    spec = generator.spec(False, False, False, False, False)
+    assert spec.charset == string.ascii_lowercase
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"exclude_ambiguous": False},
+    {"uppercase": False, "numbers": False},
+    {"lowercase": False, "symbols": False},
+    {"uppercase": False, "lowercase": False, "numbers": False},
+])
+def test_every_password_has_one_character_from_each_set(generator, options):
+    spec = generator.spec(**options)
+    passwords = spec.generate(500, 12)
+    assert len(passwords) == 500
+    for password in passwords:
+        assert len(password) == 12
+        assert set(password) <= set(spec.charset)
+        assert all(set(password) & set(chars) for chars in spec.sets)
+
+
+def test_lengths_are_clamped(generator):
+    spec = generator.spec()
+    assert len(spec.generate(1, 1)[0]) == MIN_LENGTH
+    assert len(spec.generate(1, 10_000)[0]) == MAX_LENGTH
+    assert spec.generate(0, 16) == []
+    assert len(generator.generate(length=20)) == 20
+    assert len(generator.generate_many(3, length=8)) == 3
+
+
+def test_characters_are_roughly_uniform(generator):
+    # Digits only: 250 of the 256 byte values map onto the ten digits and
+    # the remaining 6 must be rejected, or 0-5 would come up more often
+    spec = generator.spec(False, False, True, False, False)
+    chars = ''.join(spec.generate(2000, 20))
+    expected = len(chars) / len(spec.charset)
+    for digit in spec.charset:
+        assert abs(chars.count(digit) - expected) < 0.1 * expected
+
+
+def test_entropy_bits(generator):
+    spec = generator.spec()
+    assert spec.entropy_bits(16) == pytest.approx(16 * math.log2(len(spec.charset)))
+    assert spec.entropy_bits(1) == spec.entropy_bits(MIN_LENGTH)
+    assert spec.entropy_bits(10_000) == spec.entropy_bits(MAX_LENGTH)
+
+
+def test_generate_endpoint():
+    with TestClient(main.app) as client:
+        body = client.post("/api/generate", json={"length": 20, "include_symbols": False}).json()
+    assert len(body["password"]) == 20
+    assert not set(body["password"]) & set(PasswordGenerator.SYMBOLS)
+    spec = main.password_generator.spec(symbols=False)
+    assert body["entropy_bits"] == round(spec.entropy_bits(20), 2)
+    assert body["score"] == main.password_analyzer.analyze(body["password"])["score"]
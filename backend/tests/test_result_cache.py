@@ -0,0 +1,48 @@
+"""ResultCache: keyed-hash keys, TTL and LRU eviction"""
+
+import time
+
+from app.services.result_cache import ResultCache
+
+
+def test_keys_are_exact_and_secret():
+    cache = ResultCache()
+    other = ResultCache()
+    assert cache.key("hunter2") == cache.key("hunter2")
+    assert cache.key("hunter2") != other.key("hunter2")
+    # No folding: case, normalization forms and trailing spaces all differ
+    variants = ["hunter2", "Hunter2", "hunter2 ", "caf\u00e9", "cafe\u0301", "\ud800"]
+    assert len({cache.key(p) for p in variants}) == len(variants)
+
+    cache.put("caf\u00e9", {"score": 1})
+    assert cache.get("cafe\u0301") is None
+    assert cache.get("caf\u00e9") == {"score": 1}
+    assert all(b"caf" not in key for key in cache._entries)
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("c") == {"n": 3}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire():
+    cache = ResultCache(ttl=0.05)
+    cache.put("a", {"n": 1})
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(enabled=False)
+    cache.put("a", {"n": 1})
+    assert cache.get("a") is None
+    assert len(cache) == 0
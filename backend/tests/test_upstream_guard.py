@@ -0,0 +1,73 @@
+"""CircuitBreaker state transitions and probe ownership"""
+
+import time
+
+from app.services.upstream_guard import CircuitBreaker
+
+
+def open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_ratio=0.5, window=2, reset_timeout=0.05)
+    for _ in range(2):
+        ticket = breaker.allow()
+        assert ticket is CircuitBreaker.PASS
+        breaker.record_failure(ticket)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_opens_then_probes_once():
+    breaker = open_breaker()
+    assert breaker.allow() is None
+    time.sleep(0.06)
+    probe = breaker.allow()
+    assert probe is not None
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is None
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is CircuitBreaker.PASS
+
+
+def test_only_the_probe_frees_the_probe_slot():
+    breaker = open_breaker()
+    # Allowed while closed, still in flight when the circuit opened
+    stale = CircuitBreaker.PASS
+    time.sleep(0.06)
+    probe = breaker.allow()
+    breaker.release(stale)
+    assert breaker.allow() is None
+    breaker.release(probe)
+    assert breaker.allow() is not None
+
+
+def test_failed_probe_reopens_and_frees_the_slot():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    probe = breaker.allow()
+    assert probe is not None
+    breaker.record_failure(probe)
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    assert breaker.allow() is not None
+
+
+def test_stale_outcomes_do_not_change_state():
+    breaker = open_breaker()
+    opened_at = breaker.opened_at
+    # Sent while closed, answered after the circuit opened
+    stale = CircuitBreaker.PASS
+    breaker.record_success(stale)
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.record_failure(stale)
+    assert breaker.opened_at == opened_at
+
+    time.sleep(0.06)
+    probe = breaker.allow()
+    breaker.record_success(stale)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is None
+    breaker.record_failure(stale)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.opens == 1
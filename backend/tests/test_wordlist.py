@@ -0,0 +1,82 @@
+"""Wordlist loading and passphrase generation"""
+
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.password_generator import MAX_WORDS, PasswordGenerator
+from app.services.wordlist import Wordlist
+
+
+def test_packed_words_round_trip():
+    words = ["abacus", "zebra", "café", "naïve", "abacus", "日本"]
+    wordlist = Wordlist(words)
+    assert len(wordlist) == 5
+    assert [wordlist[i] for i in range(len(wordlist))] == ["abacus", "zebra", "café", "naïve", "日本"]
+    assert wordlist.bits_per_word == pytest.approx(math.log2(5))
+
+
+def test_too_few_words_are_rejected():
+    with pytest.raises(ValueError):
+        Wordlist(["only", "only"])
+
+
+def test_load_dice_and_plain_files(tmp_path):
+    dice = tmp_path / "eff.txt"
+    dice.write_text("11111\tabacus\n11112\tabdomen\n\n11113\tabdominal\n", encoding="utf-8")
+    assert [w for w in Wordlist.load(str(dice)).words(0)] == []
+    wordlist = Wordlist.load(str(dice))
+    assert [wordlist[i] for i in range(len(wordlist))] == ["abacus", "abdomen", "abdominal"]
+
+    plain = tmp_path / "plain.txt"
+    plain.write_text("apple\nbanana\n  \ncherry pie\n", encoding="utf-8")
+    wordlist = Wordlist.load(str(plain))
+    assert [wordlist[i] for i in range(len(wordlist))] == ["apple", "banana"]
+
+
+def test_indices_cover_the_list_uniformly():
+    wordlist = Wordlist([f"w{i}" for i in range(7)])
+    indices = wordlist.random_indices(14_000)
+    assert len(indices) == 14_000
+    for i in range(7):
+        assert abs(indices.count(i) - 2000) < 200
+
+
+def test_passphrases():
+    generator = PasswordGenerator(Wordlist(["alpha", "bravo", "charlie"]))
+    phrases = generator.generate_passphrases(50, 4, separator=".", capitalize=False)
+    assert len(phrases) == 50
+    for phrase in phrases:
+        assert len(phrase.split(".")) == 4
+        assert set(phrase.split(".")) <= {"alpha", "bravo", "charlie"}
+
+    phrase = generator.generate_passphrase(3)
+    assert all(word in ("Alpha", "Bravo", "Charlie") for word in phrase.split("-"))
+
+    # Word counts are clamped to 1..MAX_WORDS
+    assert len(generator.generate_passphrase(0).split("-")) == 1
+    assert len(generator.generate_passphrase(100).split("-")) == MAX_WORDS
+    assert generator.passphrase_entropy_bits(6) == pytest.approx(6 * math.log2(3))
+    assert generator.passphrase_entropy_bits(100) == generator.passphrase_entropy_bits(MAX_WORDS)
+
+
+def test_default_wordlist():
+    generator = PasswordGenerator()
+    assert len(generator.wordlist) == len(set(PasswordGenerator.PASSPHRASE_WORDS))
+
+
+def test_passphrase_endpoints():
+    wordlist_size = len(main.password_generator.wordlist)
+    with TestClient(main.app) as client:
+        body = client.post("/api/passphrase", json={"word_count": 5, "separator": " "}).json()
+        assert len(body["passphrase"].split(" ")) == 5
+        assert body["wordlist_size"] == wordlist_size
+        assert body["entropy_bits"] == round(5 * math.log2(wordlist_size), 2)
+
+        body = client.post("/api/passphrase/batch", json={"count": 20, "word_count": 3}).json()
+        assert body["count"] == 20
+        assert all(len(p.split("-")) == 3 for p in body["passphrases"])
+
+        assert client.post("/api/passphrase", json={"separator": "------"}).status_code == 400
@@ -13,6 +13,8 @@ const CONFIG = {
 // Track password fields
 const analyzedFields = new WeakMap();
 let debounceTimers = new Map();
+// Incremental analysis session per field (see shared/incremental.js)
+const fieldAnalyzers = new Map();
 
 // ==================== Password Field Detection ====================
 
@@ -125,22 +127,24 @@ function handlePasswordInput(field, indicator) {
 
     // Set new timer
     debounceTimers.set(fieldId, setTimeout(async () => {
-        const result = await analyzePassword(password);
-        updateIndicator(indicator, result);
+        const result = await analyzePassword(fieldId, password);
+        // null: superseded by a later edit of the same field
+        if (result) updateIndicator(indicator, result);
     }, CONFIG.DEBOUNCE_DELAY));
 }
 
-async function analyzePassword(password) {
-    try {
-        const response = await fetch(`${CONFIG.API_URL}/api/full-analysis`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ password }),
-        });
-
-        if (!response.ok) throw new Error('API unavailable');
+async function analyzePassword(fieldId, password) {
+    if (!fieldAnalyzers.has(fieldId)) {
+        fieldAnalyzers.set(fieldId, createIncrementalAnalyzer(CONFIG.API_URL));
+    }
 
-        return await response.json();
+    try {
+        // Strength sends only the edit; the breach lookup runs alongside
+        const [strength, breach] = await Promise.all([
+            fieldAnalyzers.get(fieldId)(password),
+            checkBreach(CONFIG.API_URL, password),
+        ]);
+        return strength && { ...strength, ...breach };
     } catch (error) {
         // Fallback to client-side analysis
         return clientSideAnalysis(password);
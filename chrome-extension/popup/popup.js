@@ -32,6 +32,7 @@ const elements = {
 // State
 let currentPassword = '';
 let debounceTimer = null;
+const incrementalAnalyzer = createIncrementalAnalyzer(API_URL);
 
 // ==================== Password Analysis ====================
 
@@ -42,17 +43,15 @@ async function analyzePassword(password) {
     }
 
     try {
-        // Try to call the backend API
-        const response = await fetch(`${API_URL}/api/full-analysis`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ password }),
-        });
-
-        if (!response.ok) throw new Error('API unavailable');
-
-        const result = await response.json();
-        displayResults(result);
+        // Strength sends only the edit since the last call; the breach
+        // lookup runs alongside it
+        const [strength, breach] = await Promise.all([
+            incrementalAnalyzer(password),
+            checkBreach(API_URL, password),
+        ]);
+
+        // null: superseded by a later edit
+        if (strength) displayResults({ ...strength, ...breach });
     } catch (error) {
         // Fallback to client-side analysis
         console.log('Using client-side analysis (backend unavailable)');
@@ -0,0 +1,75 @@
+/**
+ * Login Security Analyzer - Incremental Analysis Client
+ * Shared by the content script and the popup: strength analysis that keeps
+ * a session on the backend and sends only the edit since the previous call
+ */
+
+function createIncrementalAnalyzer(apiUrl) {
+    let sessionId = null;
+    let sentChars = [];
+    let queue = Promise.resolve();
+    let latest = null;
+
+    function post(body) {
+        return fetch(`${apiUrl}/api/analyze/incremental`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body),
+        });
+    }
+
+    async function send(password) {
+        // The server counts code points, so diff those rather than UTF-16 units
+        const chars = Array.from(password);
+        let common = 0;
+        while (common < chars.length && common < sentChars.length
+            && chars[common] === sentChars[common]) {
+            common++;
+        }
+
+        try {
+            let response = await post(sessionId
+                ? { session_id: sessionId, delete: sentChars.length - common, append: chars.slice(common).join('') }
+                : { password });
+
+            // Session expired: start over with the full password
+            if (response.status === 404) {
+                response = await post({ password });
+            }
+
+            if (!response.ok) throw new Error('API unavailable');
+
+            const result = await response.json();
+            sessionId = result.session_id;
+            sentChars = chars;
+            return result;
+        } catch (error) {
+            // The server may or may not have applied the edit: start over next time
+            sessionId = null;
+            sentChars = [];
+            throw error;
+        }
+    }
+
+    // One call in flight at a time; calls made meanwhile are coalesced into
+    // one for the latest password and the superseded ones resolve to null
+    return function analyze(password) {
+        latest = password;
+        const call = queue.then(() => (password === latest ? send(password) : null));
+        queue = call.catch(() => {});
+        return call;
+    };
+}
+
+async function checkBreach(apiUrl, password) {
+    const response = await fetch(`${apiUrl}/api/breach-check`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ password }),
+    });
+
+    if (!response.ok) throw new Error('API unavailable');
+
+    const result = await response.json();
+    return { breached: result.breached, breach_count: result.breach_count, breach_message: result.message };
+}
@@ -1,4 +1,4 @@
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import Header from './components/Header';
 import PasswordInput from './components/PasswordInput';
 import StrengthMeter from './components/StrengthMeter';
@@ -8,18 +8,23 @@ import PasswordGenerator from './components/PasswordGenerator';
 import DetailsPanel from './components/DetailsPanel';
 import MemorableGenerator from './components/MemorableGenerator';
 import DarkWebMonitor from './components/DarkWebMonitor';
-import { analyzePassword } from './services/api';
+import { analyzeIncremental, checkBreach } from './services/api';
 import './styles/App.css';
 
+// Breach lookups wait for a pause in typing; strength updates every keystroke
+const BREACH_CHECK_DELAY = 400;
+
 function App() {
     const [password, setPassword] = useState('');
     const [analysis, setAnalysis] = useState(null);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
+    const latestPassword = useRef('');
 
-    // Debounced password analysis
+    // Strength from the incremental session, then the breach lookup
     const handlePasswordChange = useCallback(async (newPassword) => {
         setPassword(newPassword);
+        latestPassword.current = newPassword;
         setError(null);
 
         if (!newPassword) {
@@ -27,19 +32,31 @@ function App() {
             return;
         }
 
-        // Only analyze if password is at least 1 character
-        if (newPassword.length > 0) {
-            setLoading(true);
-            try {
-                const result = await analyzePassword(newPassword);
-                setAnalysis(result);
-            } catch (err) {
-                setError('Could not analyze password. Backend may be offline.');
-                // Fallback to client-side analysis
-                setAnalysis(clientSideAnalysis(newPassword));
-            } finally {
-                setLoading(false);
-            }
+        const isLatest = () => latestPassword.current === newPassword;
+        setLoading(true);
+        try {
+            const result = await analyzeIncremental(newPassword);
+            // null: superseded by a later keystroke
+            if (!result || !isLatest()) return;
+            setAnalysis(result);
+
+            await new Promise((resolve) => setTimeout(resolve, BREACH_CHECK_DELAY));
+            if (!isLatest()) return;
+            const breach = await checkBreach(newPassword);
+            if (!isLatest()) return;
+            setAnalysis({
+                ...result,
+                breached: breach.breached,
+                breach_count: breach.breach_count,
+                breach_message: breach.message,
+            });
+        } catch (err) {
+            if (!isLatest()) return;
+            setError('Could not analyze password. Backend may be offline.');
+            // Fallback to client-side analysis
+            setAnalysis(clientSideAnalysis(newPassword));
+        } finally {
+            if (isLatest()) setLoading(false);
         }
     }, []);
 
@@ -67,6 +67,123 @@ export async function analyzeStrengthOnly(password) {
     }
 }
 
+// Incremental analysis session (server keeps the state of what was typed)
+let incrementalSession = null;
+let incrementalChars = [];
+let incrementalQueue = Promise.resolve();
+let incrementalLatest = null;
+
+async function postIncremental(body) {
+    return fetch(`${API_BASE_URL}/api/analyze/incremental`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(body),
+    });
+}
+
+async function sendIncremental(password) {
+    // The server counts code points, so diff those rather than UTF-16 units
+    const chars = Array.from(password);
+    let common = 0;
+    while (common < chars.length && common < incrementalChars.length
+        && chars[common] === incrementalChars[common]) {
+        common++;
+    }
+
+    try {
+        let response = await postIncremental(incrementalSession
+            ? {
+                session_id: incrementalSession,
+                delete: incrementalChars.length - common,
+                append: chars.slice(common).join(''),
+            }
+            : { password });
+
+        // Session expired: start over with the full password
+        if (response.status === 404) {
+            response = await postIncremental({ password });
+        }
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const result = await response.json();
+        incrementalSession = result.session_id;
+        incrementalChars = chars;
+        return result;
+    } catch (error) {
+        console.error('API Error:', error);
+        // The server may or may not have applied the edit: start over next time
+        incrementalSession = null;
+        incrementalChars = [];
+        throw error;
+    }
+}
+
+/**
+ * Analyze password strength (no breach check) as the user types, sending
+ * only the edit since the previous call (characters deleted from / appended
+ * to the end). One call is in flight at a time; calls made meanwhile are
+ * coalesced into one for the latest password, and the superseded ones
+ * resolve to null.
+ */
+export function analyzeIncremental(password) {
+    incrementalLatest = password;
+    const call = incrementalQueue.then(() => (
+        password === incrementalLatest ? sendIncremental(password) : null
+    ));
+    incrementalQueue = call.catch(() => {});
+    return call;
+}
+
+/**
+ * Open a live analysis connection. onStrength gets each strength result
+ * as soon as it is computed, onBreach the breach status that follows it;
+ * results for superseded passwords are dropped.
+ */
+export function openLiveAnalysis({ onStrength, onBreach, onError } = {}) {
+    const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/ws/analyze`);
+    let nextId = 0;
+    let latestId = 0;
+    let pending = null;
+
+    socket.onopen = () => {
+        if (pending) {
+            socket.send(JSON.stringify(pending));
+            pending = null;
+        }
+    };
+
+    socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'error') {
+            onError?.(new Error(message.detail));
+        } else if (message.id === latestId) {
+            (message.type === 'strength' ? onStrength : onBreach)?.(message);
+        }
+    };
+
+    socket.onerror = () => onError?.(new Error('Live analysis connection failed'));
+
+    return {
+        analyze(password, checkBreaches = true) {
+            latestId = ++nextId;
+            const message = { id: latestId, password, check_breaches: checkBreaches };
+            if (socket.readyState === WebSocket.OPEN) {
+                socket.send(JSON.stringify(message));
+            } else {
+                pending = message;
+            }
+        },
+        close() {
+            socket.close();
+        },
+    };
+}
+
 /**
  * Check if password appears in data breaches
  */
@@ -123,14 +240,35 @@ export async function generatePassword(options = {}) {
     } catch (error) {
         console.error('API Error:', error);
         // Fallback to client-side generation
+        const { password, charsetSize } = generateClientSidePassword(finalOptions);
         return {
-            password: generateClientSidePassword(finalOptions),
+            password,
             score: 90,
-            strength: 'Strong'
+            strength: 'Strong',
+            entropy_bits: Math.round(finalOptions.length * Math.log2(charsetSize) * 100) / 100
         };
     }
 }
 
+/**
+ * Generate a diceware-style passphrase (returns passphrase and entropy_bits)
+ */
+export async function generatePassphrase(options = {}) {
+    const response = await fetch(`${API_BASE_URL}/api/passphrase`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ word_count: 6, separator: '-', capitalize: true, ...options }),
+    });
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return await response.json();
+}
+
 /**
  * Fallback client-side password generator
  */
@@ -153,7 +291,7 @@ function generateClientSidePassword(options) {
         password += charset[array[i] % charset.length];
     }
 
-    return password;
+    return { password, charsetSize: charset.length };
 }
 
 /**